@@ -7,17 +7,60 @@ Manages loading and inference for specialized NLP models:
 """
 
 import os
+import json
 import logging
-from typing import Dict, Any, List, Optional
-from transformers import pipeline, AutoTokenizer, AutoModelForTokenClassification, AutoModelForSequenceClassification
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+from utils.http_client import ResilientHTTPClient, CircuitBreaker, CircuitOpenError
+from utils.cache import verdict_cache, content_hash, normalize_text
+from utils.text_windows import plan_windows, merge_entities
+from utils.batching import MicroBatcher
+from utils.metrics import registry, FALLBACKS, STAGE_SECONDS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MISTRAL_MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.2"
+# Local models: "torch" (transformers/PyTorch) or "onnx" (ONNX Runtime via optimum, see onnx_backend.py)
+MODEL_BACKEND = os.getenv("AI_MODEL_BACKEND", "torch").lower()
+# NER windows: tokens per window (kept under the 512 context, margin for edge re-tokenization),
+# tokens shared by consecutive windows, windows per forward pass
+NER_WINDOW_TOKENS = int(os.getenv("AI_NER_WINDOW_TOKENS", "500"))
+NER_WINDOW_OVERLAP = int(os.getenv("AI_NER_WINDOW_OVERLAP", "128"))
+NER_BATCH_SIZE = max(1, int(os.getenv("AI_NER_BATCH_SIZE", "8")))
+SUMMARY_BATCH_SIZE = max(1, int(os.getenv("AI_SUMMARY_BATCH_SIZE", "8")))
+# Summary length bounds follow the clause word count rounded down to this step,
+# so clauses of similar length share bounds and can be generated in one batch
+SUMMARY_LENGTH_STEP = 10
+# Bump whenever _build_risk_prompt or its parameters change: invalidates memoized verdicts
+PROMPT_VERSION = "1"
+MISTRAL_API_URL = os.getenv("MISTRAL_API_URL", f"https://api-inference.huggingface.co/models/{MISTRAL_MODEL_ID}")
+
+# Shared keep-alive client: bounded latency per clause, breaker trips to keyword fallback
+mistral_client = ResilientHTTPClient(
+    "mistral",
+    pool_size=int(os.getenv("MISTRAL_POOL_SIZE", "10")),
+    connect_timeout=float(os.getenv("MISTRAL_CONNECT_TIMEOUT", "3.05")),
+    read_timeout=float(os.getenv("MISTRAL_READ_TIMEOUT", "30")),
+    max_retries=int(os.getenv("MISTRAL_MAX_RETRIES", "2")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("MISTRAL_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("MISTRAL_BREAKER_RESET_SECONDS", "30"))
+    )
+)
+
 class AIModelService:
     _instance = None
     
+    # Model identifiers (also part of the analysis cache key)
+    NER_MODEL = "Jean-Baptiste/camembert-ner"
+    CLASSIFIER_MODEL = "facebook/bart-large-mnli"
+    SUMMARIZER_MODEL = "moussaKam/barthez"
+    MISTRAL_MODEL = MISTRAL_MODEL_ID
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(AIModelService, cls).__new__(cls)
@@ -35,22 +78,61 @@ class AIModelService:
         self.ner_pipeline = None
         self.classifier_pipeline = None
         self.summarizer_pipeline = None
+        # Model id -> backend it was actually loaded with ("none" after a failed load)
+        self._backends: Dict[str, str] = {}
+        # Clauses are analysed concurrently: only one thread may load a given model
+        self._load_lock = threading.Lock()
+        # Concurrent requests are coalesced into batched forward passes, one batcher per model
+        self._ner_batcher = MicroBatcher("ner", self._ner_batch)
+        self._classifier_batcher = MicroBatcher("classifier", self._classify_batch)
+        self._summarizer_batcher = MicroBatcher("summarizer", self._summarize_batch)
         
         self._initialized = True
         logger.info("🤖 AI Model Service Initialized")
 
+    def _build_pipeline(self, task: str, model_id: str, **kwargs):
+        """
+        transformers pipeline on the configured backend (AI_MODEL_BACKEND)
+
+        The ONNX backend falls back to PyTorch if optimum is missing or the export fails.
+        The backend that actually loaded is recorded for model_fingerprint().
+        """
+        self._backends[model_id] = "none"
+        if MODEL_BACKEND == "onnx":
+            try:
+                from onnx_backend import load_onnx_pipeline
+                model = load_onnx_pipeline(task, model_id, **kwargs)
+                self._backends[model_id] = self._configured_backend()
+                return model
+            except Exception as e:
+                logger.warning(f"⚠️ ONNX backend unavailable for {model_id} ({e}), using PyTorch")
+        from transformers import pipeline  # Heavy import (torch): deferred to the first model load
+        model = pipeline(task, model=model_id, tokenizer=model_id, device=self.device, **kwargs)
+        self._backends[model_id] = "torch"
+        return model
+
+    @staticmethod
+    def _configured_backend() -> str:
+        """Backend requested by AI_MODEL_BACKEND (and AI_ONNX_QUANTIZE)"""
+        if MODEL_BACKEND == "onnx":
+            from onnx_backend import ONNX_QUANTIZE
+            return "onnx-int8" if ONNX_QUANTIZE else "onnx"
+        return MODEL_BACKEND
+
     def load_ner_model(self):
         """Load CamemBERT for NER (Entities)"""
-        if not self.ner_pipeline:
+        if self.ner_pipeline:
+            return
+        with self._load_lock:
+            if self.ner_pipeline:
+                return
             logger.info("⏳ Loading CamemBERT NER model...")
             try:
                 # Using a lighter model for dev/local: Jean-Baptiste/camembert-ner
-                self.ner_pipeline = pipeline(
+                self.ner_pipeline = self._build_pipeline(
                     "ner", 
-                    model="Jean-Baptiste/camembert-ner", 
-                    tokenizer="Jean-Baptiste/camembert-ner",
-                    aggregation_strategy="simple",
-                    device=self.device
+                    self.NER_MODEL, 
+                    aggregation_strategy="simple"
                 )
                 logger.info("✅ CamemBERT NER loaded")
             except Exception as e:
@@ -58,13 +140,16 @@ class AIModelService:
 
     def load_classifier_model(self):
         """Load CamemBERT for Zero-Shot Classification"""
-        if not self.classifier_pipeline:
+        if self.classifier_pipeline:
+            return
+        with self._load_lock:
+            if self.classifier_pipeline:
+                return
             logger.info("⏳ Loading CamemBERT Classification model...")
             try:
-                self.classifier_pipeline = pipeline(
+                self.classifier_pipeline = self._build_pipeline(
                     "zero-shot-classification", 
-                    model="facebook/bart-large-mnli", # Multi-lingual capable usually, or use specific fr model
-                    device=self.device
+                    self.CLASSIFIER_MODEL # Multi-lingual capable usually, or use specific fr model
                 )
                 logger.info("✅ Classifier loaded")
             except Exception as e:
@@ -72,31 +157,73 @@ class AIModelService:
 
     def load_summarizer_model(self):
         """Load BARThez for Summarization"""
-        if not self.summarizer_pipeline:
+        if self.summarizer_pipeline:
+            return
+        with self._load_lock:
+            if self.summarizer_pipeline:
+                return
             logger.info("⏳ Loading BARThez Summarization model...")
             try:
-                self.summarizer_pipeline = pipeline(
+                self.summarizer_pipeline = self._build_pipeline(
                     "summarization", 
-                    model="moussaKam/barthez", 
-                    tokenizer="moussaKam/barthez",
-                    device=self.device
+                    self.SUMMARIZER_MODEL
                 )
                 logger.info("✅ BARThez loaded")
             except Exception as e:
                 logger.error(f"❌ Failed to load Summarizer model: {e}")
 
+    def model_fingerprint(self) -> str:
+        """
+        Identify the models that shape an analysis result (Mistral only counts when enabled)
+
+        Each local model is tagged with the backend it actually loaded with
+        (ONNX may have fallen back to PyTorch, or the load failed); models not
+        loaded yet are tagged with the configured backend.
+        """
+        mistral = f"{self.MISTRAL_MODEL}@prompt{PROMPT_VERSION}" if self.hf_token else "rules"
+        configured = self._configured_backend()
+        ner, summarizer = (
+            f"{model_id}@{self._backends.get(model_id, configured)}"
+            for model_id in (self.NER_MODEL, self.SUMMARIZER_MODEL)
+        )
+        return f"ner={ner};summarizer={summarizer};risk={mistral}"
+
     def extract_entities(self, text: str) -> List[Dict[str, Any]]:
-        """Extract named entities using CamemBERT"""
+        """
+        Extract named entities over the whole text using CamemBERT
+
+        The text is tokenized once and split into overlapping windows that fit
+        the model context. Windows go through the NER pipeline in batches, then
+        spans are mapped back to text offsets, merged and deduplicated.
+
+        Returns:
+            Entities (entity_group, word, start, end, score) sorted by offset
+        """
         self.load_ner_model()
-        if not self.ner_pipeline:
+        if not self.ner_pipeline or not text.strip():
             return []
-            
-        # Limit text length for BERT models
-        truncated_text = text[:512] 
-        results = self.ner_pipeline(truncated_text)
-        
-        # specific processing can be added here
-        return results
+
+        tokenizer = self.ner_pipeline.tokenizer
+        offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        context = tokenizer.model_max_length - tokenizer.num_special_tokens_to_add()
+        windows = plan_windows(offsets, min(NER_WINDOW_TOKENS, context), NER_WINDOW_OVERLAP)
+
+        # Windows of concurrent requests share forward passes
+        results = self._ner_batcher.map([text[start:end] for start, end, _, _ in windows])
+
+        entities = []
+        for (window_start, _, own_start, own_end), window_entities in zip(windows, results):
+            for entity in window_entities:
+                start, end = window_start + entity["start"], window_start + entity["end"]
+                # Keep the copy found by the window owning the span (the one seeing it whole)
+                if own_start <= (start + end) // 2 < own_end:
+                    entities.append({
+                        "entity_group": entity["entity_group"],
+                        "start": start,
+                        "end": end,
+                        "score": float(entity["score"])
+                    })
+        return merge_entities(entities, text)
 
     def classify_contract(self, text: str, candidate_labels: List[str]) -> Dict[str, Any]:
         """Classify contract type using Zero-Shot"""
@@ -105,43 +232,104 @@ class AIModelService:
             return {"labels": [], "scores": []}
             
         truncated_text = text[:1024]
-        return self.classifier_pipeline(truncated_text, candidate_labels)
+        return self._classifier_batcher.submit((truncated_text, tuple(candidate_labels))).result()
+
+    def _ner_batch(self, window_texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """One batched NER pass (micro-batcher worker)"""
+        return self.ner_pipeline(window_texts, batch_size=NER_BATCH_SIZE)
+
+    def _classify_batch(self, items: List[Tuple[str, Tuple[str, ...]]]) -> List[Dict[str, Any]]:
+        """Zero-shot classification of (text, labels) items, one pass per label set (micro-batcher worker)"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        by_labels: Dict[Tuple[str, ...], List[int]] = {}
+        for i, (_, labels) in enumerate(items):
+            by_labels.setdefault(labels, []).append(i)
+        for labels, indices in by_labels.items():
+            outputs = self.classifier_pipeline([items[i][0] for i in indices], list(labels), batch_size=len(indices))
+            if isinstance(outputs, dict):  # Single input
+                outputs = [outputs]
+            for i, output in zip(indices, outputs):
+                results[i] = output
+        return results
 
     def summarize_clause(self, text: str) -> str:
         """Summarize legal text using BARThez"""
+        return self.summarize_clauses([text])[0]
+
+    def summarize_clauses(self, texts: List[str]) -> List[str]:
+        """
+        Summarize several clauses with batched BARThez generation
+
+        Texts under 30 words are returned as is. The others go through the
+        summarizer micro-batcher together with those of concurrent requests.
+
+        Args:
+            texts: Clause texts
+
+        Returns:
+            Summaries, in input order
+        """
         self.load_summarizer_model()
         if not self.summarizer_pipeline:
-            return text[:200] + "..."
-            
+            return [text[:200] + "..." for text in texts]
+
+        summaries = list(texts)  # Short texts pass through
+        pending = [i for i, text in enumerate(texts) if len(text.split()) >= 30]
+        for i, summary in zip(pending, self._summarizer_batcher.map([texts[i] for i in pending])):
+            summaries[i] = summary
+        return summaries
+
+    @staticmethod
+    def _summary_length_bounds(word_count: int) -> Tuple[int, int]:
+        """
+        (max_length, min_length) of the summary of a clause of word_count words
+
+        Depends on the clause alone, never on the clauses batched with it: a
+        summary must not change with the batch it happened to be generated in
+        (analyses are cached).
+        """
+        input_len = word_count - word_count % SUMMARY_LENGTH_STEP
+        return min(150, int(input_len * 0.8)), min(30, int(input_len * 0.3))
+
+    def _summarize_batch(self, texts: List[str]) -> List[str]:
+        """
+        Summaries of texts (30+ words) grouped by length bounds, then sorted by
+        length into padded batches of SUMMARY_BATCH_SIZE, one generate call per
+        batch (micro-batcher worker). A failing batch falls back to truncated text.
+        """
+        summaries = list(texts)
+        word_counts = [len(text.split()) for text in texts]
+        groups = defaultdict(list)
+        for i in sorted(range(len(texts)), key=lambda i: word_counts[i]):
+            groups[self._summary_length_bounds(word_counts[i])].append(i)
+
+        for (max_length, min_length), pending in groups.items():
+            for b in range(0, len(pending), SUMMARY_BATCH_SIZE):
+                batch = pending[b:b + SUMMARY_BATCH_SIZE]
+                self._generate_summaries(texts, batch, max_length, min_length, summaries)
+        return summaries
+
+    def _generate_summaries(self, texts: List[str], batch: List[int], max_length: int,
+                            min_length: int, summaries: List[str]):
+        """One generate call for texts[batch], results written into summaries"""
         try:
-            # Min/Max length relative to input
-            input_len = len(text.split())
-            if input_len < 30:
-                return text
-                
-            summary = self.summarizer_pipeline(
-                text, 
-                max_length=min(150, int(input_len * 0.8)), 
-                min_length=min(30, int(input_len * 0.3)), 
-                do_sample=False
+            results = self.summarizer_pipeline(
+                [texts[i] for i in batch],
+                max_length=max_length,
+                min_length=min_length,
+                do_sample=False,
+                batch_size=len(batch)
             )
-            return summary[0]['summary_text']
+            for i, result in zip(batch, results):
+                summaries[i] = result['summary_text']
         except Exception as e:
             logger.warning(f"Summarization failed: {e}")
-            return text[:200] + "..." # Fallback
-
-    def analyze_risk_mistral(self, clause_text: str, clause_type: str, contract_type: str) -> Dict[str, Any]:
-        """
-        Analyze clause risks using Mistral-7B-Instruct via Hugging Face API
-        """
-        if not self.hf_token:
-            logger.warning("⚠️ No Hugging Face token found. Using keyword fallback.")
-            return None
+            FALLBACKS.inc(component="summarizer", amount=len(batch))
+            for i in batch:
+                summaries[i] = texts[i][:200] + "..." # Fallback
 
-        API_URL = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2"
-        headers = {"Authorization": f"Bearer {self.hf_token}"}
-        
-        prompt = f"""[INST] Tu es un expert juridique français. Analyse la clause suivante extraite d'un {contract_type}.
+    def _build_risk_prompt(self, clause_text: str, clause_type: str, contract_type: str) -> str:
+        return f"""[INST] Tu es un expert juridique français. Analyse la clause suivante extraite d'un {contract_type}.
 Type de clause : {clause_type}
 Texte : "{clause_text}"
 
@@ -155,31 +343,115 @@ Format de réponse JSON attendu :
 Réponds uniquement en JSON valide.
 [/INST]"""
 
-        import requests
+    def _mistral_request(self, clause_text: str, clause_type: str, contract_type: str):
+        """Headers and payload for the inference API, or None without token"""
+        if not self.hf_token:
+            logger.warning("⚠️ No Hugging Face token found. Using keyword fallback.")
+            return None
+        headers = {"Authorization": f"Bearer {self.hf_token}"}
+        payload = {
+            "inputs": self._build_risk_prompt(clause_text, clause_type, contract_type),
+            "parameters": {"max_new_tokens": 256, "return_full_text": False}
+        }
+        return headers, payload
+
+    def _verdict_key(self, clause_text: str, clause_type: str, contract_type: str) -> str:
+        """Memo key: boilerplate clauses differing only in case/spacing share a verdict"""
+        return content_hash(
+            normalize_text(clause_text), clause_type, contract_type, self.MISTRAL_MODEL, PROMPT_VERSION
+        )
+
+    @staticmethod
+    def _parse_risk_response(status_code: int, body: Any) -> Optional[Dict[str, Any]]:
+        """Extract the JSON verdict from the generated text (Mistral might add chat text)"""
+        if status_code != 200:
+            logger.warning(f"Mistral API Error: {status_code}")
+            return None
         try:
-            response = requests.post(API_URL, headers=headers, json={"inputs": prompt, "parameters": {"max_new_tokens": 256, "return_full_text": False}})
-            
-            if response.status_code == 200:
-                result = response.json()
-                generated_text = result[0]['generated_text']
-                
-                # Attempt to parse JSON from response (Mistral might add chat text)
-                import json
-                try:
-                    # Find JSON block
-                    start = generated_text.find('{')
-                    end = generated_text.rfind('}') + 1
-                    if start != -1 and end != -1:
-                        json_str = generated_text[start:end]
-                        return json.loads(json_str)
-                except:
-                    logger.warning("Failed to parse Mistral JSON response")
-                logger.warning(f"Mistral API Error: {response.status_code}")
-                
+            generated_text = body[0]['generated_text']
+            start = generated_text.find('{')
+            end = generated_text.rfind('}') + 1
+            if start != -1 and end > start:
+                return json.loads(generated_text[start:end])
+        except (KeyError, IndexError, TypeError, ValueError):
+            pass
+        logger.warning("Failed to parse Mistral JSON response")
+        return None
+
+    def analyze_risk_mistral(self, clause_text: str, clause_type: str, contract_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Analyze clause risks using Mistral-7B-Instruct via Hugging Face API
+
+        Returns:
+            Parsed verdict, or None (no token, endpoint unhealthy, bad response):
+            callers then fall back to keyword-based risk assessment
+
+        Only requests actually sent are timed (stage "mistral"), and a fallback is
+        counted only when a configured endpoint failed or its circuit was open.
+        """
+        request = self._mistral_request(clause_text, clause_type, contract_type)
+        if request is None:
+            return None
+        headers, payload = request
+
+        key = self._verdict_key(clause_text, clause_type, contract_type)
+        verdict = verdict_cache.get(key)
+        if verdict is not None:
+            return verdict
+
+        try:
+            start = time.perf_counter()
+            response = mistral_client.post_json(MISTRAL_API_URL, payload, headers=headers)
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage="mistral")
+            verdict = self._parse_risk_response(response.status_code, response.json() if response.status_code == 200 else None)
+            if verdict is not None:
+                verdict_cache.set(key, verdict)
+                return verdict
+        except CircuitOpenError:
+            logger.info("⏭️ Mistral endpoint unhealthy, skipping to keyword fallback")
         except Exception as e:
             logger.error(f"Mistral Inference Failed: {e}")
-            
+        FALLBACKS.inc(component="mistral")
+        return None
+
+    async def analyze_risk_mistral_async(self, clause_text: str, clause_type: str, contract_type: str) -> Optional[Dict[str, Any]]:
+        """Async variant of analyze_risk_mistral (no worker thread held during the call)"""
+        request = self._mistral_request(clause_text, clause_type, contract_type)
+        if request is None:
+            return None
+        headers, payload = request
+
+        key = self._verdict_key(clause_text, clause_type, contract_type)
+        verdict = verdict_cache.get(key)
+        if verdict is not None:
+            return verdict
+
+        try:
+            start = time.perf_counter()
+            response = await mistral_client.apost_json(MISTRAL_API_URL, payload, headers=headers)
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage="mistral")
+            verdict = self._parse_risk_response(response.status_code, response.json() if response.status_code == 200 else None)
+            if verdict is not None:
+                verdict_cache.set(key, verdict)
+                return verdict
+        except CircuitOpenError:
+            logger.info("⏭️ Mistral endpoint unhealthy, skipping to keyword fallback")
+        except Exception as e:
+            logger.error(f"Mistral Inference Failed: {e}")
+        FALLBACKS.inc(component="mistral")
         return None
 
+def _model_metrics():
+    """Micro-batching and circuit breaker state, read by the /metrics endpoint"""
+    batchers = [ai_models._ner_batcher, ai_models._classifier_batcher, ai_models._summarizer_batcher]
+    stats = [batcher.stats() for batcher in batchers]
+    yield ("ai_batches_total", "counter", "Batched forward passes per model",
+           [("", {"model": s["name"]}, s["batches"]) for s in stats])
+    yield ("ai_batch_items_total", "counter", "Inputs processed through the micro-batchers per model",
+           [("", {"model": s["name"]}, s["items"]) for s in stats])
+    yield ("ai_circuit_open", "gauge", "1 while the inference endpoint circuit breaker refuses requests",
+           [("", {"client": mistral_client.name}, int(mistral_client.breaker.state == "open"))])
+
 # Global instance
 ai_models = AIModelService()
+registry.register_collector(_model_metrics)
@@ -0,0 +1,119 @@
+"""
+Deterministic benchmark corpus
+Synthetic French contracts of a given length (in pages), built from clause
+templates with seeded variations, so every run measures the same input.
+"""
+
+import random
+from typing import Dict, List
+
+CHARS_PER_PAGE = 3000
+
+CONTRACT_HEADERS = {
+    "bail": "CONTRAT DE BAIL D'HABITATION\nSoumis à la loi n° 89-462 du 6 juillet 1989\n\nENTRE LES SOUSSIGNÉS :\nM. {name}, ci-après dénommé « le bailleur »,\nET\nMme {name2}, ci-après dénommée « le locataire ».\n",
+    "travail": "CONTRAT DE TRAVAIL À DURÉE INDÉTERMINÉE\n\nENTRE :\nLa société {company}, ci-après « l'employeur »,\nET\nM. {name}, ci-après « le salarié ».\n",
+    "prestation": "CONTRAT DE PRESTATION DE SERVICES\n\nENTRE :\nLa société {company}, ci-après « le client »,\nET\nLa société {company2}, ci-après « le prestataire ».\n",
+}
+
+CLAUSE_TEMPLATES = {
+    "bail": [
+        ("Objet", "Le bailleur loue au locataire, qui accepte, un logement situé au {number} rue {street}, {city}, d'une surface habitable de {surface} m². Le logement est loué à usage exclusif d'habitation principale."),
+        ("Loyer", "Le loyer mensuel est fixé à {amount} euros, charges non comprises, payable le {day} de chaque mois. Les charges font l'objet d'une provision mensuelle de {charges} euros régularisée annuellement."),
+        ("Dépôt de garantie", "Un dépôt de garantie d'un montant de {amount} euros est versé à la signature. Il sera restitué dans un délai de deux mois à compter de la remise des clés, déduction faite des sommes dues."),
+        ("Durée", "Le présent bail est consenti pour une durée de {years} ans à compter du {date}. À défaut de congé, il est reconduit tacitement pour une durée identique."),
+        ("Clause résolutoire", "À défaut de paiement du loyer ou des charges à leur échéance, et deux mois après un commandement de payer demeuré infructueux, le bail sera résilié de plein droit."),
+        ("Révision du loyer", "Le loyer sera révisé chaque année à la date anniversaire du contrat en fonction de la variation de l'indice de référence des loyers publié par l'INSEE."),
+    ],
+    "travail": [
+        ("Engagement", "Le salarié est engagé en qualité de {job} à compter du {date}, sous réserve des résultats de la visite médicale d'embauche."),
+        ("Période d'essai", "Le présent contrat est soumis à une période d'essai de {months} mois, renouvelable une fois, durant laquelle chacune des parties peut rompre le contrat sans indemnité."),
+        ("Rémunération", "Le salarié percevra une rémunération brute mensuelle de {amount} euros, versée à terme échu, pour une durée de travail de 35 heures hebdomadaires."),
+        ("Clause de non-concurrence", "Pendant une durée de {months} mois suivant la rupture du contrat, le salarié s'interdit d'exercer une activité concurrente dans un rayon de {km} kilomètres, moyennant une contrepartie financière."),
+        ("Confidentialité", "Le salarié s'engage à ne divulguer aucune information confidentielle dont il aurait connaissance dans l'exercice de ses fonctions, pendant et après l'exécution du contrat."),
+        ("Préavis", "En cas de rupture du contrat après la période d'essai, un préavis de {months} mois devra être respecté, sauf faute grave ou lourde."),
+    ],
+    "prestation": [
+        ("Objet", "Le prestataire s'engage à fournir au client une prestation de {service} conformément au cahier des charges annexé au présent contrat."),
+        ("Prix", "En contrepartie, le client versera au prestataire la somme de {amount} euros hors taxes, payable à {days} jours à réception de facture. Tout retard entraînera des pénalités de retard."),
+        ("Responsabilité", "La responsabilité du prestataire est limitée au montant des sommes perçues au titre du présent contrat, à l'exclusion de tout dommage indirect."),
+        ("Propriété intellectuelle", "Les livrables deviennent la propriété exclusive du client après complet paiement du prix. Le prestataire conserve ses outils et savoir-faire préexistants."),
+        ("Résiliation", "Chacune des parties pourra résilier le contrat en cas de manquement grave de l'autre partie, non réparé dans un délai de {days} jours suivant une mise en demeure."),
+        ("Force majeure", "Aucune partie ne sera tenue responsable d'un manquement résultant d'un cas de force majeure au sens de l'article 1218 du Code civil."),
+    ],
+}
+
+NAMES = ["Jean Dupont", "Marie Martin", "Pierre Bernard", "Sophie Durand", "Luc Moreau", "Claire Petit"]
+COMPANIES = ["ACME SAS", "Dupuis Conseil SARL", "Nova Informatique", "Atelier Lumière SA"]
+CITIES = ["Paris", "Lyon", "Marseille", "Toulouse", "Nantes", "Lille"]
+STREETS = ["de la République", "Victor Hugo", "des Lilas", "Pasteur", "du Général Leclerc"]
+JOBS = ["développeur", "comptable", "chargé de clientèle", "chef de projet"]
+SERVICES = ["maintenance informatique", "hébergement SaaS", "conseil juridique", "formation"]
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        name=rng.choice(NAMES), name2=rng.choice(NAMES),
+        company=rng.choice(COMPANIES), company2=rng.choice(COMPANIES),
+        number=rng.randint(1, 120), street=rng.choice(STREETS), city=rng.choice(CITIES),
+        surface=rng.randint(18, 140), amount=rng.randint(4, 60) * 50, charges=rng.randint(2, 20) * 10,
+        day=rng.randint(1, 10), years=rng.choice([1, 3, 6]), date=f"{rng.randint(1, 28)}/{rng.randint(1, 12)}/2025",
+        job=rng.choice(JOBS), months=rng.randint(1, 12), km=rng.choice([10, 30, 50]),
+        service=rng.choice(SERVICES), days=rng.choice([15, 30, 45]),
+    )
+
+def generate_contract(pages: float, kind: str = "bail", seed: int = 0) -> str:
+    """
+    Synthetic contract of about `pages` pages
+
+    Args:
+        pages: Target length (CHARS_PER_PAGE characters per page)
+        kind: "bail", "travail" or "prestation"
+        seed: Same seed, same text
+
+    Returns:
+        Contract text with numbered "Article N - Title" clauses
+    """
+    rng = random.Random(f"{kind}-{pages}-{seed}")
+    parts = [_fill(CONTRACT_HEADERS[kind], rng)]
+    target = int(pages * CHARS_PER_PAGE)
+    length = len(parts[0])
+    article = 1
+    while length < target:
+        title, template = rng.choice(CLAUSE_TEMPLATES[kind])
+        # Several sentences per article so chunks have realistic sizes
+        body = " ".join(_fill(template, rng) for _ in range(rng.randint(1, 3)))
+        clause = f"\nArticle {article} - {title}\n{body}\n"
+        parts.append(clause)
+        length += len(clause)
+        article += 1
+    parts.append("\nFait à {city}, le {date}, en deux exemplaires originaux.\n".format(
+        city=rng.choice(CITIES), date=f"{rng.randint(1, 28)}/{rng.randint(1, 12)}/2025"))
+    return "".join(parts)
+
+def generate_ocr_text(pages: float, seed: int = 0) -> str:
+    """Contract text with typical OCR noise (broken lines, stray symbols, spacing)"""
+    rng = random.Random(f"ocr-{pages}-{seed}")
+    text = generate_contract(pages, kind=rng.choice(list(CLAUSE_TEMPLATES)), seed=seed)
+    noisy = []
+    for line in text.split("\n"):
+        words = line.split(" ")
+        if len(words) > 8 and rng.random() < 0.5:
+            cut = rng.randint(3, len(words) - 3)
+            line = " ".join(words[:cut]) + "\n" + " ".join(words[cut:])
+        if rng.random() < 0.2:
+            line = line.replace("e", "e ", 1).replace("l", "|", 1)
+        if rng.random() < 0.1:
+            line += " ~ ¦"
+        noisy.append(line)
+    return "\n".join(noisy)
+
+def build_corpus(sizes: List[float], seed: int = 0) -> Dict[str, List[str]]:
+    """
+    One document per contract kind for each size
+
+    Returns:
+        {"<pages>p": [texts...]}
+    """
+    return {
+        f"{size:g}p": [generate_contract(size, kind, seed) for kind in CLAUSE_TEMPLATES]
+        for size in sizes
+    }
@@ -0,0 +1,289 @@
+"""
+Load generator for the FastAPI service
+
+Drives /analyze-text, /analyze-file (native and scanned PDFs) and /export-pdf at
+a given concurrency and reports latency percentiles, error rates, throughput
+and, for the NDJSON streams, the time to the first event. With --stub the Hugging
+Face endpoints (Mistral risk analysis, OCR refinement) are replaced by the local
+stub of stub_server.py, so runs need no network access.
+
+Usage:
+    # Service already running (started with the stub_env() variables)
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --concurrency 16
+
+    # Start the stub and the service (uvicorn, N workers) for the duration of the run
+    python -m benchmarks.load_test --spawn --workers 2 --stub --stub-latency-ms 400
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import generate_contract
+from benchmarks.run import RESULTS_DIR, environment, percentile
+from benchmarks.stub_server import DEFAULT_PORT as DEFAULT_STUB_PORT, start_stub_server, stub_env
+
+SCENARIOS = ("analyze-text", "analyze-file-native", "analyze-file-scanned", "export-pdf")
+DEFAULT_BASE_URL = "http://127.0.0.1:8000"
+SCANNED_DPI = 100
+REQUEST_TIMEOUT = 600  # Scanned PDFs under load can take minutes
+STARTUP_TIMEOUT = 300  # Spawned service: wait for /ready (model warm-up)
+
+def unique_contract(pages: float, index: int, cached: bool) -> str:
+    """Contract text; a per-request reference defeats the result caches unless cached=True"""
+    text = generate_contract(pages, kind=("bail", "travail", "prestation")[index % 3], seed=0 if cached else index)
+    return text if cached else f"Référence dossier n° LT-{index:06d}\n{text}"
+
+def make_native_pdf(text: str) -> bytes:
+    """Text-layer PDF, one A4 page per ~3000 characters"""
+    import fitz
+
+    doc = fitz.open()
+    try:
+        for start in range(0, len(text), 3000):
+            page = doc.new_page()
+            page.insert_textbox(fitz.Rect(50, 50, 545, 800), text[start:start + 3000], fontsize=8)
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+def make_scanned_pdf(text: str, dpi: int = SCANNED_DPI) -> bytes:
+    """Image-only PDF: the native pages rasterized (no text layer, forces the OCR path)"""
+    import fitz
+
+    native = fitz.open(stream=make_native_pdf(text), filetype="pdf")
+    scanned = fitz.open()
+    try:
+        for page in native:
+            pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            target = scanned.new_page(width=page.rect.width, height=page.rect.height)
+            target.insert_image(target.rect, stream=pix.tobytes("png"))
+        return scanned.tobytes()
+    finally:
+        native.close()
+        scanned.close()
+
+def build_payloads(scenario: str, count: int, pages: float, cached: bool,
+                   analysis: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """httpx request arguments for each request of a scenario (generated before timing)"""
+    payloads = []
+    for i in range(count):
+        if scenario == "analyze-text":
+            payloads.append({"url": "/analyze-text", "json": {"text": unique_contract(pages, i, cached)}})
+        elif scenario == "export-pdf":
+            payloads.append({"url": "/export-pdf", "json": analysis})
+        else:
+            text = unique_contract(pages, i, cached)
+            pdf = make_native_pdf(text) if scenario == "analyze-file-native" else make_scanned_pdf(text)
+            payloads.append({
+                "url": "/analyze-file",
+                "files": {"file": (f"contrat-{i}.pdf", pdf, "application/pdf")},
+                "stream": True
+            })
+    return payloads
+
+async def send(client: httpx.AsyncClient, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    One request; streams are read line by line until their last event
+
+    Returns:
+        {"ok", "status", "latency", "first_event" (streams only), "error"}
+    """
+    stream = payload.get("stream", False)
+    request = {key: value for key, value in payload.items() if key not in ("url", "stream")}
+    start = time.perf_counter()
+    sample: Dict[str, Any] = {"ok": False, "status": None, "first_event": None, "error": None}
+    try:
+        if not stream:
+            response = await client.post(payload["url"], **request)
+            sample["status"] = response.status_code
+            sample["ok"] = response.status_code == 200
+            if not sample["ok"]:
+                sample["error"] = f"HTTP {response.status_code}"
+        else:
+            async with client.stream("POST", payload["url"], **request) as response:
+                sample["status"] = response.status_code
+                last_event = None
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    if sample["first_event"] is None:
+                        sample["first_event"] = time.perf_counter() - start
+                    last_event = json.loads(line)
+                # A 200 stream can still end on an "error" event
+                sample["ok"] = response.status_code == 200 and bool(last_event) and last_event.get("type") == "complete"
+                if not sample["ok"]:
+                    sample["error"] = (last_event or {}).get("error") or f"HTTP {response.status_code}"
+    except (httpx.HTTPError, ValueError) as e:
+        sample["error"] = f"{type(e).__name__}: {e}"
+    sample["latency"] = time.perf_counter() - start
+    return sample
+
+async def run_scenario(client: httpx.AsyncClient, payloads: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    """Fire every payload, at most `concurrency` in flight, and summarize"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(payload):
+        async with semaphore:
+            return await send(client, payload)
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(bounded(payload) for payload in payloads))
+    wall = time.perf_counter() - start
+    return summarize(samples, wall)
+
+def summarize(samples: List[Dict[str, Any]], wall: float) -> Dict[str, Any]:
+    """Latency percentiles (ms), error rate, throughput and time to first event"""
+    latencies = [s["latency"] for s in samples if s["ok"]]
+    first_events = [s["first_event"] for s in samples if s["first_event"] is not None]
+    errors = [s["error"] for s in samples if not s["ok"]]
+
+    def ms(values, pct):
+        return round(percentile(values, pct) * 1000, 1) if values else None
+
+    summary = {
+        "requests": len(samples),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / wall, 3) if wall else 0.0,
+        "wall_s": round(wall, 3),
+        "latency_ms": {"p50": ms(latencies, 50), "p95": ms(latencies, 95), "p99": ms(latencies, 99),
+                       "max": round(max(latencies) * 1000, 1) if latencies else None},
+        "error_samples": sorted(set(errors))[:5],
+    }
+    if first_events:
+        summary["first_event_ms"] = {"p50": ms(first_events, 50), "p95": ms(first_events, 95)}
+    return summary
+
+def spawn_service(port: int, workers: int, env: Dict[str, str]) -> subprocess.Popen:
+    """uvicorn main:app with the given environment (stub URLs)"""
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+               "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=ROOT, env={**os.environ, **env})
+
+async def wait_ready(client: httpx.AsyncClient, process: Optional[subprocess.Popen], timeout: float = STARTUP_TIMEOUT):
+    """Poll /ready until the service has warmed its models"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Service exited with code {process.returncode}")
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(1)
+    raise TimeoutError(f"Service not ready after {timeout:.0f}s")
+
+async def run_load_test(args) -> Dict[str, Any]:
+    stub = None
+    service = None
+    env = {}
+    if args.stub:
+        stub = start_stub_server(port=args.stub_port, latency_ms=args.stub_latency_ms,
+                                 jitter_ms=args.stub_jitter_ms, error_rate=args.stub_error_rate)
+        env = stub_env("127.0.0.1", stub.server_port)
+        print(f"🧪 Inference stub on port {stub.server_port} ({args.stub_latency_ms:g} ms +{args.stub_jitter_ms:g} ms, "
+              f"{args.stub_error_rate:.0%} errors)")
+        if not args.spawn:
+            print("   The service must have been started with:")
+            for key, value in env.items():
+                print(f"   {key}={value}")
+
+    base_url = args.base_url
+    if args.spawn:
+        service = spawn_service(args.port, args.workers, env)
+        base_url = f"http://127.0.0.1:{args.port}"
+        print(f"🚀 Service started (uvicorn, {args.workers} worker(s)) on {base_url}")
+
+    timeout = httpx.Timeout(REQUEST_TIMEOUT, connect=10)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+            await wait_ready(client, service)
+
+            # One analysis up front: warms the pipeline and provides the /export-pdf body
+            analysis = None
+            warmup = await client.post("/analyze-text", json={"text": unique_contract(args.pages, 0, True)})
+            if warmup.status_code == 200:
+                analysis = warmup.json()
+            else:
+                print(f"⚠️ Warm-up analysis failed (HTTP {warmup.status_code})")
+
+            for scenario in args.scenarios:
+                if scenario == "export-pdf" and analysis is None:
+                    print("⏭️ export-pdf skipped (no analysis to export)")
+                    continue
+                payloads = build_payloads(scenario, args.requests, args.pages, args.cached, analysis)
+                print(f"▶️ {scenario}: {args.requests} requests, concurrency {args.concurrency}")
+                summary = await run_scenario(client, payloads, args.concurrency)
+                results[scenario] = summary
+                latency = summary["latency_ms"]
+                line = (f"   p50 {latency['p50']} ms  p95 {latency['p95']} ms  p99 {latency['p99']} ms  "
+                        f"{summary['throughput_rps']} req/s  errors {summary['error_rate']:.1%}")
+                if "first_event_ms" in summary:
+                    line += f"  first event p50 {summary['first_event_ms']['p50']} ms"
+                print(line)
+                for error in summary["error_samples"]:
+                    print(f"   ❌ {error}")
+    finally:
+        if service is not None:
+            service.terminate()
+            try:
+                service.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                service.kill()
+        if stub is not None:
+            stub.shutdown()
+
+    meta = environment(base_url=base_url, concurrency=args.concurrency, requests=args.requests,
+                       pages=args.pages, cached=args.cached, stub=args.stub,
+                       workers=args.workers if args.spawn else None)
+    return {"meta": meta, "results": results}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the contract analysis service")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="Service to test (ignored with --spawn)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per scenario")
+    parser.add_argument("--pages", type=float, default=3, help="Pages per generated contract")
+    parser.add_argument("--cached", action="store_true", help="Send identical documents (measures cache hits)")
+    parser.add_argument("--spawn", action="store_true", help="Start the service with uvicorn for the run")
+    parser.add_argument("--port", type=int, default=8001, help="Port of the spawned service")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the spawned service")
+    parser.add_argument("--stub", action="store_true", help="Serve the Hugging Face endpoints locally")
+    parser.add_argument("--stub-port", type=int, default=DEFAULT_STUB_PORT, help="Stub port (0: any free port, with --spawn)")
+    parser.add_argument("--stub-latency-ms", type=float, default=300)
+    parser.add_argument("--stub-jitter-ms", type=float, default=100)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/load-<commit>-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load_test(args))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"load-{report['meta']['commit'] or 'nogit'}-{stamp}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Results written to {output}")
+    return 1 if any(summary["errors"] for summary in report["results"].values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+Benchmark harness for the analysis pipeline
+
+Runs the text stages (cleaning, chunking, contract detection, RAG, OCR cleanup)
+and the full ContractAIPipeline.process over a generated corpus of several
+sizes, reports p50/p95 latency, ops/sec and peak memory per stage, and writes
+the results as JSON so two commits can be compared.
+
+Usage:
+    python -m benchmarks.run                               # stub models, 1/5/20 pages
+    python -m benchmarks.run --sizes 1 50 --repeat 20
+    python -m benchmarks.run --models real                 # load the transformers models
+    python -m benchmarks.run --compare benchmarks/results/<baseline>.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import build_corpus, generate_ocr_text
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_SIZES = [1, 5, 20]
+DEFAULT_REPEAT = 10
+WARMUP_RUNS = 1
+REGRESSION_THRESHOLD = 0.10  # p50 slower by more than 10% -> flagged
+OCR_STAGES = {"ocr_clean"}  # Measured on OCR-noised text instead of clean contracts
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile (samples need not be sorted)"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def measure(fn: Callable[[Any], Any], inputs: List[Any], repeat: int) -> Dict[str, float]:
+    """
+    Time fn over every input, `repeat` rounds, then measure peak memory in a separate run
+
+    Args:
+        fn: Callable taking one input
+        inputs: Documents of one corpus size
+        repeat: Timed rounds over the inputs
+
+    Returns:
+        Latency percentiles (ms), ops/sec and peak traced memory (MiB)
+    """
+    for _ in range(WARMUP_RUNS):
+        for item in inputs:
+            fn(item)
+
+    timings = []
+    for _ in range(repeat):
+        for item in inputs:
+            gc.collect()
+            start = time.perf_counter()
+            fn(item)
+            timings.append(time.perf_counter() - start)
+
+    # tracemalloc slows allocations down, so peak memory gets its own untimed pass
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for item in inputs:
+            fn(item)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "runs": len(timings),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "ops_per_sec": round(len(timings) / sum(timings), 2) if sum(timings) else 0.0,
+        "peak_mem_mib": round(peak / (1024 * 1024), 3),
+    }
+
+def stub_models():
+    """
+    Replace the model calls with deterministic stand-ins
+
+    Keeps the benchmark focused on the pipeline's own code (and runnable
+    without transformers or a Mistral key).
+    """
+    from ai_models import ai_models
+
+    def extract_entities(text):
+        return [{"entity_group": "PER", "word": "Jean Dupont", "start": 0, "end": 11, "score": 0.99}]
+
+    def summarize_clauses(texts):
+        return [text[:150] for text in texts]
+
+    async def analyze_risk_mistral_async(clause_text, clause_type, contract_type):
+        return None
+
+    ai_models.extract_entities = extract_entities
+    ai_models.summarize_clauses = summarize_clauses
+    ai_models.summarize_clause = lambda text: summarize_clauses([text])[0]
+    ai_models.analyze_risk_mistral = lambda *args: None
+    ai_models.analyze_risk_mistral_async = analyze_risk_mistral_async
+    ai_models.classify_contract = lambda text, labels: {"labels": list(labels), "scores": [1.0] + [0.0] * (len(labels) - 1)}
+
+def build_stages(models: str, loop: asyncio.AbstractEventLoop) -> Dict[str, Optional[Callable[[str], Any]]]:
+    """
+    Stage name -> callable taking a contract text (None when unavailable here)
+
+    Args:
+        models: "stub" or "real"
+        loop: Event loop running every async stage. One loop for the whole run,
+              as in the service: the shared httpx client is bound to the loop
+              it was first used on and breaks under a new asyncio.run loop
+    """
+    from preprocessing.cleaner import TextCleaner
+    from preprocessing.chunker import SmartChunker
+    from knowledge.contract_detector import contract_detector
+    from extraction.ocr_cleaner import ocr_cleaner
+    from rag_service import get_rag_service
+    from utils.cache import ResultCache
+    import ai_models as ai_models_module
+    import pipeline
+
+    if models == "stub":
+        stub_models()
+
+    # Private, memory-only caches: cleared between rounds, never replayed from
+    # AI_CACHE_DIR, and stub results never reach the service's entries
+    analysis_cache = pipeline.analysis_cache = ResultCache("bench_analysis", disk_dir=None)
+    verdict_cache = ai_models_module.verdict_cache = ResultCache("bench_verdicts", disk_dir=None)
+
+    cleaner = TextCleaner()
+    chunker = SmartChunker(max_chunk_size=1000)
+    keyword_rag = get_rag_service()
+
+    def rag_keyword(text):
+        clauses = [(chunk["text"], chunk["type"]) for chunk in chunker.chunk(text)]
+        return keyword_rag.enrich_clauses_batch(clauses)
+
+    try:
+        from rag_service_semantic import get_semantic_rag_service
+        semantic_rag = get_semantic_rag_service()
+
+        def rag_semantic(text):
+            clauses = [(chunk["text"], chunk["type"]) for chunk in chunker.chunk(text)]
+            return semantic_rag.enrich_clauses_batch(clauses)
+    except Exception as e:
+        print(f"⏭️ Semantic RAG unavailable: {e}")
+        rag_semantic = None
+
+    def pipeline_process(text):
+        # Cold analysis every time: cache hits would only measure the replay
+        analysis_cache.clear()
+        verdict_cache.clear()
+        return loop.run_until_complete(pipeline.get_pipeline().process(text))
+
+    return {
+        "clean": cleaner.clean,
+        "chunk": chunker.chunk,
+        "detect_contract_type": contract_detector.detect_contract_type,
+        "rag_keyword": rag_keyword,
+        "rag_semantic": rag_semantic,
+        "ocr_clean": ocr_cleaner.clean_text,
+        "pipeline_process": pipeline_process,
+    }
+
+def run_benchmarks(sizes: List[float], repeat: int, models: str, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Run every stage over every corpus size
+
+    Returns:
+        {"meta": {...}, "results": {stage: {size: stats}}, "skipped": [...]}
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        stages = build_stages(models, loop)
+        corpus = build_corpus(sizes)
+        ocr_corpus = {f"{size:g}p": [generate_ocr_text(size, seed) for seed in range(3)] for size in sizes}
+
+        results: Dict[str, Dict[str, Any]] = {}
+        skipped = []
+        for stage, fn in stages.items():
+            if only and stage not in only:
+                continue
+            inputs_by_size = ocr_corpus if stage in OCR_STAGES else corpus
+            if fn is None:
+                skipped.append(stage)
+                continue
+            results[stage] = {}
+            for size_label, inputs in inputs_by_size.items():
+                # The full pipeline is much slower: fewer rounds keep the run short
+                rounds = max(1, repeat // 5) if stage == "pipeline_process" else repeat
+                stats = measure(fn, inputs, rounds)
+                stats["chars"] = sum(len(text) for text in inputs) // len(inputs)
+                results[stage][size_label] = stats
+                print(f"  {stage:<22} {size_label:>5}  p50 {stats['p50_ms']:>10.3f} ms  "
+                      f"p95 {stats['p95_ms']:>10.3f} ms  {stats['ops_per_sec']:>9.2f} ops/s  "
+                      f"peak {stats['peak_mem_mib']:>8.3f} MiB")
+    finally:
+        from ai_models import mistral_client
+        loop.run_until_complete(mistral_client.aclose())
+        loop.close()
+
+    return {"meta": environment(models=models, sizes=sizes, repeat=repeat), "results": results, "skipped": skipped}
+
+def environment(**params) -> Dict[str, Any]:
+    """Run metadata stored with the results (to compare like with like)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        **params,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """
+    p50 changes between two result files
+
+    Returns:
+        Stage/size entries slower than baseline by more than threshold
+    """
+    print(f"\nComparison with {baseline['meta'].get('commit')} (threshold {threshold:.0%}):")
+    regressions = []
+    for stage, sizes in current["results"].items():
+        for size_label, stats in sizes.items():
+            base = baseline["results"].get(stage, {}).get(size_label)
+            if not base or not base["p50_ms"]:
+                continue
+            change = stats["p50_ms"] / base["p50_ms"] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  ⚠️ regression"
+                regressions.append(f"{stage}[{size_label}]")
+            elif change < -threshold:
+                flag = "  ✅ faster"
+            print(f"  {stage:<22} {size_label:>5}  {base['p50_ms']:>10.3f} -> {stats['p50_ms']:>10.3f} ms  ({change:+.1%}){flag}")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the contract analysis pipeline")
+    parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES, help="Document sizes in pages")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed rounds per stage and size")
+    parser.add_argument("--models", choices=["stub", "real"], default="stub",
+                        help="stub: deterministic model stand-ins, real: load the transformers models / call Mistral")
+    parser.add_argument("--stages", nargs="+", help="Only run these stages")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>-<timestamp>.json)")
+    parser.add_argument("--compare", help="Baseline result file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="Regression threshold on p50")
+    args = parser.parse_args(argv)
+
+    # Stage logs (and the per-call fallback warnings of stub mode) would drown the report
+    logging.disable(logging.ERROR)
+
+    print(f"🏁 Benchmarking sizes {args.sizes} pages, {args.repeat} rounds, models={args.models}")
+    report = run_benchmarks(args.sizes, args.repeat, args.models, args.stages)
+    if report["skipped"]:
+        print(f"⏭️ Skipped (unavailable here): {', '.join(report['skipped'])}")
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{report['meta']['commit'] or 'nogit'}-{stamp}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Local stand-in for the Hugging Face inference endpoints
+
+Answers the Mistral risk prompts (analyze_risk_mistral) and the OCR grammar
+refinement calls (OCRTextRefiner) with canned, deterministic responses after a
+configurable latency, optionally failing a share of the requests. Point the
+service at it with:
+
+    MISTRAL_API_URL=http://127.0.0.1:8090/models/mistral
+    OCR_REFINER_API_URL=http://127.0.0.1:8090/models/refiner
+    HUGGINGFACE_API_KEY=stub HUGGINGFACE_API_TOKEN=stub
+
+Usage:
+    python -m benchmarks.stub_server --port 8090 --latency-ms 400 --jitter-ms 200 --error-rate 0.02
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+
+DEFAULT_PORT = 8090
+RISK_LEVELS = ("low", "medium", "high")
+REFINER_MARKER = "Texte :\n"  # End of OCRTextRefiner.system_prompt
+
+def stub_env(host: str, port: int) -> Dict[str, str]:
+    """Environment variables pointing the service at the stub"""
+    base = f"http://{host}:{port}"
+    return {
+        "MISTRAL_API_URL": f"{base}/models/mistral",
+        "OCR_REFINER_API_URL": f"{base}/models/refiner",
+        # Both clients skip the API entirely without a token
+        "HUGGINGFACE_API_KEY": "stub",
+        "HUGGINGFACE_API_TOKEN": "stub",
+    }
+
+def _risk_verdict(prompt: str) -> str:
+    """Deterministic verdict for a clause (same prompt, same level)"""
+    level = RISK_LEVELS[int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % len(RISK_LEVELS)]
+    verdict = {
+        "risk_level": level,
+        "explanation": f"Réponse simulée (niveau {level}).",
+        "recommendation": "Vérifier la clause avec un juriste."
+    }
+    return "Voici l'analyse :\n" + json.dumps(verdict, ensure_ascii=False)
+
+def respond(payload: Dict[str, Any]) -> Tuple[int, Any]:
+    """Status code and JSON body for one inference request"""
+    prompt = str(payload.get("inputs", ""))
+    if REFINER_MARKER in prompt:
+        # Grammar refinement: echo the paragraph (always passes the safety checks)
+        paragraph = prompt.split(REFINER_MARKER, 1)[1].lstrip("\n")
+        return 200, [{"generated_text": paragraph}]
+    return 200, [{"generated_text": _risk_verdict(prompt)}]
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+    requests_served = 0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, {"error": "invalid JSON"})
+            return
+
+        with self.rng_lock:
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            fail = self.rng.random() < self.error_rate
+            StubHandler.requests_served += 1
+        time.sleep(delay)
+        if fail:
+            self._send(503, {"error": "Model is currently loading (simulated)"})
+            return
+        self._send(*respond(payload))
+
+    def _send(self, status: int, body: Any):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # One line per request would drown the load test output
+
+def start_stub_server(host: str = "127.0.0.1", port: int = DEFAULT_PORT, latency_ms: float = 0,
+                      jitter_ms: float = 0, error_rate: float = 0.0, seed: int = 0) -> ThreadingHTTPServer:
+    """
+    Serve the stub in a daemon thread
+
+    Args:
+        latency_ms: Base response time of every call
+        jitter_ms: Extra uniform random delay (0..jitter_ms)
+        error_rate: Share of calls answered with 503
+        seed: Seed of the jitter/error draws
+
+    Returns:
+        The running server (call shutdown() to stop it; port 0 picks a free port)
+    """
+    handler = type("ConfiguredStubHandler", (StubHandler,), {
+        "latency": latency_ms / 1000,
+        "jitter": jitter_ms / 1000,
+        "error_rate": error_rate,
+        "rng": random.Random(seed),
+        "rng_lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="hf-stub", daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the Hugging Face inference endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"🧪 Inference stub listening on http://{args.host}:{server.server_port}")
+    for key, value in stub_env(args.host, server.server_port).items():
+        print(f"   {key}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Page layout analysis for OCR (NumPy, no OpenCV)
+Projection profiles over a grayscale page image: text line heights, used to
+pick the OCR rendering resolution, and the text regions OCR is limited to.
+"""
+
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Pixels darker than this count as ink (0 = black, 255 = white)
+INK_THRESHOLD = int(os.getenv("OCR_INK_THRESHOLD", "160"))
+
+# Blank stretch (in text line heights) that separates two regions: blank lines
+# between paragraphs stay inside a region, blank half-pages split it
+REGION_GAP_LINES = float(os.getenv("OCR_REGION_GAP_LINES", "2"))
+
+Box = Tuple[int, int, int, int]  # (left, top, right, bottom), right/bottom exclusive
+
+def ink_mask(gray: np.ndarray, threshold: int = INK_THRESHOLD) -> np.ndarray:
+    """Boolean mask of dark pixels of a 2-D uint8 grayscale image"""
+    return gray < threshold
+
+def runs(profile: np.ndarray, min_value: float = 1) -> List[Tuple[int, int]]:
+    """
+    Maximal runs of consecutive entries >= min_value
+
+    Returns:
+        [(start, end)] with end exclusive
+    """
+    active = np.concatenate(([False], profile >= min_value, [False]))
+    edges = np.flatnonzero(active[1:] != active[:-1])
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+def estimate_line_height(gray: np.ndarray, threshold: int = INK_THRESHOLD) -> Optional[float]:
+    """
+    Median height (px) of the text lines of a page image
+
+    Rows holding ink form runs in the horizontal projection profile; each run is
+    a line of text (ascenders to descenders). Rules and specks are filtered out.
+
+    Args:
+        gray: 2-D uint8 grayscale image
+        threshold: Ink threshold
+
+    Returns:
+        Median line height in pixels, or None if no text line is found
+    """
+    if gray.ndim != 2 or gray.size == 0:
+        return None
+    mask = ink_mask(gray, threshold)
+    width = gray.shape[1]
+    # A text row has some ink but is not a solid rule across the page
+    profile = mask.sum(axis=1)
+    text_rows = (profile >= max(2, width // 200)) & (profile < width * 0.9)
+    heights = [end - start for start, end in runs(text_rows.astype(np.int8))]
+    heights = [h for h in heights if h >= 3]
+    if not heights:
+        return None
+    return float(np.median(heights))
+
+def merge_runs(spans: List[Tuple[int, int]], max_gap: int) -> List[Tuple[int, int]]:
+    """Join consecutive runs separated by fewer than max_gap entries"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in spans:
+        if merged and start - merged[-1][1] < max_gap:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def find_text_regions(gray: np.ndarray, line_height: Optional[float] = None,
+                      threshold: int = INK_THRESHOLD) -> List[Box]:
+    """
+    Boxes around the text of a page image, in reading order (top to bottom)
+
+    The horizontal projection profile splits the page into bands at blank
+    stretches taller than REGION_GAP_LINES lines; each band is trimmed to its
+    inked columns, so margins, blank half-pages and the space around signature
+    blocks are left out. Bands are not cut into columns: like Tesseract's
+    single-block mode they are read line by line, which keeps key/value tables
+    and side-by-side signature blocks in row order.
+
+    Args:
+        gray: 2-D uint8 grayscale image
+        line_height: Text line height in pixels (estimated when None)
+        threshold: Ink threshold
+
+    Returns:
+        Boxes padded by half a line and clipped to the image; [] for a blank page
+    """
+    if gray.ndim != 2 or gray.size == 0:
+        return []
+    mask = ink_mask(gray, threshold)
+    height, width = mask.shape
+    if line_height is None:
+        line_height = estimate_line_height(gray, threshold)
+    if not line_height:
+        # Ink but no regular text lines (handwriting, stamps): assume ~60 lines per page
+        line_height = max(4.0, height / 60)
+
+    gap = max(2, int(round(line_height * REGION_GAP_LINES)))
+    bands = merge_runs(runs(mask.sum(axis=1)), gap)
+    pad = max(1, int(line_height / 2))
+    min_ink = (line_height / 4) ** 2  # Less than a small printed mark (page number, asterisk): dust
+    regions = []
+    for top, bottom in bands:
+        if bottom - top < line_height / 3:
+            continue  # Rules
+        band = mask[top:bottom]
+        # Horizontal extent, ignoring isolated marks in the margins (dust, punch holes)
+        groups = merge_runs(runs(band.sum(axis=0)), gap)
+        groups = [(start, end) for start, end in groups if band[:, start:end].sum() >= min_ink]
+        if not groups:
+            continue
+        left, right = groups[0][0], groups[-1][1]
+        regions.append((max(0, left - pad), max(0, top - pad), min(width, right + pad), min(height, bottom + pad)))
+    return regions
@@ -9,6 +9,10 @@ import os
 
 logger = logging.getLogger(__name__)
 
+OCR_REFINER_MODEL = os.getenv("OCR_REFINER_MODEL", "pszemraj/flan-t5-base-grammar-synthesis")
+# Override to point at a local stub (load tests, offline development)
+OCR_REFINER_API_URL = os.getenv("OCR_REFINER_API_URL", f"https://huggingface.co/api/models/{OCR_REFINER_MODEL}")
+
 class OCRTextRefiner:
     """
     AI-powered text refinement for OCR output using HuggingFace Inference API
@@ -17,8 +21,8 @@ class OCRTextRefiner:
     """
     
     def __init__(self):
-        self.model_name = "pszemraj/flan-t5-base-grammar-synthesis"
-        self.api_url = f"https://huggingface.co/api/models/{self.model_name}"
+        self.model_name = OCR_REFINER_MODEL
+        self.api_url = OCR_REFINER_API_URL
         self.api_token = os.getenv("HUGGINGFACE_API_TOKEN", "")  # Optional, works without token but slower
         
         # Strict prompt to prevent creative rewriting
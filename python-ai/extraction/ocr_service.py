@@ -8,72 +8,326 @@ Designed to handle scanned PDFs and Images without requiring external system bin
 # ... (imports)
 # ... (imports)
 # ... (imports)
+import asyncio
 import logging
 import fitz  # PyMuPDF
-import easyocr
 import io
+import numpy as np
 import os
+import tempfile
+import threading
 import time
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from PIL import Image, ImageFilter
-import pytesseract
+
+from utils import run_cpu_bound, run_fitz, FITZ_LOCK
+from utils.metrics import STAGE_SECONDS, FALLBACKS, registry
+from utils.worker_pool import ProcessWorkerPool
+from extraction.layout import Box, estimate_line_height, find_text_regions
 
 logger = logging.getLogger(__name__)
 
+# Bump when a change alters extracted text (invalidates cached OCR results)
+OCR_VERSION = "1"
+
 # 1. Environment Optimization (Prevent CPU Starvation)
 os.environ["OMP_THREAD_LIMIT"] = "1"
 
+# 2. OCR worker processes: each keeps its EasyOCR model and Tesseract handle loaded
+# and OCRs one page at a time (single-threaded Tesseract), so N workers use N cores
+# and the models stay out of the web process. 0 = in-process mode. Default: one per
+# core, capped at 4 since every worker holds its own EasyOCR model in memory.
+OCR_PAGE_WORKERS = max(0, int(os.getenv("OCR_PAGE_WORKERS", str(min(4, os.cpu_count() or 1)))))
+OCR_WORKER_MAX_JOBS = int(os.getenv("OCR_WORKER_MAX_JOBS", "200"))  # Jobs before a worker is replaced (0 = never)
+OCR_JOB_TIMEOUT = float(os.getenv("OCR_JOB_TIMEOUT", "120"))  # Seconds per page/image before the worker is killed
+OCR_WORKER_START_TIMEOUT = float(os.getenv("OCR_WORKER_START_TIMEOUT", "300"))  # Model load (download on first run)
+OCR_PRELOAD_EASYOCR = os.getenv("OCR_PRELOAD_EASYOCR", "true").lower() in ("1", "true", "yes")
+
+# 3. Rendering resolution: chosen per page from the text line height measured on a
+# low-resolution preview, so small print gets more pixels and large print fewer
+OCR_DEFAULT_DPI = int(os.getenv("OCR_DEFAULT_DPI", "144"))  # No text lines found (former 2x zoom)
+OCR_MIN_DPI = int(os.getenv("OCR_MIN_DPI", "120"))
+OCR_MAX_DPI = int(os.getenv("OCR_MAX_DPI", "400"))
+OCR_TARGET_LINE_PX = int(os.getenv("OCR_TARGET_LINE_PX", "36"))  # Line height Tesseract reads best
+OCR_PREVIEW_DPI = 72
+
+# 4. Tesseract result accepted (no EasyOCR pass) above this mean word confidence (0-1)
+TESSERACT_MIN_CONFIDENCE = float(os.getenv("OCR_TESSERACT_MIN_CONFIDENCE", "0.75"))
+
+# 5. Region OCR: only the text regions of the rendered page are OCR'd (margins and
+# blank areas skipped); pages mostly covered by text are OCR'd whole
+OCR_REGIONS = os.getenv("OCR_REGIONS", "true").lower() in ("1", "true", "yes")
+OCR_REGION_MAX_COVERAGE = float(os.getenv("OCR_REGION_MAX_COVERAGE", "0.8"))  # Share of the page area
+
+# Gray level below which Tesseract's binarization keeps a pixel as ink
+BINARIZE_THRESHOLD = 180
+# Gray level below which a pixel counts as ink when looking for text regions: looser
+# than the binarization, since EasyOCR reads the grayscale crops (faint print included)
+REGION_INK_THRESHOLD = 200
+
+# Tesseract options shared by both bindings
+TESSERACT_CHAR_BLACKLIST = "¢§™®©"
+
+_ocr_pool = None
+_pytesseract = None
+_tesserocr = None
+_tesseract_handles = threading.local()
+
+def _load_pytesseract():
+    """Import pytesseract on first use (and locate the Windows binary if installed there)"""
+    global _pytesseract
+    if _pytesseract is None:
+        import pytesseract
+        tess_paths = [
+            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe"
+        ]
+        for path in tess_paths:
+            if os.path.exists(path):
+                pytesseract.pytesseract.tesseract_cmd = path
+                logger.info(f"✅ Tesseract found at: {path}")
+                break
+        _pytesseract = pytesseract
+    return _pytesseract
+
+def _load_tesserocr():
+    """tesserocr module, or False when it is not installed (pytesseract fallback)"""
+    global _tesserocr
+    if _tesserocr is None:
+        try:
+            import tesserocr
+            _tesserocr = tesserocr
+        except ImportError:
+            _tesserocr = False
+    return _tesserocr
+
+def tesseract_engine() -> str:
+    """Tesseract binding in use: "tesserocr" (in-process API) or "pytesseract" (CLI per call)"""
+    return "tesserocr" if _load_tesserocr() else "pytesseract"
+
+def _tesseract_handle(lang: str):
+    """
+    Persistent tesserocr API of the calling thread for lang (None without tesserocr)
+
+    The language data is loaded once per thread instead of starting a tesseract
+    process for every page. Handles are not thread-safe, hence one per thread.
+    """
+    tesserocr = _load_tesserocr()
+    if not tesserocr:
+        return None
+    handles = getattr(_tesseract_handles, "apis", None)
+    if handles is None:
+        handles = _tesseract_handles.apis = {}
+    if lang not in handles:
+        api = tesserocr.PyTessBaseAPI(lang=lang, oem=tesserocr.OEM.LSTM_ONLY)
+        api.SetVariable("preserve_interword_spaces", "1")
+        api.SetVariable("tessedit_char_blacklist", TESSERACT_CHAR_BLACKLIST)
+        handles[lang] = api
+    return handles[lang]
+
+def get_ocr_pool() -> Optional[ProcessWorkerPool]:
+    """Get or start the OCR worker processes (None in in-process mode, OCR_PAGE_WORKERS=0)"""
+    global _ocr_pool
+    if _ocr_pool is None and OCR_PAGE_WORKERS > 0:
+        _ocr_pool = ProcessWorkerPool(
+            "ocr",
+            "extraction.ocr_service:OCR_POOL_JOBS",
+            OCR_PAGE_WORKERS,
+            initializer_ref="extraction.ocr_service:_init_ocr_worker",
+            max_jobs=OCR_WORKER_MAX_JOBS,
+            job_timeout=OCR_JOB_TIMEOUT,
+            start_timeout=OCR_WORKER_START_TIMEOUT
+        )
+    return _ocr_pool
+
+def ocr_pool_health() -> Optional[Dict[str, Any]]:
+    """Worker states of the OCR pool (None if not started; never starts it)"""
+    return _ocr_pool.health() if _ocr_pool is not None else None
+
+def shutdown_ocr_pool():
+    """Stop the OCR worker processes (called on application shutdown)"""
+    global _ocr_pool
+    if _ocr_pool is not None:
+        _ocr_pool.shutdown(wait=False)
+        _ocr_pool = None
+
+def _init_ocr_worker() -> Dict[str, Any]:
+    """
+    OCR worker initializer: load the engines before the first job
+
+    Returns:
+        What the worker holds, reported in the pool health
+    """
+    info = {"tesseract": tesseract_engine(), "easyocr": False}
+    try:
+        _tesseract_handle("fra+eng")
+    except Exception as e:
+        logger.warning(f"⚠️ Tesseract handle not created: {e}")
+        info["tesseract_error"] = str(e)
+    if OCR_PRELOAD_EASYOCR:
+        try:
+            ocr_service._get_reader()
+            info["easyocr"] = True
+        except Exception as e:
+            # Pages then rely on Tesseract; EasyOCR is retried on first fallback
+            logger.warning(f"⚠️ EasyOCR not preloaded: {e}")
+            info["easyocr_error"] = str(e)
+    return info
+
+def _ocr_page_worker(pdf_path: str, page_index: int) -> Tuple[str, str, float, int, int]:
+    """
+    OCR worker job: render and OCR one page of the PDF at pdf_path.
+    
+    The document is opened for this page only. Workers outlive requests: one
+    kept open would hold the spooled upload after the request (undeletable on
+    Windows). Opening is cheap next to rendering and OCR.
+    
+    Returns:
+        (page_text, ocr_source, confidence, duration_ms, total_page_duration_ms)
+    """
+    start_time = time.time()
+    with fitz.open(pdf_path) as doc:
+        page_text, ocr_source, confidence, duration_ms = ocr_service._ocr_page(doc[page_index], page_index + 1)
+    return page_text, ocr_source, confidence, duration_ms, int((time.time() - start_time) * 1000)
+
+def _render_gray(page, dpi: int) -> np.ndarray:
+    """Render a PDF page to a 2-D uint8 grayscale array (view of the pixmap samples, no encoding)"""
+    # Only the MuPDF part is serialized: OCR of the rendered pixels runs unlocked
+    with FITZ_LOCK:
+        pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        samples, height, stride, width = pix.samples, pix.height, pix.stride, pix.width
+        del pix
+    # Rows may be padded: stride can exceed the width
+    return np.frombuffer(samples, dtype=np.uint8).reshape(height, stride)[:, :width]
+
+def _text_from_tesseract_data(data: Dict[str, List]) -> Tuple[str, float, int]:
+    """
+    Rebuild the text from pytesseract.image_to_data output and score it
+
+    Returns:
+        (text with one line per Tesseract line and blank lines between paragraphs,
+         mean word confidence weighted by word length (0-1), word count)
+    """
+    lines: Dict[Tuple[int, int, int], List[str]] = {}
+    scored = []
+    for word, conf, block, par, line in zip(data["text"], data["conf"], data["block_num"],
+                                            data["par_num"], data["line_num"]):
+        word = (word or "").strip()
+        conf = float(conf)
+        if not word or conf < 0:  # -1 = layout row, not a word
+            continue
+        lines.setdefault((block, par, line), []).append(word)
+        scored.append((word, conf))
+
+    parts, previous_paragraph = [], None
+    for (block, par, line), words in lines.items():
+        if previous_paragraph is not None and (block, par) != previous_paragraph:
+            parts.append("")
+        parts.append(" ".join(words))
+        previous_paragraph = (block, par)
+
+    return "\n".join(parts), _weighted_confidence(scored), len(scored)
+
+def _weighted_confidence(words: List[Tuple[str, float]]) -> float:
+    """Mean of Tesseract word confidences (0-100) weighted by word length, as 0-1"""
+    total_chars = sum(len(word) for word, _ in words)
+    if not total_chars:
+        return 0.0
+    return sum(conf * len(word) for word, conf in words) / total_chars / 100
+
+def _run_tesseract(image: Image.Image, lang: str, psm: int) -> Tuple[str, float, int]:
+    """
+    One Tesseract pass over a preprocessed image
+
+    Uses the thread's persistent tesserocr handle when available, otherwise
+    pytesseract (one tesseract process per call).
+
+    Returns:
+        (text, length-weighted word confidence 0-1, word count)
+    """
+    api = _tesseract_handle(lang)
+    if api is not None:
+        api.SetPageSegMode(psm)
+        api.SetImage(image)
+        api.Recognize()
+        words = [(word.strip(), float(conf)) for word, conf in api.MapWordConfidences()
+                 if word.strip() and conf >= 0]
+        return api.GetUTF8Text().strip(), _weighted_confidence(words), len(words)
+
+    custom_config = f"""
+    --oem 1
+    --psm {psm}
+    -c preserve_interword_spaces=1
+    -c tessedit_char_blacklist={TESSERACT_CHAR_BLACKLIST}
+    """
+    pytesseract = _load_pytesseract()
+    data = pytesseract.image_to_data(
+        image,
+        lang=lang,
+        config=custom_config,
+        output_type=pytesseract.Output.DICT
+    )
+    return _text_from_tesseract_data(data)
+
 class OCRService:
     _instance = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(OCRService, cls).__new__(cls)
-            cls._instance.reader = None # Lazy load
-            
-            # Configure Tesseract Path (Windows)
-            tess_paths = [
-                r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-                r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe"
-            ]
-            for path in tess_paths:
-                if os.path.exists(path):
-                    pytesseract.pytesseract.tesseract_cmd = path
-                    logger.info(f"✅ Tesseract found at: {path}")
-                    break
-                    
+            cls._instance.reader = None # Lazy load (easyocr/pytesseract are imported on first use)
         return cls._instance
 
     def _get_reader(self):
         """Lazy load EasyOCR reader (heavy model)"""
         if self.reader is None:
             logger.info("🧠 Loading EasyOCR model (fr, en)... This might take a moment.")
+            import easyocr
             self.reader = easyocr.Reader(['fr', 'en'], gpu=False) 
         return self.reader
 
-    def extract_text_from_image(self, image_bytes: bytes) -> str:
-        """Perform OCR on a single image (EasyOCR fallback)"""
+    def extract_text_from_image(self, image: Union[bytes, str, np.ndarray]) -> str:
+        """Perform OCR on a single image, given as bytes, file path or pixel array (EasyOCR fallback)"""
         reader = self._get_reader()
         try:
-            result = reader.readtext(image_bytes, detail=0, paragraph=True)
+            result = reader.readtext(image, detail=0, paragraph=True)
             return "\n\n".join(result)
         except Exception as e:
             logger.error(f"OCR Error on image: {e}")
             return ""
 
+    async def ocr_image_file(self, path: str) -> str:
+        """OCR an image file in an OCR worker process (in the CPU pool in in-process mode)"""
+        pool = get_ocr_pool()
+        if pool is None:
+            return await run_cpu_bound(self.extract_text_from_image, path)
+        try:
+            return await pool.run("image", path)
+        except Exception as e:
+            # Timeout or worker crash: same outcome as an unreadable image
+            logger.error(f"OCR Error on image: {e}")
+            return ""
+
     def optimized_tesseract_ocr(
         self,
-        image_bytes: bytes,
+        image: Union[bytes, Image.Image],
         lang: str = "fra+eng",
-        psm: int = 6
+        psm: int = 6,
+        regions: Optional[List[Box]] = None
     ) -> Dict[str, Any]:
         """
         Legal-grade optimized Tesseract OCR.
         
+        Args:
+            image: Encoded image bytes, or an already decoded PIL image (rendered page)
+            regions: Boxes to OCR, in reading order (default: the whole image);
+                     their texts are joined by blank lines, then cleaned once
+        
         Returns:
             {
                 "text": str,
-                "confidence": float,
+                "confidence": float (mean word confidence from Tesseract, 0-1),
+                "words": int,
                 "duration_ms": int,
                 "psm": int,
                 "engine": "tesseract"
@@ -83,32 +337,34 @@ class OCRService:
 
         try:
             # Load image
-            image = Image.open(io.BytesIO(image_bytes))
-
-            # 1️⃣ Preprocessing (CRITICAL)
-            image = image.convert("L")  # grayscale
-            image = image.filter(ImageFilter.MedianFilter(size=3))
-
-            # Adaptive binarization
-            image = image.point(lambda x: 0 if x < 180 else 255, "1")
-
-            # Explicit DPI
-            image.info["dpi"] = (300, 300)
-
-            # 2️⃣ Tesseract config (OPTIMIZED)
-            custom_config = f"""
-            --oem 1
-            --psm {psm}
-            -c preserve_interword_spaces=1
-            -c tessedit_char_blacklist=¢§™®©
-            """
-
-            # 3️⃣ OCR
-            text = pytesseract.image_to_string(
-                image,
-                lang=lang,
-                config=custom_config
-            )
+            if not isinstance(image, Image.Image):
+                image = Image.open(io.BytesIO(image))
+
+            texts, weighted, total_chars, word_count = [], 0.0, 0, 0
+            for box in regions or [None]:
+                crop = image if box is None else image.crop(box)
+
+                # 1️⃣ Preprocessing (CRITICAL)
+                crop = crop.convert("L")  # grayscale
+                crop = crop.filter(ImageFilter.MedianFilter(size=3))
+
+                # Adaptive binarization
+                crop = crop.point(lambda x: 0 if x < BINARIZE_THRESHOLD else 255, "1")
+
+                # Explicit DPI
+                crop.info["dpi"] = (300, 300)
+
+                # 2️⃣ + 3️⃣ OCR: one pass returns the words with their confidences
+                region_text, region_confidence, region_words = _run_tesseract(crop, lang, psm)
+                region_text = region_text.strip()
+                if region_text:
+                    texts.append(region_text)
+                    weighted += region_confidence * len(region_text)
+                    total_chars += len(region_text)
+                    word_count += region_words
+
+            text = "\n\n".join(texts)
+            confidence = weighted / total_chars if total_chars else 0.0
 
             duration_ms = int((time.time() - start_time) * 1000)
 
@@ -134,14 +390,10 @@ class OCRService:
                 logger.warning(f"⚠️ AI refinement skipped: {e}")
                 # Continue with Couche 1 text (safe fallback)
 
-            # 6️⃣ Confidence estimation (simple & stable)
-            words = text.split()
-            # Simple heuristic: longer text = likely improved confidence up to a point
-            confidence = min(0.99, 0.6 + (len(words) / 2000))
-
             return {
                 "text": text.strip(),
                 "confidence": round(confidence, 2),
+                "words": word_count,
                 "duration_ms": duration_ms,
                 "psm": psm,
                 "engine": "tesseract"
@@ -152,102 +404,202 @@ class OCRService:
             return {
                 "text": "",
                 "confidence": 0.0,
+                "words": 0,
                 "duration_ms": int((time.time() - start_time) * 1000),
                 "psm": psm,
                 "engine": "tesseract",
                 "error": str(e)
             }
 
-    async def process_scanned_pdf_stream(self, pdf_bytes: bytes):
+    def _choose_dpi(self, page) -> int:
+        """Rendering DPI bringing the page's text lines to about OCR_TARGET_LINE_PX pixels"""
+        return self._plan_page(page)[0]
+
+    def _plan_page(self, page) -> Tuple[int, Optional[float]]:
+        """
+        Resolution pre-pass on a low-resolution preview of the page
+        
+        Returns:
+            (rendering DPI, text line height at that DPI in pixels, or None when
+             the preview shows no text line)
+        """
+        try:
+            preview = _render_gray(page, OCR_PREVIEW_DPI)
+            line_height = estimate_line_height(preview)
+        except Exception as e:
+            logger.warning(f"   ⚠️ Layout analysis failed: {e}")
+            return OCR_DEFAULT_DPI, None
+        
+        if not line_height:
+            return OCR_DEFAULT_DPI, None
+        dpi = OCR_PREVIEW_DPI * OCR_TARGET_LINE_PX / line_height
+        dpi = int(min(OCR_MAX_DPI, max(OCR_MIN_DPI, round(dpi / 10) * 10)))
+        return dpi, line_height * dpi / OCR_PREVIEW_DPI
+    
+    def _text_regions(self, pixels: np.ndarray, line_height: Optional[float]) -> Optional[List[Box]]:
+        """
+        Text regions of the rendered page, the pixels OCR actually reads
+        
+        Looking on the full-resolution render (not the preview) keeps faint or
+        small print, which antialiasing washes out at preview resolution, inside
+        the crops; a page is only reported blank when this render has no ink.
+        
+        Returns:
+            Boxes in pixels, None to OCR the whole page, [] when the page is blank
+        """
+        if not OCR_REGIONS:
+            return None
+        try:
+            regions = find_text_regions(pixels, line_height, REGION_INK_THRESHOLD)
+        except Exception as e:
+            logger.warning(f"   ⚠️ Layout analysis failed: {e}")
+            return None
+        
+        covered = sum((right - left) * (bottom - top) for left, top, right, bottom in regions)
+        if covered > OCR_REGION_MAX_COVERAGE * pixels.size:
+            return None  # Cropping would save little
+        return regions
+
+    def _ocr_page(self, page, current_page: int) -> Tuple[str, str, float, int]:
+        """
+        Render one PDF page and OCR it (Tesseract first, EasyOCR fallback).
+        Blocking: call through run_cpu_bound from async code.
+        
+        The page is rendered once, in grayscale, at a DPI adapted to its text size;
+        both engines read the raw pixel buffer (no PNG encode/decode), and only
+        the text regions found on that render (blank pages are not OCR'd).
+        
+        Returns:
+            (page_text, ocr_source, confidence, duration_ms)
+        """
+        dpi, line_height = self._plan_page(page)
+        pixels = _render_gray(page, dpi)
+        regions = self._text_regions(pixels, line_height)
+        if regions == []:
+            logger.info(f"   ⬜ Page {current_page} is blank, OCR skipped")
+            return "", "blank", 0.0, 0
+        if regions is not None:
+            logger.info(f"   🔲 Page {current_page}: {len(regions)} text region(s)")
+        
+        # --- STRATEGIE HYBRIDE ---
+        # 1. Tentative Tesseract Optimisé
+        ocr_result = self.optimized_tesseract_ocr(Image.fromarray(pixels), regions=regions)
+        
+        # Tesseract's own word confidences decide, not the text length
+        if ocr_result["confidence"] >= TESSERACT_MIN_CONFIDENCE and len(ocr_result["text"]) > 20:
+            page_text = ocr_result["text"]
+            duration_ms = ocr_result["duration_ms"]
+            logger.info(f"   ⚡ Tesseract OK (Page {current_page}, {dpi} dpi): {len(page_text)} chars in {duration_ms}ms")
+            return page_text, "tesseract", ocr_result["confidence"], duration_ms
+        
+        # 2. Fallback EasyOCR
+        logger.info(f"   ⚠️ Tesseract low confidence ({ocr_result['confidence']}, {ocr_result['words']} words) or empty. Switching to EasyOCR...")
+        t0 = time.time()
+        try:
+            crops = [pixels] if regions is None else [pixels[top:bottom, left:right] for left, top, right, bottom in regions]
+            page_text = "\n\n".join(text for text in map(self.extract_text_from_image, crops) if text.strip())
+            # EasyOCR is generally robust if it works
+            return page_text, "easyocr", 0.90, int((time.time() - t0) * 1000)
+        except Exception as e:
+            logger.error(f"   ❌ EasyOCR Failed: {e}")
+            return "", "failed", 0.0, 0
+
+    def _page_result_event(self, current_page: int, page_text: str, ocr_source: str,
+                           confidence: float, duration_ms: int, total_page_duration: int) -> Dict[str, Any]:
+        """Build the page_done / page_warning event for an OCR'd page (and record its metrics)"""
+        # Recorded here, in the service process, also for pages OCR'd by pool workers
+        STAGE_SECONDS.observe(total_page_duration / 1000, stage="ocr_page")
+        if ocr_source not in ("tesseract", "blank"):
+            FALLBACKS.inc(component=f"ocr_{ocr_source}")
+        if page_text.strip():
+            return {
+                "type": "page_done",
+                "page": current_page,
+                "text_preview": page_text[:80] + "...",
+                "source": ocr_source,
+                "confidence": confidence,
+                "duration_ms": total_page_duration,
+                "message": f"Page {current_page} OK ({ocr_source.upper()} - {duration_ms}ms)"
+            }
+        return {
+            "type": "page_warning",
+            "page": current_page,
+            "message": f"Page {current_page} : Illisible / Vide"
+        }
+
+    async def process_scanned_pdf_stream(self, pdf: Union[bytes, str, "fitz.Document"],
+                                         pages: Optional[List[int]] = None,
+                                         page_texts: Optional[Dict[int, str]] = None):
         """
         Generator that yields OCR progress events (NDJSON friendly).
         Yields: Dicts with 'type', 'page', 'content', etc.
+        
+        Args:
+            pdf: PDF bytes, path, or an open document (e.g. the spooled upload shared
+                 with native extraction: it is neither re-opened nor closed here)
+            pages: 1-based page numbers to OCR (default: all; pages with a text layer are skipped by the caller)
+            page_texts: Filled with {page number: OCR text} for callers merging pages
+        
+        Pages are OCR'd by the persistent worker processes (OCR_PAGE_WORKERS in
+        parallel): page_start/page_done events arrive in completion order (each
+        carries its page number) while ocr_complete always assembles the text in
+        page order. With OCR_PAGE_WORKERS=0 they are OCR'd in-process, in order.
         """
-        full_text_accumulator = []
+        if page_texts is None:
+            page_texts = {}
+        owns_doc = isinstance(pdf, (bytes, bytearray, str))
+        doc = None
         
         try:
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            total_pages = len(doc)
+            if isinstance(pdf, str):
+                doc = await run_fitz(fitz.open, pdf)
+            elif owns_doc:
+                doc = await run_fitz(fitz.open, stream=pdf, filetype="pdf")
+            else:
+                doc = pdf
+            total_pages = await run_fitz(len, doc)
+            page_numbers = sorted(pages) if pages is not None else list(range(1, total_pages + 1))
             
             # 1. Init Event
             yield {
                 "type": "init", 
                 "total_pages": total_pages,
+                "ocr_pages": len(page_numbers),
                 "message": f"Document de {total_pages} pages détecté."
             }
             
-            logger.info(f"📄 PDF has {total_pages} pages. Starting Legal-Grade OCR Streaming...")
+            logger.info(f"📄 PDF has {total_pages} pages ({len(page_numbers)} to OCR). Starting Legal-Grade OCR Streaming...")
             
-            for page_num, page in enumerate(doc):
-                current_page = page_num + 1
-                start_time = time.time() # For total Page time
-                
-                yield {
-                    "type": "page_start", 
-                    "page": current_page,
-                    "message": f"Traitement Page {current_page}/{total_pages}..."
-                }
-                
-                # Render (Zoom=2 for quality ~150-200 DPI base)
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                img_bytes = pix.tobytes("png")
-                
-                # --- STRATEGIE HYBRIDE ---
-                # 1. Tentative Tesseract Optimisé
-                ocr_result = self.optimized_tesseract_ocr(img_bytes)
-                
-                page_text = ""
-                ocr_source = ""
-                confidence = 0.0
-                duration_ms = 0
-                
-                # Heuristic: Confidence > 0.75 AND text length > 20 chars
-                if ocr_result["confidence"] >= 0.75 and len(ocr_result["text"]) > 20:
-                    page_text = ocr_result["text"]
-                    ocr_source = "tesseract"
-                    confidence = ocr_result["confidence"]
-                    duration_ms = ocr_result["duration_ms"]
-                    logger.info(f"   ⚡ Tesseract OK (Page {current_page}): {len(page_text)} chars in {duration_ms}ms")
-                else:
-                    # 2. Fallback EasyOCR
-                    logger.info(f"   ⚠️ Tesseract low confidence ({ocr_result['confidence']}) or empty. Switching to EasyOCR...")
-                    t0 = time.time()
-                    try:
-                        page_text = self.extract_text_from_image(img_bytes)
-                        ocr_source = "easyocr"
-                        confidence = 0.90 # EasyOCR is generally robust if it works
-                        duration_ms = int((time.time() - t0) * 1000)
-                    except Exception as e:
-                        logger.error(f"   ❌ EasyOCR Failed: {e}")
-                        page_text = ""
-                        ocr_source = "failed"
-
-                # Event Payload
-                total_page_duration = int((time.time() - start_time) * 1000)
-                
-                if page_text.strip():
-                    formatted_text = f"--- Page {current_page} ---\n{page_text}"
-                    full_text_accumulator.append(formatted_text)
+            pool = get_ocr_pool()
+            if pool is not None and page_numbers:
+                # File-backed documents are read from their path, in-memory ones copied to a temp file
+                source = doc.name or (pdf if owns_doc else await run_fitz(doc.tobytes))
+                async for event in self._process_pages_parallel(pool, source, page_numbers, total_pages, page_texts):
+                    yield event
+            else:
+                for current_page in page_numbers:
+                    page = await run_fitz(doc.load_page, current_page - 1)
+                    start_time = time.time() # For total Page time
                     
                     yield {
-                        "type": "page_done",
+                        "type": "page_start", 
                         "page": current_page,
-                        "text_preview": page_text[:80] + "...",
-                        "source": ocr_source,
-                        "confidence": confidence,
-                        "duration_ms": total_page_duration,
-                        "message": f"Page {current_page} OK ({ocr_source.upper()} - {duration_ms}ms)"
+                        "message": f"Traitement Page {current_page}/{total_pages}..."
                     }
-                else:
-                    yield {
-                        "type": "page_warning",
-                        "page": current_page,
-                        "message": f"Page {current_page} : Illisible / Vide"
-                    }
-
-            doc.close()
+                    
+                    # Render + OCR run in the CPU pool so the event loop keeps serving
+                    page_text, ocr_source, confidence, duration_ms = await run_cpu_bound(
+                        self._ocr_page, page, current_page
+                    )
+                    
+                    page_texts[current_page] = page_text
+                    total_page_duration = int((time.time() - start_time) * 1000)
+                    yield self._page_result_event(current_page, page_text, ocr_source, confidence, duration_ms, total_page_duration)
             
-            complete_text = "\n\n".join(full_text_accumulator)
+            complete_text = "\n\n".join(
+                f"--- Page {page} ---\n{page_texts[page]}"
+                for page in sorted(page_texts) if page_texts[page].strip()
+            )
             
             yield {
                 "type": "ocr_complete",
@@ -262,6 +614,93 @@ class OCRService:
                 "error": str(e),
                 "message": "Erreur critique durant l'OCR."
             }
+        finally:
+            if owns_doc and doc is not None:
+                with FITZ_LOCK:
+                    doc.close()
+
+    async def _process_pages_parallel(self, pool: ProcessWorkerPool, pdf: Union[bytes, str],
+                                      page_numbers: List[int], total_pages: int, page_texts: Dict[int, str]):
+        """
+        OCR pages across the worker processes, keeping at most one page in flight per worker.
+        Fills page_texts and yields page events in completion order.
+        
+        Args:
+            pool: OCR worker pool
+            pdf: Path of the PDF on disk (spooled upload), or its bytes (copied to a temp file)
+            page_numbers: 1-based pages to OCR
+        """
+        # Workers open the PDF from disk instead of receiving the bytes with every page
+        temp_path = None
+        if isinstance(pdf, str):
+            pdf_path = pdf
+        else:
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                tmp.write(pdf)
+                pdf_path = temp_path = tmp.name
+        
+        loop = asyncio.get_running_loop()
+        in_flight = {}
+        queued = iter(page_numbers)
+        next_page = next(queued, None)
+        
+        try:
+            while next_page is not None or in_flight:
+                # Keep every worker busy
+                while next_page is not None and len(in_flight) < pool.workers:
+                    future = asyncio.wrap_future(pool.submit("pdf_page", pdf_path, next_page - 1), loop=loop)
+                    in_flight[future] = next_page
+                    yield {
+                        "type": "page_start", 
+                        "page": next_page,
+                        "message": f"Traitement Page {next_page}/{total_pages}..."
+                    }
+                    next_page = next(queued, None)
+                
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    current_page = in_flight.pop(future)
+                    try:
+                        page_text, ocr_source, confidence, duration_ms, total_page_duration = future.result()
+                    except Exception as e:
+                        logger.error(f"   ❌ OCR worker failed on page {current_page}: {e}")
+                        page_text, ocr_source, confidence, duration_ms, total_page_duration = "", "failed", 0.0, 0, 0
+                    
+                    page_texts[current_page] = page_text
+                    yield self._page_result_event(current_page, page_text, ocr_source, confidence, duration_ms, total_page_duration)
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError as e:
+                    # Windows refuses to delete a file a worker still has open (cancelled page still running)
+                    logger.warning(f"⚠️ Could not delete OCR temp file {temp_path}: {e}")
 
 # Global instance
 ocr_service = OCRService()
+
+# Jobs served by the OCR worker processes (resolved by name inside each worker)
+OCR_POOL_JOBS = {
+    "pdf_page": _ocr_page_worker,
+    "image": ocr_service.extract_text_from_image,
+}
+
+def _ocr_pool_metrics():
+    """OCR worker pool state, read by the /metrics endpoint (empty until the pool starts)"""
+    health = ocr_pool_health()
+    if health is None:
+        return
+    yield ("ai_ocr_workers_alive", "gauge", "OCR worker processes running",
+           [("", {}, health["alive"])])
+    yield ("ai_ocr_workers_busy", "gauge", "OCR worker processes running a job",
+           [("", {}, health["busy"])])
+    yield ("ai_ocr_jobs_queued", "gauge", "OCR jobs waiting for a free worker",
+           [("", {}, health["queued"])])
+    yield ("ai_ocr_jobs_total", "counter", "OCR jobs finished by the worker pool",
+           [("", {"outcome": "completed"}, health["completed"]), ("", {"outcome": "failed"}, health["failed"])])
+    yield ("ai_ocr_worker_events_total", "counter", "OCR worker replacements by cause",
+           [("", {"event": event}, health[event]) for event in ("timeouts", "crashes", "recycled")])
+
+registry.register_collector(_ocr_pool_metrics)
@@ -0,0 +1,43 @@
+"""
+Native PDF text extraction with per-page routing
+Pages with a usable text layer are read directly by PyMuPDF; only image-only
+pages are left for OCR (a scanned cover no longer sends a native document to
+OCR, and scanned annexes after a native first page are no longer dropped).
+"""
+
+import os
+from typing import Dict, Optional
+
+# A page goes to OCR when its text layer is shorter than this and it holds images
+NATIVE_PAGE_MIN_CHARS = int(os.getenv("AI_NATIVE_PAGE_MIN_CHARS", "50"))
+
+def extract_native_pages(doc, min_chars: int = NATIVE_PAGE_MIN_CHARS) -> Dict[int, Optional[str]]:
+    """
+    Per-page routing: text layer of each native page, None for pages that need OCR.
+    Blocking (PyMuPDF): call through run_fitz.
+    
+    Args:
+        doc: Open PyMuPDF document (shared with OCR for the scanned pages)
+        min_chars: Text layer length below which a page with images counts as scanned
+    
+    Returns:
+        {page number (1-based): text or None}
+    """
+    pages = {}
+    for page_num, page in enumerate(doc):
+        text = page.get_text()
+        # Short text over an image = scanned page (possibly with a stamp or header as text);
+        # short text without images = genuinely (almost) blank native page, nothing to OCR
+        scanned = len(text.strip()) <= min_chars and bool(page.get_images(full=False))
+        pages[page_num + 1] = None if scanned else text
+    return pages
+
+def assemble_pages(native_pages: Dict[int, Optional[str]], ocr_pages: Dict[int, str]) -> str:
+    """Full text in page order: text layers as extracted, OCR'd pages under a page marker"""
+    parts = []
+    for page in sorted(native_pages):
+        if native_pages[page] is not None:
+            parts.append(native_pages[page] + "\n")
+        elif ocr_pages.get(page, "").strip():
+            parts.append(f"--- Page {page} ---\n{ocr_pages[page]}\n\n")
+    return "".join(parts)
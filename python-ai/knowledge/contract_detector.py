@@ -4,10 +4,13 @@ Covers 100+ contract types across 9 strategic categories
 Production-ready for B2C, Freelance, and B2B markets
 """
 import re
-from typing import Dict, List, Tuple, Set
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, Set
 from dataclasses import dataclass
 from enum import Enum
 
+from knowledge.keyword_matcher import KeywordMatcher
+
 class ContractCategory(Enum):
     """Strategic contract categories"""
     DAILY_HOUSING = "Logement"
@@ -59,6 +62,22 @@ class ComprehensiveContractDetector:
         self.contract_types = self._build_contract_database()
         self.legal_references = self._build_legal_database()
         self.common_clauses = self._build_clause_database()
+        
+        # Keywords are lowercased and compiled once into a matcher shared by contract
+        # type and transversal clause detection: one scan of the text serves both
+        self._type_keywords = [
+            [(keyword, keyword.lower()) for keyword in contract_def.keywords]
+            for contract_def in self.contract_types
+        ]
+        self._clause_keywords = [
+            [(keyword, keyword.lower()) for keyword in clause.keywords]
+            for clause in self.common_clauses
+        ]
+        self._matcher = KeywordMatcher(
+            keyword_lower
+            for keywords in self._type_keywords + self._clause_keywords
+            for _, keyword_lower in keywords
+        )
 
     def _build_clause_database(self) -> List[ClauseType]:
         """Build database of transversal clauses to detect"""
@@ -123,33 +142,73 @@ class ComprehensiveContractDetector:
 
     # ... [Previous methods: _build_contract_database, _build_legal_database] ...
 
-    def detect_transversal_clauses(self, text: str) -> List[Dict]:
+    # Bounds on the hit details returned per detected clause
+    MAX_HITS_PER_CLAUSE = 5
+    SNIPPET_RADIUS = 80
+
+    def scan(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Scan the text once for every contract type and clause keyword.
+        Returns (start, end, keyword) hits; pass them to detect_contract_type and
+        detect_transversal_clauses to avoid scanning the same text again.
+        """
+        return list(self._matcher.find_all(text.lower()))
+
+    def detect_transversal_clauses(self, text: str, hits: Optional[List[Tuple[int, int, str]]] = None) -> List[Dict]:
         """
         Detect standard clauses present in the text regardless of contract type.
-        Returns a list of detected clauses with snippets.
+        Returns a list of detected clauses with the offsets and a bounded snippet
+        of each hit (at most MAX_HITS_PER_CLAUSE, in text order).
         """
+        if hits is None:
+            hits = self.scan(text)
+        # Offsets come from the lowercased text; they match text unless lowercasing changed its length
         text_lower = text.lower()
+        source = text if len(text_lower) == len(text) else text_lower
+
+        positions = defaultdict(list)
+        for start, end, keyword in hits:
+            positions[keyword].append((start, end))
+
         detected_clauses = []
 
-        for clause in self.common_clauses:
-            matches = []
-            for kw in clause.keywords:
-                if kw in text_lower:
-                    matches.append(kw)
+        for clause, keywords in zip(self.common_clauses, self._clause_keywords):
+            matches = [kw for kw, kw_lower in keywords if kw_lower in positions]
             
             if matches:
                 # Basic confidence based on keyword matches (1 match is enough for binary findings, but more is better)
-                # We could add snippet extraction here later
+                clause_hits = sorted(
+                    (start, end, kw)
+                    for kw, kw_lower in keywords
+                    for start, end in positions.get(kw_lower, [])
+                )
                 detected_clauses.append({
                     'id': clause.id,
                     'name': clause.name,
                     'risk_level': clause.risk_level,
                     'description': clause.description,
-                    'matches': matches
+                    'matches': matches,
+                    'hit_count': len(clause_hits),
+                    'hits': [
+                        {
+                            'keyword': kw,
+                            'start': start,
+                            'end': end,
+                            'snippet': self._snippet(source, start, end)
+                        }
+                        for start, end, kw in clause_hits[:self.MAX_HITS_PER_CLAUSE]
+                    ]
                 })
         
         return detected_clauses
 
+    def _snippet(self, text: str, start: int, end: int) -> str:
+        """Whitespace-normalized context around a hit"""
+        snippet = ' '.join(text[max(0, start - self.SNIPPET_RADIUS):end + self.SNIPPET_RADIUS].split())
+        prefix = '...' if start > self.SNIPPET_RADIUS else ''
+        suffix = '...' if end + self.SNIPPET_RADIUS < len(text) else ''
+        return f"{prefix}{snippet}{suffix}"
+
     
     def _build_contract_database(self) -> List[ContractTypeDefinition]:
         """Build comprehensive contract type database"""
@@ -803,76 +862,6 @@ class ComprehensiveContractDetector:
             ),
         ]
     
-    def _build_legal_database(self) -> Dict[str, List[LegalReference]]:
-        """Build legal references database (simplified for now)"""
-            # ========== 8. INSURANCE CONTRACTS (NEW) ==========
-            ContractTypeDefinition(
-                key='assurance_habitation',
-                name='Assurance Habitation (MRH)',
-                category=ContractCategory.DAILY_INSURANCE,
-                keywords=['multirisque habitation', 'mrh', 'dégât des eaux', 'incendie', 'vol', 'catastrophes naturelles', 'résidence principale'],
-                legal_codes=['code_assurances'],
-                priority=2
-            ),
-            ContractTypeDefinition(
-                key='assurance_auto',
-                name='Assurance Auto / Moto',
-                category=ContractCategory.DAILY_INSURANCE,
-                keywords=['assurance auto', 'bonus-malus', 'responsabilité civile', 'bris de glace', 'tiers collision', 'conducteur principal', 'carte verte', 'véhicule assuré'],
-                legal_codes=['code_assurances', 'code_route'],
-                priority=2
-            ),
-            ContractTypeDefinition(
-                key='assurance_sante',
-                name='Assurance Santé / Mutuelle',
-                category=ContractCategory.DAILY_INSURANCE,
-                keywords=['mutuelle', 'complémentaire santé', 'ticket modérateur', 'télétransmission', 'noemie', 'soins courants', 'dentaire', 'optique', 'remboursement sécu'],
-                legal_codes=['code_assurances', 'code_securite_sociale'],
-                priority=2
-            ),
-            ContractTypeDefinition(
-                key='assurance_prevoyance',
-                name='Assurance Prévoyance / Décès',
-                category=ContractCategory.DAILY_INSURANCE,
-                keywords=['prévoyance', 'capital décès', 'incapacité', 'invalidité', 'rente', 'bénéficiaire', 'accident de la vie'],
-                legal_codes=['code_assurances'],
-                priority=2
-            ),
-            ContractTypeDefinition(
-                key='assurance_emprunteur',
-                name='Assurance Emprunteur',
-                category=ContractCategory.DAILY_INSURANCE,
-                keywords=['assurance emprunteur', 'assurance prêt', 'perte d\'emploi', 'itt', 'ipt', 'quotité', 'hamon', 'bourquin', 'lemoine'],
-                legal_codes=['code_assurances', 'code_consommation'],
-                priority=3
-            ),
-            ContractTypeDefinition(
-                key='assurance_scolaire',
-                name='Assurance Scolaire',
-                category=ContractCategory.DAILY_INSURANCE,
-                keywords=['assurance scolaire', 'extra-scolaire', 'responsabilité civile enfant', 'dommages corporels', 'activités scolaires'],
-                legal_codes=['code_assurances'],
-                priority=3
-            ),
-            ContractTypeDefinition(
-                key='protection_juridique',
-                name='Protection Juridique',
-                category=ContractCategory.DAILY_INSURANCE,
-                keywords=['protection juridique', 'frais d\'avocat', 'litige', 'défense pénale', 'recours amiable', 'seuil d\'intervention'],
-                legal_codes=['code_assurances'],
-                priority=2
-            ),
-            ContractTypeDefinition(
-                key='assurance_rc_pro',
-                name='Assurance RC Pro',
-                category=ContractCategory.DAILY_INSURANCE,
-                keywords=['responsabilité civile professionnelle', 'rc pro', 'dommages causés aux tiers', 'exploitation', 'faute professionnelle'],
-                legal_codes=['code_assurances'],
-                priority=2
-            ),
-
-        ]
-
     def _build_legal_database(self) -> Dict[str, List[LegalReference]]:
         """Build database of legal references"""
         return {
@@ -920,23 +909,30 @@ class ComprehensiveContractDetector:
             ]
         }
     
-    def detect_contract_type(self, text: str) -> Tuple[str, float, str, ContractCategory]:
+    def detect_contract_type(self, text: str, hits: Optional[List[Tuple[int, int, str]]] = None) -> Tuple[str, float, str, ContractCategory]:
         """
         Detect contract type from text using intelligent keyword matching
         
+        Args:
+            text: Contract text
+            hits: Result of scan(text), if already computed
+        
         Returns:
             (contract_key, confidence_score, contract_name, category)
         """
-        text_lower = text.lower()
+        if hits is not None:
+            found = {keyword for _, _, keyword in hits}
+        else:
+            found = self._matcher.present(text.lower())
         scores = []
         
-        for contract_def in self.contract_types:
+        for contract_def, keywords in zip(self.contract_types, self._type_keywords):
             score = 0
             matches = []
             
             # Count keyword matches
-            for keyword in contract_def.keywords:
-                if keyword.lower() in text_lower:
+            for keyword, keyword_lower in keywords:
+                if keyword_lower in found:
                     score += 1
                     matches.append(keyword)
             
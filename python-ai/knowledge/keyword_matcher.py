@@ -0,0 +1,94 @@
+"""
+Multi-keyword matcher (Aho-Corasick)
+Finds every occurrence of a fixed keyword set in one pass over the text,
+independently of how many keywords there are.
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+try:
+    import ahocorasick  # pyahocorasick: C implementation, optional
+except ImportError:
+    ahocorasick = None
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton compiled once from a keyword list
+
+    Matching is plain substring matching (same semantics as `keyword in text`),
+    overlapping occurrences included. Keywords are matched as given: lowercase
+    both the keywords and the text for case-insensitive search.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted({kw for kw in keywords if kw})
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                self._automaton.add_word(kw, kw)
+            if self.keywords:
+                self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._build_trie()
+
+    def _build_trie(self):
+        """Build goto/fail/output tables (pure-Python fallback)"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[str]] = [[]]
+
+        for kw in self.keywords:
+            node = 0
+            for char in kw:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._outputs.append([])
+                node = next_node
+            self._outputs[node].append(kw)
+
+        # Breadth-first: fail links point to the longest proper suffix in the trie,
+        # and each node inherits the outputs reachable through its fail chain.
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+                queue.append(child)
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yield (start, end, keyword) for every occurrence, ordered by end offset
+
+        Args:
+            text: Text to scan (lowercase it for case-insensitive matching)
+        """
+        if not self.keywords:
+            return
+
+        if self._automaton is not None:
+            for end_index, kw in self._automaton.iter(text):
+                yield end_index + 1 - len(kw), end_index + 1, kw
+            return
+
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                for kw in outputs[node]:
+                    yield index + 1 - len(kw), index + 1, kw
+
+    def present(self, text: str) -> Set[str]:
+        """Set of keywords occurring at least once in text"""
+        return {kw for _, _, kw in self.find_all(text)}
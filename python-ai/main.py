@@ -1,8 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 import uvicorn
 import logging
+import asyncio
+import sys
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,13 +26,50 @@ else:
     # Fallback to standard .env
     load_dotenv()
 
-# Import AI pipeline
-from pipeline import ContractAIPipeline
+# The AI pipeline (models, detector, RAG, OCR) is imported on first use, not here:
+# /health answers as soon as the process starts, /ready once warm-up is done.
+from utils import run_cpu_bound, run_fitz, shutdown_executors, ocr_cache, SpooledUpload, UploadTooLarge, spool_upload
+from utils.metrics import registry, timed
+
+def warm_up_pipeline():
+    """
+    Import the pipeline and preload models (blocking: run off the event loop).
+    Components are selected with AI_PRELOAD_COMPONENTS (empty to disable).
+    """
+    from pipeline import get_pipeline, preload_components
+    get_pipeline()
+    return preload_components()
+
+async def warm_up(app: FastAPI):
+    logger.info("🔥 Warming AI pipeline...")
+    app.state.preload_status = await run_cpu_bound(warm_up_pipeline)
+    logger.info(f"✅ Pipeline warm: {app.state.preload_status}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start warming the pipeline in the background so the port opens immediately.
+    Traffic should be gated on /ready.
+    """
+    app.state.preload_status = {}
+    app.state.warmup = asyncio.create_task(warm_up(app))
+    yield
+    app.state.warmup.cancel()
+    # Only release what was actually loaded
+    ocr_module = sys.modules.get("extraction.ocr_service")
+    if ocr_module is not None:
+        ocr_module.shutdown_ocr_pool()
+    ai_module = sys.modules.get("ai_models")
+    if ai_module is not None:
+        await ai_module.mistral_client.aclose()
+        ai_module.mistral_client.close()
+    shutdown_executors(wait=False)
 
 app = FastAPI(
     title="Contract Analysis AI Service",
     description="AI-powered contract analysis using Hugging Face models",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS for Next.js
@@ -65,6 +106,34 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: 200 once the pipeline is warm, 503 while loading (or if warm-up failed)"""
+    warmup = app.state.warmup
+    if not warmup.done():
+        status = "loading"
+    elif warmup.cancelled() or warmup.exception() is not None:
+        status = "failed"
+    else:
+        status = "ready"
+    # The module may still be importing (warm-up thread): no attribute yet means nothing loaded
+    loaded_components = getattr(sys.modules.get("pipeline"), "loaded_components", None)
+    ocr_pool_health = getattr(sys.modules.get("extraction.ocr_service"), "ocr_pool_health", None)
+    return JSONResponse(
+        status_code=200 if status == "ready" else 503,
+        content={
+            "status": status,
+            "components": loaded_components() if loaded_components else {},
+            "preload": app.state.preload_status,
+            "ocr_pool": ocr_pool_health() if ocr_pool_health else None
+        }
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage durations, fallbacks, caches, micro-batching"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze_contract(request: AnalysisRequest):
     """
@@ -83,11 +152,9 @@ async def analyze_contract(request: AnalysisRequest):
     try:
         logger.info(f"📥 Received analysis request ({len(request.text)} chars)")
         
-        # Import pipeline (lazy loading to avoid startup delay)
-        from pipeline import ContractAIPipeline
-        
-        # Initialize pipeline (singleton pattern will be used)
-        pipeline = ContractAIPipeline()
+        # Shared pipeline (built and warmed in lifespan)
+        from pipeline import get_pipeline
+        pipeline = get_pipeline()
         
         # Process contract
         result = await pipeline.process(request.text)
@@ -101,67 +168,114 @@ async def analyze_contract(request: AnalysisRequest):
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 from fastapi import UploadFile, File, Form
-from extraction.ocr_service import ocr_service
-import fitz # PyMuPDF
-
 from fastapi.responses import StreamingResponse
 import json
+from extraction.pdf_text import extract_native_pages, assemble_pages
+
+PDF_PAGES = registry.counter(
+    "ai_pdf_pages_total",
+    "PDF pages by extraction path (native text layer or OCR)",
+    ["route"]
+)
+
+async def text_extraction_events(upload: SpooledUpload):
+    """
+    Extract text from a spooled upload, yielding NDJSON-friendly progress events.
+    The last event is "ocr_complete" (with full_text) unless OCR failed with "error".
+    Results are cached by upload content, so re-submitted files skip extraction.
+    PDFs are opened once (file-backed) for detection, extraction and OCR.
+    """
+    content_type = upload.content_type
+    cache_key = upload.cache_key
+    cached_text = ocr_cache.get(cache_key)
+    if cached_text is not None:
+        yield {"type": "info", "message": "Fichier déjà traité (cache)."}
+        yield {"type": "ocr_complete", "full_text": cached_text, "cached": True, "message": "Extraction terminée."}
+        return
+    
+    text = None
+    doc = None
+    native_pages = None
+    
+    # 1. Determine Extraction Method, page by page
+    if content_type == "application/pdf":
+        try:
+            doc = await run_fitz(upload.open_pdf)
+            native_pages = await timed("native_extraction", run_fitz(extract_native_pages, doc))
+        except Exception as e:
+            logger.warning(f"⚠️ Text layer extraction failed, OCR'ing every page: {e}")
+            native_pages = None
+    
+    if native_pages is not None:
+        ocr_numbers = [page for page, page_text in native_pages.items() if page_text is None]
+        PDF_PAGES.inc(len(native_pages) - len(ocr_numbers), route="native")
+        PDF_PAGES.inc(len(ocr_numbers), route="ocr")
+        yield {
+            "type": "page_routing",
+            "pages": [{"page": page, "route": "ocr" if page_text is None else "native"}
+                      for page, page_text in native_pages.items()],
+            "message": f"{len(native_pages) - len(ocr_numbers)} page(s) native(s), {len(ocr_numbers)} page(s) à OCRiser."
+        }
+        if not ocr_numbers:
+            text = assemble_pages(native_pages, {})
+            yield {"type": "info", "message": "PDF natif détecté (Extraction rapide)..."}
+            yield {"type": "ocr_complete", "full_text": text, "message": "Extraction terminée."}
+        else:
+            # 2. OCR only the image-only pages (same document, no second parse)
+            yield {"type": "info", "message": "Scan détecté. Démarrage OCR..."}
+            from extraction.ocr_service import ocr_service
+            ocr_pages = {}
+            async for event in ocr_service.process_scanned_pdf_stream(doc, pages=ocr_numbers, page_texts=ocr_pages):
+                if event["type"] == "ocr_complete":
+                    # Mixed PDF: merge with the text layers, in page order
+                    if len(ocr_numbers) < len(native_pages):
+                        event = dict(event, full_text=assemble_pages(native_pages, ocr_pages))
+                    text = event["full_text"]
+                yield event
+    else:
+        yield {"type": "info", "message": "Scan détecté. Démarrage OCR..."}
+        from extraction.ocr_service import ocr_service
+        if content_type == "application/pdf":
+            async for event in ocr_service.process_scanned_pdf_stream(upload.path):
+                if event["type"] == "ocr_complete":
+                    text = event["full_text"]
+                yield event
+        else:
+            # Image OCR (Simple for now, can be streamed if needed)
+            yield {"type": "page_start", "page": 1, "message": "Traitement image..."}
+            text = await timed("ocr_image", ocr_service.ocr_image_file(upload.path))
+            yield {"type": "ocr_complete", "full_text": text, "message": "Image analysée."}
+    
+    if text and text.strip():
+        ocr_cache.set(cache_key, text)
 
-async def analysis_stream_generator(file_obj, contents, contract_type):
+async def analysis_stream_generator(file_obj, contract_type):
     """
     Orchestrates the streaming process:
     1. OCR/Text Extraction (Yields progress)
     2. AI Analysis (Yields output)
     """
     text = ""
-    ocr_mode = False
     
     # CRITICAL: Yield immediately to start streaming
     yield json.dumps({"type": "info", "message": "Connexion établie. Lecture du fichier..."}) + "\n"
     
-    # Read file content inside generator (non-blocking for HTTP headers)
-    if contents is None:
-        contents = await file_obj.read()
-    
-    yield json.dumps({"type": "info", "message": "Fichier chargé. Analyse en cours..."}) + "\n"
+    # Spool the file inside the generator (non-blocking for HTTP headers, bounded memory)
+    try:
+        upload = await spool_upload(file_obj)
+    except UploadTooLarge as e:
+        yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+        return
     
-    # 1. Determine Extraction Method
-    if file_obj.content_type == "application/pdf":
-        # Check if native
-        try:
-            is_native = False
-            with fitz.open(stream=contents, filetype="pdf") as doc:
-                # heuristic: check first page text
-                if len(doc) > 0 and len(doc[0].get_text().strip()) > 50:
-                    is_native = True
-                
-            if is_native:
-                yield json.dumps({"type": "info", "message": "PDF natif détecté (Extraction rapide)..."}) + "\n"
-                with fitz.open(stream=contents, filetype="pdf") as doc:
-                    for page in doc:
-                        text += page.get_text() + "\n"
-                yield json.dumps({"type": "ocr_complete", "full_text": text, "message": "Extraction terminée."}) + "\n"
-            else:
-                ocr_mode = True
-        except:
-             ocr_mode = True
-    else:
-        ocr_mode = True
+    try:
+        yield json.dumps({"type": "info", "message": "Fichier chargé. Analyse en cours..."}) + "\n"
         
-    # 2. Run OCR if needed
-    if ocr_mode:
-        yield json.dumps({"type": "info", "message": "Scan détecté. Démarrage OCR..."}) + "\n"
-        if file_obj.content_type == "application/pdf":
-            # Stream from OCR Service
-            async for event in ocr_service.process_scanned_pdf_stream(contents):
-                if event["type"] == "ocr_complete":
-                    text = event["full_text"]
-                yield json.dumps(event) + "\n"
-        else:
-            # Image OCR (Simple for now, can be streamed if needed)
-            yield json.dumps({"type": "page_start", "page": 1, "message": "Traitement image..."}) + "\n"
-            text = ocr_service.extract_text_from_image(contents)
-            yield json.dumps({"type": "ocr_complete", "full_text": text, "message": "Image analysée."}) + "\n"
+        async for event in text_extraction_events(upload):
+            if event["type"] == "ocr_complete":
+                text = event["full_text"]
+            yield json.dumps(event) + "\n"
+    finally:
+        upload.close()
 
     if not text.strip():
         yield json.dumps({"type": "error", "error": "Aucun texte extrait du fichier."}) + "\n"
@@ -171,14 +285,19 @@ async def analysis_stream_generator(file_obj, contents, contract_type):
     yield json.dumps({"type": "stage", "stage": "analysis", "message": "Analyse juridique et détection des risques..."}) + "\n"
     
     try:
-        from pipeline import ContractAIPipeline
-        pipeline = ContractAIPipeline()
-        result = await pipeline.process(text)
-        
-        # Add raw text for frontend
-        result["text"] = text
-        
-        yield json.dumps({"type": "complete", "data": result}) + "\n"
+        from pipeline import get_pipeline
+        pipeline = get_pipeline()
+        # Forward each stage as it completes (contract type, entities, clauses, risks, score)
+        async for event in pipeline.process_stream(text):
+            if event["type"] != "result":
+                yield json.dumps(event) + "\n"
+                continue
+            result = event["data"]
+            
+            # Add raw text for frontend
+            result["text"] = text
+            
+            yield json.dumps({"type": "complete", "data": result}) + "\n"
         
     except Exception as e:
         logger.error(f"Analysis Pipeline Failed: {e}")
@@ -198,7 +317,7 @@ async def analyze_file(
         
         # Return StreamingResponse immediately (don't await file.read() here!)
         return StreamingResponse(
-            analysis_stream_generator(file, None, contract_type),
+            analysis_stream_generator(file, contract_type),
             media_type="application/x-ndjson"
         )
             
@@ -221,38 +340,19 @@ async def extract_text(
             """Generator for OCR-only processing"""
             yield json.dumps({"type": "info", "message": "Connexion établie. Lecture du fichier..."}) + "\n"
             
-            contents = await file_obj.read()
-            yield json.dumps({"type": "info", "message": "Fichier chargé. Démarrage OCR..."}) + "\n"
+            try:
+                upload = await spool_upload(file_obj)
+            except UploadTooLarge as e:
+                yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+                return
             
-            # Determine if PDF or image
-            if file_obj.content_type == "application/pdf":
-                # Check if native PDF
-                try:
-                    is_native = False
-                    with fitz.open(stream=contents, filetype="pdf") as doc:
-                        if len(doc) > 0 and len(doc[0].get_text().strip()) > 50:
-                            is_native = True
-                    
-                    if is_native:
-                        yield json.dumps({"type": "info", "message": "PDF natif détecté (Extraction rapide)..."}) + "\n"
-                        text = ""
-                        with fitz.open(stream=contents, filetype="pdf") as doc:
-                            for page in doc:
-                                text += page.get_text() + "\n"
-                        yield json.dumps({"type": "ocr_complete", "full_text": text, "message": "Extraction terminée."}) + "\n"
-                    else:
-                        # Scanned PDF - use OCR service
-                        async for event in ocr_service.process_scanned_pdf_stream(contents):
-                            yield json.dumps(event) + "\n"
-                except:
-                    # Fallback to OCR
-                    async for event in ocr_service.process_scanned_pdf_stream(contents):
-                        yield json.dumps(event) + "\n"
-            else:
-                # Image OCR
-                yield json.dumps({"type": "page_start", "page": 1, "message": "Traitement image..."}) + "\n"
-                text = ocr_service.extract_text_from_image(contents)
-                yield json.dumps({"type": "ocr_complete", "full_text": text, "message": "Image analysée."}) + "\n"
+            try:
+                yield json.dumps({"type": "info", "message": "Fichier chargé. Démarrage OCR..."}) + "\n"
+                
+                async for event in text_extraction_events(upload):
+                    yield json.dumps(event) + "\n"
+            finally:
+                upload.close()
             
             yield json.dumps({"type": "complete", "message": "Extraction terminée."}) + "\n"
         
@@ -283,8 +383,9 @@ async def analyze_text(request: TextAnalysisRequest):
         if not request.text.strip():
             raise HTTPException(status_code=400, detail="Text cannot be empty")
         
-        # Initialize AI pipeline
-        pipeline = ContractAIPipeline()
+        # Shared AI pipeline
+        from pipeline import get_pipeline
+        pipeline = get_pipeline()
         
         # Process contract
         result = await pipeline.process(request.text)
@@ -310,7 +411,7 @@ async def export_pdf(analysis_data: dict):
         from fastapi.responses import Response
         
         # Generate PDF
-        pdf_bytes = generate_pdf_report(analysis_data)
+        pdf_bytes = await timed("pdf_export", run_cpu_bound(generate_pdf_report, analysis_data))
         
         logger.info("✅ PDF generated successfully")
         
@@ -0,0 +1,138 @@
+"""
+ONNX Runtime backend for the local transformers models
+Exports CamemBERT / BART / BARThez to ONNX with optimum, optionally applies
+dynamic int8 quantization, and caches the exported graphs on disk so the
+export only happens once per model. Returns regular transformers pipelines,
+so callers keep the same interface as with the PyTorch backend.
+"""
+
+import os
+import shutil
+import logging
+import tempfile
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ONNX_CACHE_DIR = os.getenv("AI_ONNX_CACHE_DIR", "onnx_models")
+ONNX_QUANTIZE = os.getenv("AI_ONNX_QUANTIZE", "true").lower() in ("1", "true", "yes")
+
+# Pipeline task -> optimum ORTModel class name
+ORT_MODEL_CLASSES = {
+    "ner": "ORTModelForTokenClassification",
+    "zero-shot-classification": "ORTModelForSequenceClassification",
+    "summarization": "ORTModelForSeq2SeqLM",
+}
+
+def cache_path(model_id: str, quantize: bool, cache_dir: str = ONNX_CACHE_DIR) -> str:
+    """Directory holding the exported graphs of one model variant"""
+    return os.path.join(cache_dir, model_id.replace("/", "__"), "int8" if quantize else "fp32")
+
+def _onnx_files(directory: str):
+    return sorted(f for f in os.listdir(directory) if f.endswith(".onnx"))
+
+def _quantize(export_dir: str) -> Dict[str, str]:
+    """
+    Dynamic int8 quantization of every graph in export_dir (in place)
+
+    Returns:
+        Mapping original file name -> quantized file name
+    """
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    # Dynamic quantization: weights int8 offline, activations quantized at runtime (no calibration set)
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantized = {}
+    for file_name in _onnx_files(export_dir):
+        quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=file_name)
+        quantizer.quantize(save_dir=export_dir, quantization_config=qconfig)
+        quantized[file_name] = file_name.replace(".onnx", "_quantized.onnx")
+    return quantized
+
+def _export(task: str, model_id: str, target_dir: str, quantize: bool):
+    """Export (and quantize) model_id into target_dir atomically"""
+    import optimum.onnxruntime as ort
+    from transformers import AutoTokenizer
+
+    logger.info(f"⏳ Exporting {model_id} to ONNX{' (int8)' if quantize else ''}...")
+    parent = os.path.dirname(target_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent)
+    try:
+        model = getattr(ort, ORT_MODEL_CLASSES[task]).from_pretrained(model_id, export=True)
+        model.save_pretrained(tmp_dir)
+        AutoTokenizer.from_pretrained(model_id).save_pretrained(tmp_dir)
+        if quantize:
+            for original in _quantize(tmp_dir):
+                os.remove(os.path.join(tmp_dir, original))
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    if _publish(tmp_dir, target_dir):
+        logger.info(f"✅ ONNX graphs cached in {target_dir}")
+    else:
+        logger.info(f"✅ {model_id} already exported by another worker, using {target_dir}")
+
+def _publish(tmp_dir: str, target_dir: str) -> bool:
+    """
+    Move a finished export into place
+
+    Renaming last means a half-written export is never picked up by another
+    worker. Workers exporting the same model concurrently race for the rename:
+    the losers find target_dir already populated, keep it and drop their copy.
+
+    Returns:
+        True if tmp_dir became target_dir, False if another export was already there
+    """
+    try:
+        os.replace(tmp_dir, target_dir)
+        return True
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if os.path.isdir(target_dir) and _onnx_files(target_dir):
+            return False
+        raise
+
+def _model_kwargs(task: str, model_dir: str) -> Dict[str, str]:
+    """File names to load (quantized graphs carry a suffix)"""
+    files = _onnx_files(model_dir)
+    if task == "summarization":
+        kwargs = {}
+        for part in ("encoder", "decoder", "decoder_with_past"):
+            names = [f for f in files if f.startswith(f"{part}_model")]
+            if names:
+                kwargs[f"{part}_file_name"] = names[0]
+        return kwargs
+    return {"file_name": files[0]}
+
+def load_onnx_pipeline(task: str, model_id: str, quantize: Optional[bool] = None,
+                       cache_dir: str = ONNX_CACHE_DIR, **pipeline_kwargs):
+    """
+    transformers pipeline running model_id on ONNX Runtime (CPU)
+
+    Args:
+        task: Pipeline task ("ner", "zero-shot-classification", "summarization")
+        model_id: Hugging Face model identifier
+        quantize: Use the dynamic int8 variant (default: AI_ONNX_QUANTIZE)
+        cache_dir: Root directory of exported graphs
+        **pipeline_kwargs: Forwarded to transformers.pipeline
+
+    Raises:
+        ImportError: optimum[onnxruntime] is not installed
+    """
+    import optimum.onnxruntime as ort
+    from transformers import AutoTokenizer, pipeline
+
+    if task not in ORT_MODEL_CLASSES:
+        raise ValueError(f"Unsupported ONNX task: {task}")
+    if quantize is None:
+        quantize = ONNX_QUANTIZE
+
+    model_dir = cache_path(model_id, quantize, cache_dir)
+    if not os.path.isdir(model_dir) or not _onnx_files(model_dir):
+        _export(task, model_id, model_dir, quantize)
+
+    model = getattr(ort, ORT_MODEL_CLASSES[task]).from_pretrained(model_dir, **_model_kwargs(task, model_dir))
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return pipeline(task, model=model, tokenizer=tokenizer, **pipeline_kwargs)
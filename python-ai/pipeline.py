@@ -1,15 +1,34 @@
 # Contract Analysis AI Pipeline - Updated with Professional Components
 # Version: 2.0.0 - Professional Extraction & Cleaning
 
+import os
 import re
+import sys
+import asyncio
+import bisect
+import time
 import logging
-from typing import Dict, List, Any
+import threading
+from typing import Dict, List, Any, AsyncIterator, Iterable, Tuple
 
 # Import new professional components
+from preprocessing import TextCleaner, SmartChunker
 from knowledge.contract_detector import contract_detector # Professional Contract Detector
+from ai_models import ai_models
+from utils import run_cpu_bound, analysis_cache, content_hash
+from utils.metrics import STAGE_SECONDS, FALLBACKS, timed
 
 logger = logging.getLogger(__name__)
 
+# Bump when a change alters pipeline output (invalidates cached analyses)
+PIPELINE_VERSION = "2.0.1"
+
+# Components warmed at startup (comma-separated): ner, summarizer, classifier, rag
+PRELOAD_COMPONENTS = os.getenv("AI_PRELOAD_COMPONENTS", "ner,summarizer,rag")
+
+# Max clauses analysed at the same time in Stage 6 (Mistral + BARThez + RAG per clause)
+CLAUSE_CONCURRENCY = max(1, int(os.getenv("AI_CLAUSE_CONCURRENCY", "4")))
+
 class ContractAIPipeline:
     """
     Complete AI pipeline for contract analysis - Professional Version
@@ -30,26 +49,56 @@ class ContractAIPipeline:
         logger.info("🔄 Initializing Professional AI Pipeline...")
         
         # Initialize professional components
+        # Stateless across requests: the instance is shared process-wide (see get_pipeline)
         self.cleaner = TextCleaner()
-        self.chunker = None  # Will be initialized with contract type
         
         logger.info("✅ Professional Pipeline initialized")
     
     async def process(self, text: str) -> Dict[str, Any]:
         """Main processing pipeline - Professional Version"""
-        
+        result = None
+        async for event in self.process_stream(text):
+            if event["type"] == "result":
+                result = event["data"]
+        return result
+    
+    async def process_stream(self, text: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the pipeline, yielding an event as each stage completes.
+        
+        Event types (field "type"):
+        - contract_type: contract_type, contract_category, confidence
+        - entities: entities
+        - detected_clauses: detected_clauses
+        - clause: index, total, clause (one per analysed clause, in completion order)
+        - risks: risks
+        - score: score, recommendations
+        - result: data (the full analysis, same as process())
+        """
         logger.info("📝 Stage 1: Professional text cleaning...")
-        cleaning_result = self.cleaner.clean(text)
+        started = time.perf_counter()
+        cleaning_result = await timed("cleaning", run_cpu_bound(self.cleaner.clean, text))
         cleaned_text = cleaning_result["text"]
         cleaning_metadata = cleaning_result["metadata"]
         logger.info(f"   → Cleaned: {cleaning_metadata['reduction_percent']}% reduction")
         
+        # Same cleaned text + same pipeline/models = same analysis
+        cache_key = content_hash(cleaned_text, PIPELINE_VERSION, ai_models.model_fingerprint())
+        cached_result = analysis_cache.get(cache_key)
+        if cached_result is not None:
+            logger.info("⚡ Analysis cache hit, skipping stages 2-10")
+            for event in self._replay_events(cached_result):
+                yield event
+            return
+        
         logger.info("🏷️ Stage 2: Contract classification (Comprehensive System)...")
-        # Use the new robust contract detector
-        contract_key, confidence, contract_name, category = contract_detector.detect_contract_type(cleaned_text)
+        # Use the new robust contract detector (one keyword scan, reused in Stage 4.5)
+        keyword_hits = await timed("detection", run_cpu_bound(contract_detector.scan, cleaned_text))
+        contract_key, confidence, contract_name, category = contract_detector.detect_contract_type(cleaned_text, keyword_hits)
         contract_type = contract_name
         
         logger.info(f"   → Type: {contract_type} (Category: {category.value}, Confidence: {confidence:.2f})")
+        yield {"type": "contract_type", "contract_type": contract_type, "contract_category": category.value, "confidence": confidence}
 
         
         # Note: OCR handling is now moved to main.py / ocr_service.py
@@ -58,43 +107,60 @@ class ContractAIPipeline:
              logger.warning("⚠️ Warning: Analyzed text is very short. Semantic analysis may be limited.")
         
         logger.info("✂️ Stage 3: Smart chunking with context...")
-        self.chunker = SmartChunker(contract_type=contract_type, max_chunk_size=1000)
-        chunks = self.chunker.chunk(cleaned_text)
+        chunker = SmartChunker(contract_type=contract_type, max_chunk_size=1000)
+        chunks = await timed("chunking", run_cpu_bound(chunker.chunk, cleaned_text))
         logger.info(f"   → {len(chunks)} clauses detected")
         
         logger.info("🔍 Stage 4: Entity extraction (CamemBERT NER)...")
-        # Sprint 3: Use NER model
-        ner_entities = ai_models.extract_entities(cleaned_text)
+        # Sprint 3: Use NER model (whole text, sliding windows)
+        ner_entities = await timed("ner", run_cpu_bound(ai_models.extract_entities, cleaned_text))
         entities = self._extract_entities(cleaned_text) # Keep regex as baseline
-        # Merge logic could go here
+        entities["parties"] = self._extract_parties(ner_entities)
+        entities["named_entities"] = ner_entities # Offsets refer to cleaned_text
+        yield {"type": "entities", "entities": entities}
         
         logger.info("🧠 Stage 4.5: Transversal Clause Detection...")
-        detected_clauses = contract_detector.detect_transversal_clauses(cleaned_text)
+        with STAGE_SECONDS.time(stage="transversal_clauses"):
+            detected_clauses = contract_detector.detect_transversal_clauses(cleaned_text, keyword_hits)
+        self._link_hits_to_chunks(detected_clauses, chunks)
         logger.info(f"   → {len(detected_clauses)} specific clauses identified (Tacite Reconduction, Penalties, etc.)")
+        yield {"type": "detected_clauses", "detected_clauses": detected_clauses}
 
         logger.info("📚 Stage 5: Initializing RAG service (Semantic)...")
-        try:
-            from rag_service_semantic import get_semantic_rag_service
-            self.rag_service = get_semantic_rag_service()
-            logger.info("   → Using Semantic RAG (Hugging Face)")
-        except Exception as e:
-            logger.warning(f"   → Semantic RAG unavailable ({e}), falling back to keyword RAG")
-            from rag_service import get_rag_service
-            self.rag_service = get_rag_service()
+        rag_service = await timed("rag_init", run_cpu_bound(self._get_rag_service))
         
         logger.info("🧠 Stage 6: Clause analysis (AI + RAG)...")
-        clauses_analysis = []
-        for chunk in chunks[:10]:  # Limit to 10 clauses for demo
-            logger.info(f"   → Analyzing clause {chunk['clause_number']}/{min(len(chunks), 10)} ({chunk['type']})...")
-            analysis = await self._analyze_clause_professional(chunk, contract_type)
-            
-            # Enrich with RAG legal references
-            rag_enrichment = self.rag_service.enrich_clause_analysis(chunk["text"], chunk["type"])
-            analysis["legal_references"] = rag_enrichment.get("references", [])
-            analysis["legal_context"] = rag_enrichment.get("legal_context", "")
-            analysis["search_method"] = rag_enrichment.get("search_method", "keyword")
+        selected_chunks = chunks[:10]  # Limit to 10 clauses for demo
+        semaphore = asyncio.Semaphore(CLAUSE_CONCURRENCY)
+        clause_tasks = [
+            asyncio.create_task(self._analyze_clause_indexed(i, chunk, contract_type, semaphore, len(selected_chunks)))
+            for i, chunk in enumerate(selected_chunks)
+        ]
+        try:
+            # RAG references and BARThez summaries for every clause come from batched calls,
+            # running while the per-clause analyses are in flight
+            clause_texts = [chunk["text"] for chunk in selected_chunks]
+            rag_enrichments, summaries = await asyncio.gather(
+                timed("rag", run_cpu_bound(rag_service.enrich_clauses_batch, [(chunk["text"], chunk["type"]) for chunk in selected_chunks])),
+                timed("summarization", run_cpu_bound(ai_models.summarize_clauses, clause_texts))
+            )
             
-            clauses_analysis.append(analysis)
+            # Enrich with summaries and RAG legal references, then emit each clause as it completes.
+            # The result keeps clause order whatever the completion order.
+            clauses_analysis = [None] * len(selected_chunks)
+            for next_done in asyncio.as_completed(clause_tasks):
+                i, analysis = await next_done
+                rag_enrichment = rag_enrichments[i]
+                analysis["resume"] = summaries[i]
+                analysis["legal_references"] = rag_enrichment.get("references", [])
+                analysis["legal_context"] = rag_enrichment.get("legal_context", "")
+                analysis["search_method"] = rag_enrichment.get("search_method", "keyword")
+                clauses_analysis[i] = analysis
+                yield {"type": "clause", "index": i, "total": len(selected_chunks), "clause": analysis}
+        finally:
+            # Consumer gone or a stage failed: do not leave clause analyses running
+            for task in clause_tasks:
+                task.cancel()
         
         logger.info("⚠️ Stage 7: Risk detection...")
         risks = self._detect_risks(clauses_analysis, contract_type)
@@ -112,23 +178,26 @@ class ContractAIPipeline:
                 })
 
         logger.info(f"   → {len(risks)} risks detected")
+        yield {"type": "risks", "risks": risks}
         
         logger.info("📊 Stage 8: Score calculation...")
         score = self._calculate_score(clauses_analysis, risks)
         
         logger.info("💡 Stage 9: Recommendations...")
         recommendations = self._generate_recommendations(risks, contract_type)
+        yield {"type": "score", "score": score, "recommendations": recommendations}
         
         logger.info("📄 Stage 10: Summary generation...")
         summary = self._generate_summary(cleaned_text, clauses_analysis)
         
-        return {
+        result = {
             "contract_type": contract_type,
             "contract_category": category.value, # Added category
             "summary": summary,
             "entities": entities,
             "clauses": clauses_analysis,
-            "detected_clauses": detected_clauses, # New field
+            "detected_clauses": detected_clauses, # New field (hit offsets refer to cleaned_text)
+            "cleaned_text": cleaned_text,
             "risks": risks,
             "score": score,
             "recommendations": recommendations,
@@ -140,6 +209,51 @@ class ContractAIPipeline:
                 "cleaning_stats": cleaning_metadata
             }
         }
+        # The key says which risk model ran: an analysis where Mistral failed and rules
+        # stood in would otherwise be served for the whole TTL after Mistral recovers
+        degraded = [c["clause_number"] for c in clauses_analysis if c["risk_source"] != self._expected_risk_source()]
+        if degraded:
+            logger.info(f"⏭️ Analysis not cached: rules fallback on clause(s) {degraded}")
+        else:
+            # Models load lazily during the first analyses: key the entry on the backends that actually ran
+            analysis_cache.set(content_hash(cleaned_text, PIPELINE_VERSION, ai_models.model_fingerprint()), result)
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="analysis_total")
+        yield {"type": "result", "data": result}
+    
+    def _replay_events(self, result: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+        """Stage events of an already computed analysis (cache hit)"""
+        yield {"type": "contract_type", "contract_type": result["contract_type"],
+               "contract_category": result["contract_category"], "confidence": None}
+        yield {"type": "entities", "entities": result["entities"]}
+        yield {"type": "detected_clauses", "detected_clauses": result["detected_clauses"]}
+        for i, clause in enumerate(result["clauses"]):
+            yield {"type": "clause", "index": i, "total": len(result["clauses"]), "clause": clause}
+        yield {"type": "risks", "risks": result["risks"]}
+        yield {"type": "score", "score": result["score"], "recommendations": result["recommendations"]}
+        yield {"type": "result", "data": result, "cached": True}
+    
+    def _link_hits_to_chunks(self, detected_clauses: List[Dict], chunks: List[Dict]):
+        """Attach the chunk (clause_number) containing each transversal clause hit"""
+        starts = [chunk["start"] for chunk in chunks]
+        for clause in detected_clauses:
+            for hit in clause["hits"]:
+                i = bisect.bisect_right(starts, hit["start"]) - 1
+                inside = i >= 0 and hit["start"] < chunks[i]["end"]
+                hit["clause_number"] = chunks[i]["clause_number"] if inside else None
+            clause["clause_numbers"] = sorted({hit["clause_number"] for hit in clause["hits"] if hit["clause_number"] is not None})
+    
+    def _get_rag_service(self):
+        """Semantic RAG singleton, or keyword RAG if sentence-transformers/FAISS are unavailable"""
+        try:
+            from rag_service_semantic import get_semantic_rag_service
+            rag_service = get_semantic_rag_service()
+            logger.info("   → Using Semantic RAG (Hugging Face)")
+        except Exception as e:
+            logger.warning(f"   → Semantic RAG unavailable ({e}), falling back to keyword RAG")
+            FALLBACKS.inc(component="semantic_rag")
+            from rag_service import get_rag_service
+            rag_service = get_rag_service()
+        return rag_service
     
     def _classify_contract(self, text_sample: str) -> str:
         """Classify contract type (rule-based)"""
@@ -156,6 +270,14 @@ class ContractAIPipeline:
         else:
             return "Contrat de prestation"
     
+    def _extract_parties(self, ner_entities: List[Dict]) -> List[str]:
+        """Distinct persons and organisations found by NER, in order of appearance"""
+        parties = []
+        for entity in ner_entities:
+            if entity["entity_group"] in ("PER", "ORG") and entity["word"] not in parties:
+                parties.append(entity["word"])
+        return parties[:10]
+    
     def _extract_entities(self, text: str) -> Dict[str, List[str]]:
         """Extract entities (regex-based)"""
         entities = {
@@ -178,6 +300,13 @@ class ContractAIPipeline:
         
         return entities
     
+    async def _analyze_clause_indexed(self, index: int, chunk: Dict, contract_type: str,
+                                      semaphore: asyncio.Semaphore, total: int) -> Tuple[int, Dict[str, Any]]:
+        """Analyse one clause, at most CLAUSE_CONCURRENCY at a time (index kept for as_completed)"""
+        async with semaphore:
+            logger.info(f"   → Analyzing clause {chunk['clause_number']}/{total} ({chunk['type']})...")
+            return index, await self._analyze_clause_professional(chunk, contract_type)
+    
     async def _analyze_clause_professional(self, chunk: Dict, contract_type: str) -> Dict[str, Any]:
         """
         Professional clause analysis with context
@@ -186,16 +315,20 @@ class ContractAIPipeline:
         clause_type = chunk["type"]
         clause_num = chunk["clause_number"]
         
-        # Enhanced risk assessment (Hybrid: Mistral AI + Rules)
-        ai_risk = ai_models.analyze_risk_mistral(clause_text, clause_type, contract_type)
+        # Enhanced risk assessment (Hybrid: Mistral AI + Rules), awaited on the shared async client.
+        # The BARThez summary is filled in by process() from one batched call.
+        # (timing and fallback metrics are recorded by the call itself)
+        ai_risk = await ai_models.analyze_risk_mistral_async(clause_text, clause_type, contract_type)
         
         if ai_risk:
             logger.info(f"   🤖 Mistral Analysis: {ai_risk.get('risk_level', 'unknown')}")
+            risk_source = "mistral"
             risk_level = ai_risk.get('risk_level', 'low')
             limitations = ai_risk.get('explanation', '')
             recommendation = ai_risk.get('recommendation', '')
         else:
             # Fallback to rules if AI fails or no token
+            risk_source = "rules"
             risk_level = self._assess_risk_professional(clause_text, clause_type, contract_type)
             limitations = self._generate_risks(clause_text, risk_level)
             recommendation = self._generate_recommendation(risk_level, clause_type)
@@ -208,14 +341,19 @@ class ContractAIPipeline:
             "clause_type": clause_type,
             "context": chunk["context"],
             "context": chunk["context"],
-            "resume": ai_models.summarize_clause(clause_text), # Sprint 3: BARThez
+            "resume": None, # Sprint 3: BARThez (batched, set by process)
             "implications": self._generate_implications(clause_text, clause_type),
             "risques": limitations, # From AI or Rules
             "conformite": self._check_conformity(clause_text, clause_type, contract_type),
             "recommandation": recommendation, # From AI or Rules
-            "risk_level": risk_level
+            "risk_level": risk_level,
+            "risk_source": risk_source  # "mistral" or "rules"
         }
     
+    def _expected_risk_source(self) -> str:
+        """Risk source of a non-degraded analysis (the one model_fingerprint() names)"""
+        return "mistral" if ai_models.hf_token else "rules"
+    
     def _assess_risk_professional(self, text: str, clause_type: str, contract_type: str) -> str:
         """Enhanced risk assessment with moderate keywords and default risks"""
         text_lower = text.lower()
@@ -395,3 +533,83 @@ class ContractAIPipeline:
                     })
         
         return recommendations
+
+
+# Process-wide pipeline (built once, e.g. from the FastAPI lifespan hook)
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def get_pipeline() -> ContractAIPipeline:
+    """Get or create the shared pipeline singleton"""
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = ContractAIPipeline()
+    return _pipeline
+
+def preload_components(components: Iterable[str] = None) -> Dict[str, bool]:
+    """
+    Warm heavy models so the first request does not pay for lazy loading.
+    
+    Args:
+        components: Names among "ner", "summarizer", "classifier", "rag", "ocr"
+                    (ocr starts the OCR worker processes, which load their engines).
+                    Defaults to AI_PRELOAD_COMPONENTS.
+    
+    Returns:
+        {component: loaded} for each requested component
+    """
+    if components is None:
+        components = [c.strip() for c in PRELOAD_COMPONENTS.split(",") if c.strip()]
+    
+    model_loaders = {
+        "ner": (ai_models.load_ner_model, "ner_pipeline"),
+        "summarizer": (ai_models.load_summarizer_model, "summarizer_pipeline"),
+        "classifier": (ai_models.load_classifier_model, "classifier_pipeline"),
+    }
+    
+    status = {}
+    for name in components:
+        logger.info(f"🔥 Preloading {name}...")
+        try:
+            if name == "rag":
+                status[name] = get_pipeline()._get_rag_service() is not None
+            elif name == "ocr":
+                from extraction.ocr_service import ocr_service, get_ocr_pool
+                if get_ocr_pool() is None:
+                    ocr_service._get_reader()  # In-process mode
+                status[name] = True
+            elif name in model_loaders:
+                load, attribute = model_loaders[name]
+                load()
+                status[name] = getattr(ai_models, attribute) is not None
+            else:
+                logger.warning(f"⚠️ Unknown preload component '{name}'")
+        except Exception as e:
+            logger.error(f"❌ Preload of {name} failed: {e}")
+            status[name] = False
+    
+    return status
+
+def _module_global(module_name: str, attribute: str):
+    """Global of an already imported module (None if not imported, or still importing)"""
+    return getattr(sys.modules.get(module_name), attribute, None)
+
+def loaded_components() -> Dict[str, bool]:
+    """Which heavy components are in memory (never triggers a load)"""
+    ocr = _module_global("extraction.ocr_service", "ocr_service")
+    ocr_pool = _module_global("extraction.ocr_service", "_ocr_pool")
+    return {
+        "pipeline": _pipeline is not None,
+        "ner": ai_models.ner_pipeline is not None,
+        "summarizer": ai_models.summarizer_pipeline is not None,
+        "classifier": ai_models.classifier_pipeline is not None,
+        "rag": (
+            _module_global("rag_service_semantic", "_semantic_rag_service") is not None
+            or _module_global("rag_service", "_rag_service") is not None
+        ),
+        # EasyOCR in this process, or OCR worker processes (each with its own model)
+        "ocr": (ocr is not None and ocr.reader is not None) or (ocr_pool is not None and ocr_pool.health()["alive"] > 0)
+    }
@@ -4,7 +4,7 @@ Chunks by clause/article with context
 """
 
 import re
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 class SmartChunker:
     """Professional chunking for contract analysis"""
@@ -26,19 +26,21 @@ class SmartChunker:
                 "context": context string,
                 "clause_number": int,
                 "type": clause type,
-                "char_count": int
+                "char_count": int,
+                "start": offset of the chunk in text,
+                "end": end offset (exclusive) in text
             }
         """
         # Try to detect articles/clauses
-        chunks = self._chunk_by_articles(text)
+        chunks = self._split_articles(text)
         
         if not chunks or len(chunks) < 2:
             # Fallback to paragraph chunking
-            chunks = self._chunk_by_paragraphs(text)
+            chunks = self._split_paragraphs(text)
         
         # Add context and metadata to each chunk
         enriched_chunks = []
-        for i, chunk_text in enumerate(chunks):
+        for i, (start, end, chunk_text) in enumerate(chunks):
             # Limit chunk size
             if len(chunk_text) > self.max_chunk_size:
                 chunk_text = chunk_text[:self.max_chunk_size] + "..."
@@ -50,7 +52,9 @@ class SmartChunker:
                 "context": f"[Contrat: {self.contract_type}, Clause {i+1}, Type: {clause_type}]",
                 "clause_number": i + 1,
                 "type": clause_type,
-                "char_count": len(chunk_text)
+                "char_count": len(chunk_text),
+                "start": start,
+                "end": end
             })
         
         return enriched_chunks
@@ -60,6 +64,10 @@ class SmartChunker:
         Chunk by Article/Clause markers
         Patterns: "Article 1", "ARTICLE I", "Clause 1"
         """
+        return [chunk_text for _, _, chunk_text in self._split_articles(text)]
+    
+    def _split_articles(self, text: str) -> List[Tuple[int, int, str]]:
+        """Article/Clause chunks as (start, end, chunk text), offsets into text"""
         patterns = [
             r'(Article\s+\d+(?:\.\d+)?)',
             r'(ARTICLE\s+[IVX]+)',
@@ -68,17 +76,16 @@ class SmartChunker:
         
         # Try each pattern
         for pattern in patterns:
-            if re.search(pattern, text):
-                chunks = re.split(pattern, text)
+            markers = list(re.finditer(pattern, text))
+            if markers:
                 result = []
                 
-                # Recombine title + content
-                for i in range(1, len(chunks), 2):
-                    if i+1 < len(chunks):
-                        result.append(chunks[i] + ' ' + chunks[i+1])
+                # Recombine title + content (content runs up to the next marker)
+                for i, marker in enumerate(markers):
+                    end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+                    result.append((marker.start(), end, marker.group(1) + ' ' + text[marker.end():end]))
                 
-                if result:
-                    return result
+                return result
         
         return []
     
@@ -87,8 +94,19 @@ class SmartChunker:
         Fallback: chunk by paragraphs
         Filter out very short paragraphs
         """
-        paragraphs = text.split('\n\n')
-        return [p.strip() for p in paragraphs if len(p.strip()) > 50]
+        return [chunk_text for _, _, chunk_text in self._split_paragraphs(text)]
+    
+    def _split_paragraphs(self, text: str) -> List[Tuple[int, int, str]]:
+        """Paragraph chunks (> 50 chars) as (start, end, chunk text), offsets into text"""
+        result = []
+        offset = 0
+        for paragraph in text.split('\n\n'):
+            stripped = paragraph.strip()
+            if len(stripped) > 50:
+                start = offset + (len(paragraph) - len(paragraph.lstrip()))
+                result.append((start, start + len(stripped), stripped))
+            offset += len(paragraph) + 2
+        return result
     
     def _detect_clause_type(self, chunk: str) -> str:
         """
@@ -7,8 +7,9 @@ Loi 89-462 (18 articles) + Code Civil (17 articles)
 
 import os
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +42,8 @@ class LegalRAGService:
         
         logger.info(f"✅ Loaded {len(self.articles)} legal articles")
     
-    def _get_complete_knowledge_base(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _get_complete_knowledge_base() -> List[Dict[str, Any]]:
         """Complete knowledge base with all 35 articles"""
         return [
             # ===== LOI 89-462 (18 articles) =====
@@ -385,13 +387,29 @@ class LegalRAGService:
             "references": references,
             "legal_context": legal_context
         }
+    
+    def enrich_clauses_batch(self, clauses: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Enrich several clauses (same interface as the semantic service)
+        
+        Args:
+            clauses: (clause_text, clause_type) pairs
+        
+        Returns:
+            One enrichment dictionary per clause, in input order
+        """
+        return [self.enrich_clause_analysis(text, clause_type) for text, clause_type in clauses]
 
 # Singleton instance
 _rag_service = None
+_rag_service_lock = threading.Lock()
 
 def get_rag_service() -> LegalRAGService:
     """Get or create RAG service singleton"""
     global _rag_service
-    if _rag_service is None:
-        _rag_service = LegalRAGService()
+    if _rag_service is not None:
+        return _rag_service
+    with _rag_service_lock:
+        if _rag_service is None:
+            _rag_service = LegalRAGService()
     return _rag_service
@@ -7,10 +7,12 @@ Model: paraphrase-multilingual-mpnet-base-v2 (optimized for French)
 
 import os
 import json
-import pickle
+import hashlib
 import numpy as np
-from typing import List, Dict, Any
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Tuple
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +24,12 @@ class SemanticRAGService:
     - Semantic embeddings (768 dimensions)
     - FAISS vector index for fast search
     - Multilingual model optimized for French
-    - Caching for performance
+    - Versioned embedding cache (manifest + memory-mapped .npy), incrementally updated
     """
     
+    EMBEDDING_MODEL = 'paraphrase-multilingual-mpnet-base-v2'
+    CACHE_FORMAT = 2  # 1 = legacy embeddings.pkl without manifest
+    
     def __init__(self, knowledge_base_path: str = "knowledge_base", cache_dir: str = "rag_cache"):
         """Initialize semantic RAG service"""
         self.kb_path = knowledge_base_path
@@ -50,36 +55,26 @@ class SemanticRAGService:
             
             # Load model
             logger.info("📥 Loading sentence-transformers model...")
-            self.model = SentenceTransformer('paraphrase-multilingual-mpnet-base-v2')
+            self.model = SentenceTransformer(self.EMBEDDING_MODEL)
             logger.info("✅ Model loaded successfully")
             
             # Load articles
             self.articles = self._get_complete_knowledge_base()
             logger.info(f"📚 Loaded {len(self.articles)} legal articles")
             
-            # Load or create embeddings
-            embeddings_path = os.path.join(self.cache_dir, "embeddings.pkl")
-            index_path = os.path.join(self.cache_dir, "faiss.index")
+            # Load or create embeddings (only new/changed articles are re-embedded)
+            embeddings, reused = self._load_or_update_embeddings()
             
-            if os.path.exists(embeddings_path) and os.path.exists(index_path):
-                logger.info("📂 Loading cached embeddings and index...")
-                with open(embeddings_path, 'rb') as f:
-                    embeddings = pickle.load(f)
-                self.index = faiss.read_index(index_path)
-                logger.info("✅ Loaded from cache")
-            else:
-                logger.info("🔨 Creating embeddings (first time, may take 30s)...")
-                embeddings = self._create_embeddings()
-                
-                logger.info("🔨 Building FAISS index...")
-                self.index = self._build_faiss_index(embeddings)
-                
-                # Save to cache
-                logger.info("💾 Saving to cache...")
-                with open(embeddings_path, 'wb') as f:
-                    pickle.dump(embeddings, f)
-                faiss.write_index(self.index, index_path)
-                logger.info("✅ Cache saved")
+            if reused:
+                logger.info("✅ Embeddings loaded from cache")
+            
+            # The flat index is only a copy of the embeddings: rebuilt from them on
+            # every start rather than persisted, so it can never disagree with the manifest
+            logger.info("🔨 Building FAISS index...")
+            self.index = self._build_faiss_index(embeddings)
+            stale_index = os.path.join(self.cache_dir, "faiss.index")  # Written by older versions
+            if os.path.exists(stale_index):
+                os.remove(stale_index)
             
             logger.info("🎉 Semantic RAG Service ready!")
             
@@ -90,29 +85,106 @@ class SemanticRAGService:
     
     def _get_complete_knowledge_base(self) -> List[Dict[str, Any]]:
         """Complete knowledge base - 35 articles"""
-        # Import from existing rag_service to avoid duplication
+        # Shared with the keyword RAG service (no need to build that service)
         from rag_service import LegalRAGService
-        temp_service = LegalRAGService()
-        return temp_service.articles
-    
-    def _create_embeddings(self) -> np.ndarray:
-        """Create embeddings for all articles"""
-        # Combine article content for embedding
-        texts = []
-        for article in self.articles:
-            # Combine title + content for better semantic understanding
-            text = f"{article['title']}: {article['content']}"
-            texts.append(text)
+        return LegalRAGService._get_complete_knowledge_base()
+    
+    def _article_text(self, article: Dict[str, Any]) -> str:
+        """Text embedded for an article: title + content for better semantic understanding"""
+        return f"{article['title']}: {article['content']}"
+    
+    def _load_or_update_embeddings(self) -> Tuple[np.ndarray, bool]:
+        """
+        Load article embeddings from the versioned cache, re-embedding only what changed
+        
+        The manifest records the model, dimension and a hash per embedded text.
+        A different model (or dimension) invalidates everything; otherwise rows
+        are reused by content hash and only new/changed articles are encoded.
+        
+        Returns:
+            (embeddings aligned with self.articles, True if the cache was reused unchanged)
+        """
+        manifest_path = os.path.join(self.cache_dir, "manifest.json")
+        embeddings_path = os.path.join(self.cache_dir, "embeddings.npy")
+        
+        texts = [self._article_text(article) for article in self.articles]
+        hashes = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+        
+        cached_rows = {}
+        cached = None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("model") == self.EMBEDDING_MODEL and manifest.get("format") == self.CACHE_FORMAT:
+                # Memory-mapped: unchanged rows are never copied into RAM at load time
+                cached = np.load(embeddings_path, mmap_mode="r")
+                if cached.shape == (len(manifest["hashes"]), manifest["dimension"]):
+                    cached_rows = {h: row for row, h in enumerate(manifest["hashes"])}
+                else:
+                    logger.warning("⚠️ RAG cache shape does not match its manifest, rebuilding")
+            else:
+                logger.info("🔄 Embedding model changed since last build, rebuilding cache")
+        except FileNotFoundError:
+            logger.info("🔨 No RAG cache found (first time, may take 30s)...")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Unreadable RAG cache ({e}), rebuilding")
+        
+        if cached_rows and hashes == manifest["hashes"]:
+            logger.info("📂 Loading cached embeddings (knowledge base unchanged)...")
+            return cached, True
+        
+        missing = [i for i, h in enumerate(hashes) if h not in cached_rows]
+        logger.info(f"🔨 Embedding {len(missing)} new/changed articles ({len(hashes) - len(missing)} reused)...")
+        
+        new_embeddings = self._create_embeddings([texts[i] for i in missing]) if missing else None
+        dimension = new_embeddings.shape[1] if new_embeddings is not None else cached.shape[1]
+        
+        embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+        new_rows = iter(range(len(missing)))
+        for i, h in enumerate(hashes):
+            if h in cached_rows:
+                embeddings[i] = cached[cached_rows[h]]
+            else:
+                embeddings[i] = new_embeddings[next(new_rows)]
+        cached = None  # Release the memory map before replacing the file (required on Windows)
+        
+        # Save to cache (embeddings first: the manifest is what marks the cache valid)
+        logger.info("💾 Saving to cache...")
+        self._atomic_write(embeddings_path, lambda path: np.save(path, embeddings))
+        manifest = {
+            "format": self.CACHE_FORMAT,
+            "model": self.EMBEDDING_MODEL,
+            "dimension": int(dimension),
+            "built_at": datetime.now(timezone.utc).isoformat(),
+            "hashes": hashes
+        }
+        self._atomic_write(manifest_path, lambda path: self._write_json(path, manifest))
         
+        return embeddings, False
+    
+    def _atomic_write(self, path: str, write):
+        """Write via a temp file + rename so readers never see a partial cache file"""
+        # Per-process name (several server workers may share the cache dir); keep the
+        # extension, np.save appends .npy otherwise
+        tmp_path = f"{path}.{os.getpid()}.tmp{os.path.splitext(path)[1]}"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    
+    def _write_json(self, path: str, data: Dict[str, Any]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    
+    def _create_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Create normalized embeddings for the given article texts"""
         # Encode with sentence-transformers
         embeddings = self.model.encode(
             texts,
-            show_progress_bar=True,
+            show_progress_bar=len(texts) > 10,
             convert_to_numpy=True,
             normalize_embeddings=True  # For cosine similarity
         )
         
-        return embeddings
+        return embeddings.astype(np.float32)
     
     def _build_faiss_index(self, embeddings: np.ndarray):
         """Build FAISS index for fast similarity search"""
@@ -141,19 +213,49 @@ class SemanticRAGService:
         Returns:
             List of relevant articles with semantic scores
         """
-        # Encode query
-        query_embedding = self.model.encode(
-            [query],
+        return self.search_relevant_articles_batch([query], [clause_type], top_k)[0]
+    
+    def search_relevant_articles_batch(self, queries: List[str], clause_types: List[str] = None,
+                                       top_k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Semantic search for several queries at once
+        
+        All queries are encoded in one sentence-transformers batch and searched
+        with a single FAISS call over the query matrix. Row i of the result is
+        identical to search_relevant_articles(queries[i], clause_types[i], top_k).
+        
+        Args:
+            queries: Search queries (clause texts)
+            clause_types: Type of each clause (optional, for boosting)
+            top_k: Number of results to return per query
+        
+        Returns:
+            One list of relevant articles per query
+        """
+        if not queries:
+            return []
+        if clause_types is None:
+            clause_types = [None] * len(queries)
+        
+        # Encode queries
+        query_embeddings = self.model.encode(
+            queries,
             convert_to_numpy=True,
             normalize_embeddings=True
         )
         
         # Search FAISS index
-        distances, indices = self.index.search(query_embedding.astype('float32'), top_k * 2)
+        distances, indices = self.index.search(query_embeddings.astype('float32'), top_k * 2)
         
-        # Build results
+        return [
+            self._rank_results(row_distances, row_indices, clause_type, top_k)
+            for row_distances, row_indices, clause_type in zip(distances, indices, clause_types)
+        ]
+    
+    def _rank_results(self, distances: np.ndarray, indices: np.ndarray, clause_type: str, top_k: int) -> List[Dict[str, Any]]:
+        """Score one row of FAISS hits and keep the top_k articles"""
         results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
+        for distance, idx in zip(distances, indices):
             article = self.articles[idx].copy()
             
             # Convert L2 distance to similarity score (0-100)
@@ -183,8 +285,29 @@ class SemanticRAGService:
         Returns:
             Dictionary with legal references and context
         """
-        relevant_articles = self.search_relevant_articles(clause_text, clause_type, top_k=2)
+        return self.enrich_clauses_batch([(clause_text, clause_type)])[0]
+    
+    def enrich_clauses_batch(self, clauses: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Enrich several clauses with one embedding batch and one FAISS search
         
+        Args:
+            clauses: (clause_text, clause_type) pairs
+        
+        Returns:
+            One enrichment dictionary per clause, in input order
+        """
+        if not clauses:
+            return []
+        texts = [text for text, _ in clauses]
+        types = [clause_type for _, clause_type in clauses]
+        return [
+            self._build_enrichment(relevant_articles)
+            for relevant_articles in self.search_relevant_articles_batch(texts, types, top_k=2)
+        ]
+    
+    def _build_enrichment(self, relevant_articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Turn ranked articles into the references/context payload"""
         if not relevant_articles:
             return {
                 "has_references": False,
@@ -215,10 +338,14 @@ class SemanticRAGService:
 
 # Singleton instance
 _semantic_rag_service = None
+_semantic_rag_service_lock = threading.Lock()
 
 def get_semantic_rag_service() -> SemanticRAGService:
-    """Get or create semantic RAG service singleton"""
+    """Get or create semantic RAG service singleton (built once, even when warm-up and requests race)"""
     global _semantic_rag_service
-    if _semantic_rag_service is None:
-        _semantic_rag_service = SemanticRAGService()
+    if _semantic_rag_service is not None:
+        return _semantic_rag_service
+    with _semantic_rag_service_lock:
+        if _semantic_rag_service is None:
+            _semantic_rag_service = SemanticRAGService()
     return _semantic_rag_service
@@ -0,0 +1,190 @@
+"""
+Unit tests for the AI model service (batched summarization, model fingerprint,
+Mistral metrics)
+
+The BARThez pipeline is replaced by a stand-in that reports the generation
+parameters it received: the tests cover the batching logic, not the model.
+"""
+
+import json
+import sys
+from types import SimpleNamespace
+
+import pytest
+import ai_models as ai_models_module
+import onnx_backend
+from ai_models import AIModelService, SUMMARY_BATCH_SIZE
+from utils.cache import ResultCache
+from utils.http_client import CircuitOpenError
+from utils.metrics import FALLBACKS, STAGE_SECONDS
+
+def clause(words, topic="loyer"):
+    """Clause text of the given number of words"""
+    return " ".join([topic] + ["mot"] * (words - 1))
+
+class FakeSummarizer:
+    """Summarization pipeline stand-in: the summary states its topic and length bounds"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, max_length, min_length, do_sample, batch_size):
+        self.calls.append((list(texts), max_length, min_length))
+        return [{"summary_text": f"{text.split()[0]} max={max_length} min={min_length}"} for text in texts]
+
+class TestSummarization:
+    """Test suite for _summarize_batch / summarize_clauses"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        """Fixture for the (singleton) service with the stand-in summarizer, restored afterwards"""
+        service = AIModelService()
+        monkeypatch.setattr(service, "summarizer_pipeline", FakeSummarizer())
+        return service
+
+    def test_long_clause_batched_with_short_one(self, service):
+        """Test a long clause gets full-length bounds even when batched with a short one"""
+        short, long = clause(35, "court"), clause(400, "long")
+
+        summaries = service._summarize_batch([short, long])
+
+        assert summaries == ["court max=24 min=9", "long max=150 min=30"]
+
+    def test_summary_independent_of_batch(self, service):
+        """Test the same clause gets the same summary alone and in any batch"""
+        target = clause(120, "cible")
+        others = [clause(words, f"autre{words}") for words in (31, 48, 75, 260, 500)]
+
+        alone = service._summarize_batch([target])[0]
+        batched = service._summarize_batch(others[:2] + [target] + others[2:])[2]
+        via_batcher = service.summarize_clauses([clause(33), target, clause(900)])[1]
+
+        assert alone == batched == via_batcher == "cible max=96 min=30"
+
+    def test_one_call_per_length_group(self, service):
+        """Test clauses sharing length bounds are generated together, in batches of SUMMARY_BATCH_SIZE"""
+        texts = [clause(300 + i) for i in range(SUMMARY_BATCH_SIZE + 1)] + [clause(42)]
+
+        service._summarize_batch(texts)
+
+        sizes = sorted((len(batch), max_length) for batch, max_length, _ in service.summarizer_pipeline.calls)
+        assert sizes == [(1, 32), (1, 150), (SUMMARY_BATCH_SIZE, 150)]
+
+    def test_summary_bounds_within_source(self):
+        """Test bounds never exceed the clause length"""
+        for words in range(30, 400):
+            max_length, min_length = AIModelService._summary_length_bounds(words)
+
+            assert min_length <= max_length <= words
+
+class TestModelFingerprint:
+    """Test suite for model_fingerprint (part of the analysis cache key)"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        """Fixture for the (singleton) service with no model loaded, ONNX int8 configured"""
+        service = AIModelService()
+        monkeypatch.setattr(service, "_backends", {})
+        monkeypatch.setattr(ai_models_module, "MODEL_BACKEND", "onnx")
+        monkeypatch.setattr(onnx_backend, "ONNX_QUANTIZE", True)
+        # transformers is not needed: the PyTorch pipeline factory is a stand-in
+        monkeypatch.setitem(sys.modules, "transformers", SimpleNamespace(pipeline=lambda task, **kwargs: ("torch", task)))
+        return service
+
+    def test_configured_backend_before_load(self, service):
+        """Test models not loaded yet are reported with the configured backend"""
+        assert "ner=Jean-Baptiste/camembert-ner@onnx-int8" in service.model_fingerprint()
+
+    def test_onnx_loaded(self, service, monkeypatch):
+        """Test a model loaded through ONNX Runtime is reported as such"""
+        monkeypatch.setattr(onnx_backend, "load_onnx_pipeline", lambda task, model_id, **kwargs: ("onnx", task))
+
+        service._build_pipeline("ner", service.NER_MODEL)
+
+        assert f"ner={service.NER_MODEL}@onnx-int8;" in service.model_fingerprint()
+
+    def test_onnx_fallback_reported(self, service, monkeypatch):
+        """Test a model that fell back to PyTorch changes the fingerprint"""
+        def unavailable(task, model_id, **kwargs):
+            raise ImportError("No module named 'optimum'")
+
+        monkeypatch.setattr(onnx_backend, "load_onnx_pipeline", unavailable)
+        before = service.model_fingerprint()
+
+        assert service._build_pipeline("summarization", service.SUMMARIZER_MODEL) == ("torch", "summarization")
+        after = service.model_fingerprint()
+
+        assert f"summarizer={service.SUMMARIZER_MODEL}@torch" in after
+        assert after != before
+
+    def test_failed_load_reported(self, service, monkeypatch):
+        """Test a model that could not be loaded at all is reported as missing"""
+        def unavailable(task, **kwargs):
+            raise OSError("model download failed")
+
+        monkeypatch.setattr(onnx_backend, "load_onnx_pipeline", unavailable)
+        monkeypatch.setitem(sys.modules, "transformers", SimpleNamespace(pipeline=unavailable))
+
+        with pytest.raises(OSError):
+            service._build_pipeline("ner", service.NER_MODEL)
+
+        assert f"ner={service.NER_MODEL}@none;" in service.model_fingerprint()
+
+VERDICT = {"risk_level": "low", "explanation": "Clause standard", "recommendation": "Aucune"}
+
+class FakeMistralClient:
+    """Async client stand-in returning a verdict, or raising the given error"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    async def apost_json(self, url, payload, headers=None):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(status_code=200, json=lambda: [{"generated_text": json.dumps(VERDICT)}])
+
+class TestMistralMetrics:
+    """Test suite for the timing and fallback metrics of analyze_risk_mistral_async"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        """Fixture for the (singleton) service with a token and a private verdict cache"""
+        service = AIModelService()
+        monkeypatch.setattr(service, "hf_token", "hf_test")
+        monkeypatch.setattr(ai_models_module, "verdict_cache", ResultCache("test_verdicts", disk_dir=None))
+        return service
+
+    async def analyze(self, service, monkeypatch, client):
+        """Run one analysis, returning (verdict, fallbacks counted, calls timed)"""
+        monkeypatch.setattr(ai_models_module, "mistral_client", client)
+        fallbacks, timed = FALLBACKS.value(component="mistral"), STAGE_SECONDS.count(stage="mistral")
+        verdict = await service.analyze_risk_mistral_async("Le loyer est de 900 euros.", "financial", "bail")
+        return verdict, FALLBACKS.value(component="mistral") - fallbacks, STAGE_SECONDS.count(stage="mistral") - timed
+
+    @pytest.mark.asyncio
+    async def test_no_token_not_counted(self, service, monkeypatch):
+        """Test the rules path chosen by configuration is neither timed nor counted as a fallback"""
+        monkeypatch.setattr(service, "hf_token", None)
+        client = FakeMistralClient()
+
+        assert await self.analyze(service, monkeypatch, client) == (None, 0, 0)
+        assert client.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_not_timed(self, service, monkeypatch):
+        """Test only the request actually sent is timed, not the cached replay"""
+        client = FakeMistralClient()
+
+        assert await self.analyze(service, monkeypatch, client) == (VERDICT, 0, 1)
+        assert await self.analyze(service, monkeypatch, client) == (VERDICT, 0, 0)
+        assert client.calls == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("error", [CircuitOpenError("open"), TimeoutError("read timeout")])
+    async def test_failure_counted(self, service, monkeypatch, error):
+        """Test a configured endpoint that fails or is circuit-broken counts one fallback"""
+        verdict, fallbacks, timed = await self.analyze(service, monkeypatch, FakeMistralClient(error))
+
+        assert (verdict, fallbacks, timed) == (None, 1, 0)
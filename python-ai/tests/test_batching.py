@@ -0,0 +1,84 @@
+"""
+Unit tests for the dynamic micro-batcher
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from utils.batching import MicroBatcher
+
+class TestMicroBatcher:
+    """Test suite for MicroBatcher"""
+
+    @pytest.fixture
+    def calls(self):
+        """Fixture recording the batches seen by batch_fn"""
+        return []
+
+    @pytest.fixture
+    def batcher(self, calls):
+        """Fixture for a batcher doubling its inputs"""
+        def double(items):
+            calls.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher("test", double, max_batch_size=4, max_wait_ms=50)
+        yield batcher
+        batcher.close()
+
+    def test_single_item(self, batcher, calls):
+        """Test a lone call is served after at most max_wait"""
+        assert batcher.submit(21).result(timeout=1) == 42
+        assert calls == [[21]]
+
+    def test_map_preserves_order(self, batcher, calls):
+        """Test results come back in input order, in batches of max_batch_size"""
+        assert batcher.map(range(10)) == [i * 2 for i in range(10)]
+        assert [len(batch) for batch in calls] == [4, 4, 2]
+
+    def test_concurrent_callers_coalesced(self, batcher, calls):
+        """Test calls from several threads share forward passes"""
+        barrier = threading.Barrier(4)
+
+        def call(i):
+            barrier.wait()
+            return batcher.submit(i).result(timeout=1)
+
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(call, range(4)))
+
+        assert results == [0, 2, 4, 6]
+        assert len(calls) < 4
+        assert batcher.stats()["items"] == 4
+
+    def test_errors_reach_every_caller(self):
+        """Test a failing batch raises in all of its callers"""
+        def fail(items):
+            raise ValueError("boom")
+
+        batcher = MicroBatcher("failing", fail, max_wait_ms=20)
+        futures = [batcher.submit(i) for i in range(3)]
+
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=1)
+        batcher.close()
+
+    def test_result_count_checked(self):
+        """Test batch_fn must return one result per input"""
+        batcher = MicroBatcher("short", lambda items: items[:1], max_wait_ms=20)
+        futures = [batcher.submit(i) for i in range(2)]
+
+        with pytest.raises(RuntimeError):
+            futures[1].result(timeout=1)
+        batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_submit_async(self, batcher):
+        """Test awaiting results from the event loop"""
+        results = await asyncio.gather(*[batcher.submit_async(i) for i in range(3)])
+
+        assert results == [0, 2, 4]
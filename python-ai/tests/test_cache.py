@@ -0,0 +1,106 @@
+"""
+Unit tests for the content-addressed result cache
+"""
+
+import os
+import time
+import pytest
+from utils.cache import ResultCache, content_hash, normalize_text
+
+class TestResultCache:
+    """Test suite for ResultCache"""
+
+    @pytest.fixture
+    def cache(self):
+        """Fixture for a small memory-only cache"""
+        return ResultCache("test", max_entries=2, ttl_seconds=60, disk_dir=None)
+
+    def test_miss_then_hit(self, cache):
+        """Test hit/miss counters"""
+        assert cache.get("a") is None
+        cache.set("a", {"score": 80})
+
+        assert cache.get("a") == {"score": 80}
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self, cache):
+        """Test least recently used entry is evicted"""
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_ttl_expiry(self):
+        """Test expired entries are misses"""
+        cache = ResultCache("test", ttl_seconds=0, disk_dir=None)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+
+    def test_values_are_copied(self, cache):
+        """Test callers cannot mutate cached values"""
+        result = {"clauses": [1, 2]}
+        cache.set("a", result)
+        result["clauses"].append(3)
+
+        cached = cache.get("a")
+        cached["text"] = "mutated"
+
+        assert cache.get("a") == {"clauses": [1, 2]}
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test a new instance reads entries persisted by a previous one"""
+        first = ResultCache("analysis", disk_dir=str(tmp_path))
+        first.set("key", {"contract_type": "Bail"})
+
+        second = ResultCache("analysis", disk_dir=str(tmp_path))
+
+        assert second.get("key") == {"contract_type": "Bail"}
+        assert second.stats()["disk_hits"] == 1
+
+    def test_disk_tier_capped(self, tmp_path):
+        """Test the disk tier stays under disk_max_bytes by pruning the oldest files first"""
+        cache = ResultCache("ocr", disk_dir=str(tmp_path), disk_max_bytes=5000)
+        keys = [content_hash(str(i)) for i in range(10)]
+        for age, key in zip(range(len(keys), 0, -1), keys):
+            cache.set(key, {"text": "x" * 900})
+            stamp = time.time() - age * 60  # Older keys get older mtimes
+            os.utime(cache._disk_path(key), (stamp, stamp))
+
+        files = [path for path in tmp_path.rglob("*.json")]
+        reopened = ResultCache("ocr", disk_dir=str(tmp_path), disk_max_bytes=5000)
+        kept = [key for key in keys if reopened.get(key) is not None]
+
+        assert sum(path.stat().st_size for path in files) <= 5000
+        assert 0 < len(kept) < len(keys)
+        assert kept == keys[-len(kept):]  # The newest entries survive
+
+    def test_disk_tier_unbounded(self, tmp_path):
+        """Test disk_max_bytes=0 never prunes"""
+        cache = ResultCache("ocr", disk_dir=str(tmp_path), disk_max_bytes=0)
+        for i in range(10):
+            cache.set(content_hash(str(i)), {"text": "x" * 900})
+
+        assert len(list(tmp_path.rglob("*.json"))) == 10
+
+    def test_content_hash(self):
+        """Test hashing is stable and separates parts"""
+        assert content_hash("abc") == content_hash(b"abc")
+        assert content_hash("ab", "c") != content_hash("a", "bc")
+        assert len(content_hash(b"%PDF-1.4")) == 64
+
+    def test_normalize_text(self):
+        """Test case/spacing variants of a clause share one key"""
+        a = normalize_text("Le dépôt de garantie\n  est fixé à  UN mois.")
+        b = normalize_text("le dépôt de garantie est fixé à un mois.")
+
+        assert a == b
+        assert content_hash(a) == content_hash(b)
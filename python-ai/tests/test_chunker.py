@@ -102,6 +102,32 @@ This is the third paragraph.
         # Should return empty list or handle gracefully
         assert isinstance(chunks, list)
     
+    def test_article_offsets(self, chunker):
+        """Test article chunk offsets delimit the chunk in the source text"""
+        text = "Préambule.\nArticle 1 - Objet\nLe bailleur loue le logement.\n\nArticle 2 - Loyer\nLe loyer est de 900 euros.\n"
+        chunks = chunker.chunk(text)
+        
+        assert [chunk["clause_number"] for chunk in chunks] == [1, 2]
+        assert chunks[0]["start"] == text.index("Article 1")
+        assert chunks[0]["end"] == chunks[1]["start"] == text.index("Article 2")
+        assert chunks[1]["end"] == len(text)
+        for chunk in chunks:
+            # The marker is rejoined with a space: same text up to whitespace
+            assert chunk["text"].split() == text[chunk["start"]:chunk["end"]].split()
+    
+    def test_paragraph_offsets(self, chunker):
+        """Test paragraph chunk offsets select exactly the chunk text"""
+        text = (
+            "\n  Le bailleur loue au locataire le logement situé au 3 rue des Lilas.  \n\n"
+            "Court.\n\n"
+            "Le loyer mensuel est fixé à 900 euros, payable le premier de chaque mois.\n"
+        )
+        chunks = chunker.chunk(text)
+        
+        assert len(chunks) == 2
+        for chunk in chunks:
+            assert text[chunk["start"]:chunk["end"]] == chunk["text"]
+    
     def test_clause_patterns(self, chunker):
         """Test different clause patterns"""
         patterns = [
@@ -0,0 +1,192 @@
+"""
+Unit tests for the resilient HTTP client (against a local stub server)
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from utils.http_client import ResilientHTTPClient, CircuitBreaker, CircuitOpenError
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Replies with the next scripted (status, delay) of the server"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests += 1
+        status, delay = self.server.script.pop(0) if self.server.script else (200, 0)
+        time.sleep(delay)
+        body = json.dumps([{"generated_text": '{"risk_level": "low"}'}]).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    """Fixture for a local HTTP server; set server.script to a list of (status, delay)"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.script = []
+    server.requests = 0
+    server.url = f"http://127.0.0.1:{server.server_port}/models/stub"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_client(**kwargs):
+    options = dict(connect_timeout=1, read_timeout=1, max_retries=2, backoff_base=0.01, backoff_max=0.02)
+    options.update(kwargs)
+    return ResilientHTTPClient("stub", **options)
+
+class TestResilientHTTPClient:
+    """Test suite for ResilientHTTPClient"""
+
+    def test_success(self, stub_server):
+        """Test a plain request goes through"""
+        client = make_client()
+
+        response = client.post_json(stub_server.url, {"inputs": "x"})
+
+        assert response.status_code == 200
+        assert response.json()[0]["generated_text"] == '{"risk_level": "low"}'
+
+    def test_retries_transient_errors(self, stub_server):
+        """Test 503 (model loading) is retried until success"""
+        stub_server.script = [(503, 0), (503, 0)]
+        client = make_client()
+
+        response = client.post_json(stub_server.url, {})
+
+        assert response.status_code == 200
+        assert stub_server.requests == 3
+
+    def test_client_errors_not_retried(self, stub_server):
+        """Test 4xx responses are returned immediately"""
+        stub_server.script = [(401, 0)]
+        client = make_client()
+
+        response = client.post_json(stub_server.url, {})
+
+        assert response.status_code == 401
+        assert stub_server.requests == 1
+        assert client.breaker.state == "closed"
+
+    def test_read_timeout(self, stub_server):
+        """Test a slow upstream fails after bounded retries instead of hanging"""
+        stub_server.script = [(200, 0.5)] * 2
+        client = make_client(read_timeout=0.1, max_retries=1)
+
+        start = time.monotonic()
+        with pytest.raises(requests.Timeout):
+            client.post_json(stub_server.url, {})
+
+        assert time.monotonic() - start < 1.0
+
+    def test_circuit_opens_and_short_circuits(self, stub_server):
+        """Test requests are refused without network calls once the breaker is open"""
+        stub_server.script = [(503, 0)] * 4
+        client = make_client(max_retries=1, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+        client.post_json(stub_server.url, {})
+        client.post_json(stub_server.url, {})
+        assert client.breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            client.post_json(stub_server.url, {})
+        assert stub_server.requests == 4
+
+    def test_circuit_half_open_recovers(self, stub_server):
+        """Test a successful trial request closes the breaker"""
+        stub_server.script = [(503, 0)]
+        client = make_client(max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+
+        client.post_json(stub_server.url, {})
+        assert client.breaker.state == "open"
+
+        time.sleep(0.1)
+        assert client.breaker.state == "half-open"
+        assert client.post_json(stub_server.url, {}).status_code == 200
+        assert client.breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_async_retries(self, stub_server):
+        """Test the async variant applies the same retry policy"""
+        stub_server.script = [(502, 0)]
+        client = make_client()
+
+        response = await client.apost_json(stub_server.url, {})
+        await client.aclose()
+
+        assert response.status_code == 200
+        assert stub_server.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_trial_releases_breaker(self, stub_server):
+        """Test a half-open trial cancelled mid-request frees the slot without re-opening the breaker"""
+        stub_server.script = [(503, 0), (200, 2)]
+        client = make_client(max_retries=0, read_timeout=5, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+        await client.apost_json(stub_server.url, {})
+        await asyncio.sleep(0.1)
+        assert client.breaker.state == "half-open"
+
+        trial = asyncio.create_task(client.apost_json(stub_server.url, {}))
+        await asyncio.sleep(0.2)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        assert client.breaker.state == "half-open"
+        response = await client.apost_json(stub_server.url, {})
+        await client.aclose()
+
+        assert response.status_code == 200
+        assert client.breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_cancellations_do_not_open_breaker(self, stub_server):
+        """Test cancelled calls (client disconnects) are not counted as upstream failures"""
+        stub_server.script = [(200, 1)] * 4
+        client = make_client(read_timeout=5, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+        for _ in range(4):
+            call = asyncio.create_task(client.apost_json(stub_server.url, {}))
+            await asyncio.sleep(0.1)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+        await client.aclose()
+
+        assert client.breaker.state == "closed"
+        assert client.breaker._failures == 0
+
+    def test_unexpected_error_releases_breaker(self, stub_server, monkeypatch):
+        """Test a non-transport exception during the half-open trial counts as a failure"""
+        client = make_client(max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+        client.breaker.record_failure()
+        time.sleep(0.1)
+
+        def broken_post(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(client.session, "post", broken_post)
+        with pytest.raises(RuntimeError):
+            client.post_json(stub_server.url, {})
+        monkeypatch.undo()
+
+        assert client.breaker.state == "open"
+        time.sleep(0.1)
+        assert client.post_json(stub_server.url, {}).status_code == 200
+        assert client.breaker.state == "closed"
@@ -0,0 +1,159 @@
+"""
+Unit tests for the multi-keyword matcher and contract type detection
+"""
+
+import pytest
+import knowledge.keyword_matcher as keyword_matcher
+from knowledge.keyword_matcher import KeywordMatcher
+from knowledge.contract_detector import ComprehensiveContractDetector, ContractCategory
+
+SAMPLE_TEXTS = [
+    "CONTRAT DE BAIL D'HABITATION. Le bailleur loue au locataire. Loyer mensuel : 800 euros. Dépôt de garantie.",
+    "Contrat de travail à durée indéterminée. Le salarié est soumis à une période d'essai.",
+    "Assurance auto : bonus-malus, bris de glace, conducteur principal, véhicule assuré.",
+    "Le prestataire s'engage à fournir le service SaaS, hébergement et maintenance informatique.",
+    "Texte sans aucun rapport.",
+    "",
+]
+
+@pytest.fixture(params=["default", "pure_python"])
+def matcher_mode(request, monkeypatch):
+    """Run each test with the optional C automaton (if installed) and with the fallback"""
+    if request.param == "pure_python":
+        monkeypatch.setattr(keyword_matcher, "ahocorasick", None)
+    return request.param
+
+class TestKeywordMatcher:
+    """Test suite for KeywordMatcher"""
+
+    def test_overlapping_matches(self, matcher_mode):
+        """Test overlapping and nested keywords are all reported"""
+        matcher = KeywordMatcher(["bail", "bailleur", "leur", "bail commercial"])
+
+        hits = list(matcher.find_all("le bailleur et le bail commercial"))
+
+        assert (3, 7, "bail") in hits
+        assert (3, 11, "bailleur") in hits
+        assert (7, 11, "leur") in hits
+        assert (18, 22, "bail") in hits
+        assert (18, 33, "bail commercial") in hits
+        assert len(hits) == 5
+
+    def test_matches_brute_force(self, matcher_mode):
+        """Test offsets match a brute-force substring search"""
+        keywords = ["a", "ab", "bab", "bc", "bca", "c", "caa"]
+        text = "abccab bcaab babcaa"
+        matcher = KeywordMatcher(keywords)
+
+        expected = sorted(
+            (i, i + len(kw), kw)
+            for kw in keywords
+            for i in range(len(text))
+            if text.startswith(kw, i)
+        )
+
+        assert sorted(matcher.find_all(text)) == expected
+
+    def test_present(self, matcher_mode):
+        """Test present() has `keyword in text` semantics"""
+        matcher = KeywordMatcher(["vol", "volonté", "incendie"])
+
+        assert matcher.present("la volonté des parties") == {"vol", "volonté"}
+        assert matcher.present("") == set()
+
+    def test_empty_keyword_set(self, matcher_mode):
+        """Test a matcher without keywords finds nothing"""
+        assert list(KeywordMatcher([]).find_all("texte")) == []
+
+class TestContractDetection:
+    """Detection must be identical to the per-keyword substring scan"""
+
+    @staticmethod
+    def legacy_detect(detector, text):
+        """Reference implementation (one substring search per keyword)"""
+        text_lower = text.lower()
+        scores = []
+        for contract_def in detector.contract_types:
+            matches = [kw for kw in contract_def.keywords if kw.lower() in text_lower]
+            if matches:
+                confidence = (len(matches) / len(contract_def.keywords)) * contract_def.priority
+                scores.append((contract_def.key, min(1.0, confidence), contract_def.name, contract_def.category))
+        if not scores:
+            return ('prestation_services', 0.5, 'Contrat de Prestation de Services', ContractCategory.FREELANCE)
+        return max(scores, key=lambda x: x[1])
+
+    @pytest.mark.parametrize("text", SAMPLE_TEXTS)
+    def test_detect_contract_type_unchanged(self, matcher_mode, text):
+        """Test outputs match the legacy algorithm"""
+        detector = ComprehensiveContractDetector()
+
+        assert detector.detect_contract_type(text) == self.legacy_detect(detector, text)
+
+    def test_default_type(self, matcher_mode):
+        """Test fallback when no keyword matches"""
+        detector = ComprehensiveContractDetector()
+
+        key, confidence, _, _ = detector.detect_contract_type("xyz")
+
+        assert key == "prestation_services"
+        assert confidence == 0.5
+
+CLAUSE_TEXT = (
+    "Article 1 - Durée\nLe contrat est conclu pour un an. Il se renouvelle par TACITE RECONDUCTION "
+    "pour la même durée.\n\n"
+    "Article 2 - Résiliation\nEn cas de rupture anticipée, des Frais de Résiliation de 50 € sont dus. "
+    + "Le client est informé de ses droits. " * 10 +
+    "\n\nArticle 3 - Force majeure\nAucune partie n'est responsable en cas de force majeure ou de cas fortuit."
+)
+
+class TestClauseHits:
+    """Test suite for scan() hit offsets and transversal clause hit details"""
+
+    def test_scan_offsets(self, matcher_mode):
+        """Test each scan hit is the keyword at text[start:end] (case-insensitive)"""
+        detector = ComprehensiveContractDetector()
+
+        hits = detector.scan(CLAUSE_TEXT)
+
+        assert hits
+        for start, end, keyword in hits:
+            assert CLAUSE_TEXT[start:end].lower() == keyword
+
+    def test_clause_hit_offsets(self, matcher_mode):
+        """Test each transversal clause hit points at its keyword in the original text"""
+        detector = ComprehensiveContractDetector()
+
+        detected = detector.detect_transversal_clauses(CLAUSE_TEXT)
+
+        assert {"tacite_reconduction", "force_majeure"} <= {clause["id"] for clause in detected}
+        for clause in detected:
+            for hit in clause["hits"]:
+                assert CLAUSE_TEXT[hit["start"]:hit["end"]].lower() == hit["keyword"].lower()
+                assert hit["keyword"] in clause["matches"]
+
+    def test_snippets_bounded(self, matcher_mode):
+        """Test snippets contain their hit and stay within SNIPPET_RADIUS of it"""
+        detector = ComprehensiveContractDetector()
+        radius = detector.SNIPPET_RADIUS
+
+        detected = detector.detect_transversal_clauses(CLAUSE_TEXT)
+
+        for clause in detected:
+            for hit in clause["hits"]:
+                snippet = hit["snippet"]
+                assert CLAUSE_TEXT[hit["start"]:hit["end"]] in snippet
+                assert len(snippet) <= (hit["end"] - hit["start"]) + 2 * radius + len("......")
+                assert snippet.startswith("...") == (hit["start"] > radius)
+                assert snippet.endswith("...") == (hit["end"] + radius < len(CLAUSE_TEXT))
+
+    def test_hits_capped(self, matcher_mode):
+        """Test hits are capped at MAX_HITS_PER_CLAUSE, in text order, while hit_count counts them all"""
+        detector = ComprehensiveContractDetector()
+        text = "Cas de force majeure. " * (detector.MAX_HITS_PER_CLAUSE + 3)
+
+        clause = next(c for c in detector.detect_transversal_clauses(text) if c["id"] == "force_majeure")
+
+        assert clause["hit_count"] == detector.MAX_HITS_PER_CLAUSE + 3
+        assert len(clause["hits"]) == detector.MAX_HITS_PER_CLAUSE
+        starts = [hit["start"] for hit in clause["hits"]]
+        assert starts == sorted(starts)
@@ -0,0 +1,99 @@
+"""
+Unit tests for page layout analysis (projection profiles)
+"""
+
+import numpy as np
+import pytest
+from extraction.layout import runs, merge_runs, estimate_line_height, find_text_regions
+
+def page_with_lines(line_height, gap, count=10, width=600, margin=40):
+    """White page with `count` dark text-like bands of the given height"""
+    page = np.full((margin * 2 + count * (line_height + gap), width), 255, dtype=np.uint8)
+    top = margin
+    for _ in range(count):
+        # Dashed band: ink on part of the row, like characters
+        page[top:top + line_height, margin:width - margin:3] = 0
+        top += line_height + gap
+    return page
+
+class TestRuns:
+    """Test suite for runs"""
+
+    def test_runs_found(self):
+        """Test maximal runs are returned with exclusive ends"""
+        assert runs(np.array([0, 1, 1, 0, 0, 1, 0, 1])) == [(1, 3), (5, 6), (7, 8)]
+
+    def test_no_runs(self):
+        """Test an empty profile gives no runs"""
+        assert runs(np.zeros(5)) == []
+
+    def test_merge_runs(self):
+        """Test runs closer than max_gap are joined"""
+        assert merge_runs([(0, 2), (4, 6), (20, 25)], max_gap=5) == [(0, 6), (20, 25)]
+
+class TestEstimateLineHeight:
+    """Test suite for estimate_line_height"""
+
+    @pytest.mark.parametrize("line_height", [8, 14, 30])
+    def test_line_height_measured(self, line_height):
+        """Test the median band height is returned"""
+        page = page_with_lines(line_height, gap=line_height // 2)
+
+        assert estimate_line_height(page) == line_height
+
+    def test_blank_page(self):
+        """Test a page without ink has no line height"""
+        assert estimate_line_height(np.full((100, 100), 255, dtype=np.uint8)) is None
+
+    def test_rules_ignored(self):
+        """Test full-width rules and specks do not count as text lines"""
+        page = page_with_lines(12, gap=6)
+        page[5:7, :] = 0  # Horizontal rule
+        page[-3, 10] = 0  # Speck
+
+        assert estimate_line_height(page) == 12
+
+class TestFindTextRegions:
+    """Test suite for find_text_regions"""
+
+    def test_margins_and_blank_half_skipped(self):
+        """Test a half-empty page gives one box around its text, margins excluded"""
+        text = page_with_lines(12, gap=6, count=10, width=600, margin=40)
+        page = np.full((text.shape[0] * 2, 600), 255, dtype=np.uint8)
+        page[:text.shape[0]] = text
+
+        regions = find_text_regions(page)
+
+        assert len(regions) == 1
+        left, top, right, bottom = regions[0]
+        assert 30 <= left <= 40 and 560 <= right <= 570
+        assert 30 <= top <= 40 and bottom < text.shape[0]
+
+    def test_blocks_in_reading_order(self):
+        """Test a large blank stretch splits regions, paragraph spacing does not"""
+        first = page_with_lines(12, gap=18, count=4)  # Wide line spacing, still one block
+        second = page_with_lines(12, gap=6, count=3)
+        blank = np.full((200, 600), 255, dtype=np.uint8)
+        page = np.vstack([first, blank, second])
+
+        regions = find_text_regions(page)
+
+        assert len(regions) == 2
+        assert regions[0][3] <= first.shape[0] + 10
+        assert regions[1][1] >= first.shape[0] + 200
+
+    def test_blank_page(self):
+        """Test a page without ink has no regions"""
+        assert find_text_regions(np.full((300, 200), 255, dtype=np.uint8)) == []
+
+    def test_specks_and_rules_ignored(self):
+        """Test dust in the margin does not widen the box and a lone rule is not a region"""
+        page = np.full((800, 600), 255, dtype=np.uint8)
+        page[100:300] = page_with_lines(12, gap=6, count=10, width=600, margin=40)[:200]
+        page[150:152, 590:592] = 0  # Speck in the right margin
+        page[600:602, 50:550] = 0  # Rule far below the text
+
+        regions = find_text_regions(page, line_height=12)
+
+        assert len(regions) == 1
+        assert regions[0][2] < 580
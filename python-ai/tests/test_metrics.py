@@ -0,0 +1,93 @@
+"""
+Unit tests for the metrics registry and Prometheus rendering
+"""
+
+import pytest
+from utils.metrics import MetricsRegistry, timed, _Metric
+
+class TestMetrics:
+    """Test suite for counters, histograms and text exposition"""
+
+    @pytest.fixture
+    def registry(self):
+        """Fixture for an isolated registry"""
+        return MetricsRegistry()
+
+    def test_counter(self, registry):
+        """Test counters accumulate per label set"""
+        fallbacks = registry.counter("fallbacks_total", "Fallbacks", ["component"])
+        fallbacks.inc(component="mistral")
+        fallbacks.inc(2, component="mistral")
+        fallbacks.inc(component="rag")
+
+        assert fallbacks.value(component="mistral") == 3
+        assert 'fallbacks_total{component="rag"} 1' in registry.render()
+
+    def test_histogram_buckets(self, registry):
+        """Test buckets are cumulative and +Inf equals the count"""
+        stages = registry.histogram("stage_seconds", "Stages", ["stage"], buckets=[0.1, 1.0])
+        for value in (0.05, 0.5, 5.0):
+            stages.observe(value, stage="ocr_page")
+
+        text = registry.render()
+
+        assert '# TYPE stage_seconds histogram' in text
+        assert 'stage_seconds_bucket{stage="ocr_page",le="0.1"} 1' in text
+        assert 'stage_seconds_bucket{stage="ocr_page",le="1"} 2' in text
+        assert 'stage_seconds_bucket{stage="ocr_page",le="+Inf"} 3' in text
+        assert 'stage_seconds_sum{stage="ocr_page"} 5.55' in text
+        assert 'stage_seconds_count{stage="ocr_page"} 3' in text
+
+    def test_timer_records_failures(self, registry):
+        """Test the timer observes the block even when it raises"""
+        stages = registry.histogram("stage_seconds", "Stages", ["stage"])
+
+        with pytest.raises(RuntimeError):
+            with stages.time(stage="ner"):
+                raise RuntimeError("model crashed")
+
+        assert stages.count(stage="ner") == 1
+
+    def test_labels_validated(self, registry):
+        """Test missing or unknown labels are rejected"""
+        counter = registry.counter("hits_total", "Hits", ["cache"])
+
+        with pytest.raises(ValueError):
+            counter.inc(model="ner")
+
+    def test_metric_types_render_samples(self):
+        """Test a metric type must implement samples()"""
+        class Gauge(_Metric):
+            type_name = "gauge"
+
+        with pytest.raises(TypeError):
+            Gauge("queue_depth", "Queued jobs")
+
+    def test_label_escaping(self, registry):
+        """Test label values are escaped"""
+        counter = registry.counter("errors_total", "Errors", ["reason"])
+        counter.inc(reason='bad "quote"\n')
+
+        assert 'errors_total{reason="bad \\"quote\\"\\n"} 1' in registry.render()
+
+    def test_collector(self, registry):
+        """Test collectors are read at render time"""
+        hits = {"ocr": 0}
+        registry.register_collector(lambda: [
+            ("cache_hits_total", "counter", "Hits", [("", {"cache": name}, value) for name, value in hits.items()])
+        ])
+        hits["ocr"] = 4
+
+        assert 'cache_hits_total{cache="ocr"} 4' in registry.render()
+
+    @pytest.mark.asyncio
+    async def test_timed(self):
+        """Test timed() returns the awaited value and records the stage"""
+        from utils.metrics import STAGE_SECONDS
+
+        async def stage():
+            return 42
+
+        before = STAGE_SECONDS.count(stage="test_stage")
+        assert await timed("test_stage", stage()) == 42
+        assert STAGE_SECONDS.count(stage="test_stage") == before + 1
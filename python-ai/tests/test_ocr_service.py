@@ -0,0 +1,207 @@
+"""
+Unit tests for OCR page rendering and Tesseract result scoring
+"""
+
+import threading
+import fitz
+import numpy as np
+import pytest
+from PIL import Image
+import extraction.ocr_service as ocr_module
+from utils import FITZ_LOCK
+from extraction.ocr_service import ocr_service, _render_gray, _text_from_tesseract_data, OCR_MIN_DPI, OCR_MAX_DPI
+
+def tesseract_data(rows):
+    """image_to_data-style dict from (text, conf, block, par, line) rows"""
+    keys = ("text", "conf", "block_num", "par_num", "line_num")
+    return {key: [row[i] for row in rows] for i, key in enumerate(keys)}
+
+def scanned_page(fontsize, lines=15):
+    """Image-only page of text at the given font size"""
+    source = fitz.open()
+    source.new_page().insert_textbox(fitz.Rect(50, 50, 545, 800), "Le loyer mensuel est fixé à 800 euros.\n" * lines,
+                                     fontsize=fontsize)
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_image(page.rect, stream=source[0].get_pixmap(dpi=200).tobytes("png"))
+    return doc, page
+
+class TestTesseractData:
+    """Test suite for _text_from_tesseract_data"""
+
+    def test_lines_and_paragraphs(self):
+        """Test words are grouped by line, paragraphs separated by a blank line"""
+        data = tesseract_data([
+            ("", -1, 1, 0, 0),
+            ("Article", 96, 1, 1, 1), ("1", 90, 1, 1, 1),
+            ("Le", 95, 1, 1, 2), ("loyer", 91, 1, 1, 2),
+            ("Fait", 88, 1, 2, 1),
+        ])
+
+        text, _, words = _text_from_tesseract_data(data)
+
+        assert text == "Article 1\nLe loyer\n\nFait"
+        assert words == 5
+
+    def test_confidence_weighted_by_length(self):
+        """Test long words weigh more than short ones, layout rows are ignored"""
+        data = tesseract_data([("", -1, 1, 1, 1), ("a", 10, 1, 1, 1), ("contrat", 90, 1, 1, 1)])
+
+        _, confidence, _ = _text_from_tesseract_data(data)
+
+        assert confidence == pytest.approx((10 * 1 + 90 * 7) / 8 / 100)
+
+    def test_empty(self):
+        """Test no words gives zero confidence"""
+        assert _text_from_tesseract_data(tesseract_data([("", -1, 1, 0, 0)])) == ("", 0.0, 0)
+
+class TestRendering:
+    """Test suite for page rendering and DPI selection"""
+
+    def test_render_gray_shape(self):
+        """Test the raw pixmap buffer becomes a height x width uint8 array"""
+        doc, page = scanned_page(10)
+
+        pixels = _render_gray(page, 72)
+
+        assert pixels.shape == (round(page.rect.height), round(page.rect.width))
+        assert pixels.dtype.name == "uint8"
+        doc.close()
+
+    def test_small_print_gets_more_dpi(self):
+        """Test smaller text is rendered at a higher resolution, within bounds"""
+        small_doc, small = scanned_page(7)
+        large_doc, large = scanned_page(14)
+
+        small_dpi, large_dpi = ocr_service._choose_dpi(small), ocr_service._choose_dpi(large)
+
+        assert OCR_MIN_DPI <= large_dpi < small_dpi <= OCR_MAX_DPI
+        small_doc.close()
+        large_doc.close()
+
+    def test_render_waits_for_fitz_lock(self):
+        """Test a render does not enter MuPDF while another thread holds FITZ_LOCK"""
+        doc, page = scanned_page(10)
+        rendered = threading.Event()
+        renderer = threading.Thread(target=lambda: (_render_gray(page, 72), rendered.set()))
+
+        with FITZ_LOCK:
+            renderer.start()
+            assert not rendered.wait(0.3)
+        renderer.join(5)
+
+        assert rendered.is_set()
+        doc.close()
+
+class TestRegionOCR:
+    """Test suite for the layout pre-pass and region OCR"""
+
+    def test_half_empty_page(self):
+        """Test only the text at the top of a half-empty page is planned for OCR"""
+        doc, page = scanned_page(11, lines=8)
+
+        dpi, line_height = ocr_service._plan_page(page)
+        pixels = _render_gray(page, dpi)
+        regions = ocr_service._text_regions(pixels, line_height)
+
+        assert regions
+        assert all(bottom < pixels.shape[0] / 2 for _, _, _, bottom in regions)
+        assert all(left > 30 * dpi / 72 for left, _, _, _ in regions)
+        doc.close()
+
+    def test_faint_small_print_inside_regions(self):
+        """Test faint and small print gets regions: no ink Tesseract would binarize lies outside the crops"""
+        source = fitz.open()
+        text_page = source.new_page()
+        text_page.insert_textbox(fitz.Rect(50, 50, 545, 250), "Le loyer mensuel est fixé à 800 euros.\n" * 8, fontsize=11)
+        gray = (0.6, 0.6, 0.6)
+        text_page.insert_textbox(fitz.Rect(50, 700, 545, 740), "* Charges locatives récupérables en sus, "
+                                 "régularisées chaque année.", fontsize=6, color=gray)
+        text_page.insert_textbox(fitz.Rect(520, 800, 545, 820), "3", fontsize=6, color=gray)
+        text_page.insert_textbox(fitz.Rect(400, 400, 545, 420), "Lu et approuvé", fontsize=5, color=(0.7, 0.7, 0.7))
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=text_page.get_pixmap(dpi=300).tobytes("png"))
+
+        dpi, line_height = ocr_service._plan_page(page)
+        pixels = _render_gray(page, dpi)
+        regions = ocr_service._text_regions(pixels, line_height)
+
+        assert regions
+        ink = pixels < ocr_module.BINARIZE_THRESHOLD
+        inside = np.zeros_like(ink)
+        for left, top, right, bottom in regions:
+            inside[top:bottom, left:right] = True
+        assert ink.sum() > 0
+        assert not (ink & ~inside).any()
+        doc.close()
+
+    def test_faint_page_not_blank(self, monkeypatch):
+        """Test a page holding only faint small print is OCR'd, not reported blank"""
+        source = fitz.open()
+        source.new_page().insert_textbox(fitz.Rect(50, 780, 545, 800), "Paraphe du locataire", fontsize=6,
+                                         color=(0.7, 0.7, 0.7))
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=source[0].get_pixmap(dpi=300).tobytes("png"))
+        monkeypatch.setattr(ocr_service, "optimized_tesseract_ocr", lambda image, regions=None: {
+            "text": "Paraphe du locataire " * 2, "confidence": 0.9, "words": 6, "duration_ms": 1
+        })
+
+        assert ocr_service._ocr_page(page, 1)[1] == "tesseract"
+        doc.close()
+
+    def test_blank_page_not_ocred(self, monkeypatch):
+        """Test a blank scanned page is reported blank without running an OCR engine"""
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=fitz.open().new_page().get_pixmap(dpi=100).tobytes("png"))
+
+        def no_ocr(*args, **kwargs):
+            raise AssertionError("OCR engine called on a blank page")
+        monkeypatch.setattr(ocr_service, "optimized_tesseract_ocr", no_ocr)
+
+        assert ocr_service._ocr_page(page, 1) == ("", "blank", 0.0, 0)
+        doc.close()
+
+    def test_regions_read_in_order(self, monkeypatch):
+        """Test each region is OCR'd on its own crop and texts are joined in region order"""
+        seen = []
+
+        def fake_tesseract(image, lang, psm):
+            seen.append(image.size)
+            return f"Bloc numero {len(seen)}", 0.9, 3
+        monkeypatch.setattr(ocr_module, "_run_tesseract", fake_tesseract)
+
+        result = ocr_service.optimized_tesseract_ocr(
+            Image.new("L", (400, 300), 255), regions=[(10, 10, 210, 60), (0, 100, 400, 160)]
+        )
+
+        assert seen == [(200, 50), (400, 60)]
+        assert result["text"] == "Bloc numero 1\n\nBloc numero 2"
+        assert result["words"] == 6
+        assert result["confidence"] == pytest.approx(0.9)
+
+class TestWorkerJob:
+    """Test suite for the pdf_page job run by the OCR worker processes"""
+
+    def test_document_closed_after_page(self, tmp_path, monkeypatch):
+        """Test the job does not keep the spooled PDF open once the page is done"""
+        pdf_path = str(tmp_path / "upload.pdf")
+        doc, _ = scanned_page(11, lines=2)
+        doc.save(pdf_path)
+        doc.close()
+
+        opened = []
+        real_open = ocr_module.fitz.open
+
+        def tracking_open(*args, **kwargs):
+            opened.append(real_open(*args, **kwargs))
+            return opened[-1]
+        monkeypatch.setattr(ocr_module.fitz, "open", tracking_open)
+        monkeypatch.setattr(ocr_service, "_ocr_page", lambda page, number: (f"page {number}", "tesseract", 0.9, 5))
+
+        result = ocr_module._ocr_page_worker(pdf_path, 0)
+
+        assert result[:4] == ("page 1", "tesseract", 0.9, 5)
+        assert len(opened) == 1 and opened[0].is_closed
@@ -0,0 +1,53 @@
+"""
+Unit tests for the ONNX backend export cache (no optimum needed)
+"""
+
+import os
+import pytest
+import onnx_backend
+from onnx_backend import _publish, cache_path
+
+def make_export(directory, graph="model_quantized.onnx"):
+    """Directory holding a (fake) exported graph"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, graph), "wb") as f:
+        f.write(b"graph")
+    return str(directory)
+
+class TestPublish:
+    """Test suite for moving a finished export into the cache"""
+
+    def test_rename(self, tmp_path):
+        """Test the export becomes the cached model directory"""
+        tmp_dir = make_export(tmp_path / "tmp123")
+        target = str(tmp_path / "int8")
+
+        assert _publish(tmp_dir, target) is True
+        assert os.listdir(target) == ["model_quantized.onnx"]
+        assert not os.path.exists(tmp_dir)
+
+    def test_concurrent_export_kept(self, tmp_path):
+        """Test losing the rename race to another worker keeps its export and drops ours"""
+        target = make_export(tmp_path / "int8", graph="winner.onnx")
+        tmp_dir = make_export(tmp_path / "tmp123", graph="loser.onnx")
+
+        assert _publish(tmp_dir, target) is False
+        assert os.listdir(target) == ["winner.onnx"]
+        assert not os.path.exists(tmp_dir)
+
+    def test_rename_error_without_export(self, tmp_path, monkeypatch):
+        """Test a failed rename with no usable export in place is raised"""
+        def refuse(src, dst):
+            raise PermissionError("access denied")
+
+        tmp_dir = make_export(tmp_path / "tmp123")
+        monkeypatch.setattr(onnx_backend.os, "replace", refuse)
+
+        with pytest.raises(PermissionError):
+            _publish(tmp_dir, str(tmp_path / "int8"))
+        assert not os.path.exists(tmp_dir)
+
+    def test_cache_path(self):
+        """Test model variants get separate directories"""
+        assert cache_path("moussaKam/barthez", True, "cache") == os.path.join("cache", "moussaKam__barthez", "int8")
+        assert cache_path("moussaKam/barthez", False, "cache") == os.path.join("cache", "moussaKam__barthez", "fp32")
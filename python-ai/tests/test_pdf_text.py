@@ -0,0 +1,77 @@
+"""
+Unit tests for per-page native/scanned routing
+"""
+
+import pytest
+import fitz
+from extraction.pdf_text import extract_native_pages, assemble_pages
+
+NATIVE_TEXT = "Article 1 - Loyer\nLe loyer mensuel est fixé à 800 euros, payable le 5 de chaque mois."
+
+def add_native_page(doc, text=NATIVE_TEXT):
+    doc.new_page().insert_text((72, 72), text)
+
+def add_scanned_page(doc, stamp=""):
+    """Image-only page (optionally with a short text stamp, as some scanners add)"""
+    source = fitz.open()
+    source.new_page().insert_text((72, 72), NATIVE_TEXT)
+    pixmap = source[0].get_pixmap(dpi=40)
+    page = doc.new_page()
+    page.insert_image(page.rect, stream=pixmap.tobytes("png"))
+    if stamp:
+        page.insert_text((20, 20), stamp)
+
+class TestExtractNativePages:
+    """Test suite for extract_native_pages"""
+
+    @pytest.fixture
+    def doc(self):
+        doc = fitz.open()
+        yield doc
+        doc.close()
+
+    def test_mixed_document(self, doc):
+        """Test a scanned cover and scanned annexes are routed to OCR, native pages are not"""
+        add_scanned_page(doc)
+        add_native_page(doc)
+        add_native_page(doc)
+        add_scanned_page(doc, stamp="Scan 12/03")
+
+        pages = extract_native_pages(doc)
+
+        assert [page for page, text in pages.items() if text is None] == [1, 4]
+        assert "loyer mensuel" in pages[2]
+
+    def test_blank_native_page_not_ocred(self, doc):
+        """Test an empty page without images stays on the native path"""
+        add_native_page(doc)
+        doc.new_page()
+
+        pages = extract_native_pages(doc)
+
+        assert pages[2] is not None
+
+    def test_long_text_layer_over_image_is_native(self, doc):
+        """Test a page with an image and a real text layer is not OCR'd"""
+        add_scanned_page(doc, stamp=NATIVE_TEXT)
+
+        assert extract_native_pages(doc)[1] is not None
+
+class TestAssemblePages:
+    """Test suite for assemble_pages"""
+
+    def test_page_order_kept(self):
+        """Test OCR'd pages are merged between native pages, in page order"""
+        native = {1: "Page un", 2: None, 3: "Page trois"}
+
+        text = assemble_pages(native, {2: "Page deux (OCR)"})
+
+        assert text == "Page un\n--- Page 2 ---\nPage deux (OCR)\n\nPage trois\n"
+
+    def test_all_native_unchanged(self):
+        """Test a native document gives the plain concatenated text layer"""
+        assert assemble_pages({1: "A", 2: "B"}, {}) == "A\nB\n"
+
+    def test_empty_ocr_page_skipped(self):
+        """Test unreadable OCR pages leave no empty marker"""
+        assert assemble_pages({1: "A", 2: None}, {2: "  "}) == "A\n"
@@ -2,7 +2,10 @@
 Integration tests for the complete pipeline
 """
 
+import threading
+import time
 import pytest
+import pipeline as pipeline_module
 from pipeline import ContractAIPipeline
 
 class TestPipeline:
@@ -110,3 +113,118 @@ Clause normale et conforme.
         assert len(result["recommendations"]) > 0
         assert "priority" in result["recommendations"][0]
         assert "action" in result["recommendations"][0]
+    
+    @pytest.mark.asyncio
+    async def test_process_stream_events(self, pipeline):
+        """Test stage events arrive before the final result"""
+        text = """
+CONTRAT DE BAIL D'HABITATION
+
+Article 1 - Loyer
+Le loyer mensuel est de 900 euros.
+
+Article 2 - Durée
+Le bail est conclu pour une durée de 3 ans.
+"""
+        
+        events = [event async for event in pipeline.process_stream(text)]
+        types = [event["type"] for event in events]
+        
+        assert types[0] == "contract_type"
+        assert types[-1] == "result"
+        assert types.index("entities") < types.index("risks") < types.index("score")
+        
+        clause_events = [event for event in events if event["type"] == "clause"]
+        result = events[-1]["data"]
+        assert sorted(event["index"] for event in clause_events) == list(range(len(result["clauses"])))
+        assert [event["clause"] for event in sorted(clause_events, key=lambda e: e["index"])] == result["clauses"]
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mistral_verdict, cached", [
+        (None, False),
+        ({"risk_level": "low", "explanation": "RAS", "recommendation": "Aucune"}, True),
+    ])
+    async def test_rules_fallback_not_cached(self, pipeline, monkeypatch, mistral_verdict, cached):
+        """Test an analysis where Mistral fell back to rules is not cached under the Mistral key"""
+        import pipeline as pipeline_module
+        from ai_models import ai_models
+        from utils.cache import ResultCache
+        
+        async def analyze_risk_mistral_async(clause_text, clause_type, contract_type):
+            return mistral_verdict
+        
+        cache = ResultCache("test-analysis", disk_dir=None)
+        monkeypatch.setattr(pipeline_module, "analysis_cache", cache)
+        monkeypatch.setattr(ai_models, "hf_token", "token")
+        monkeypatch.setattr(ai_models, "analyze_risk_mistral_async", analyze_risk_mistral_async)
+        
+        result = await pipeline.process("Article 1 - Loyer\nLe loyer mensuel est de 900 euros.")
+        
+        expected_source = "mistral" if mistral_verdict else "rules"
+        assert all(clause["risk_source"] == expected_source for clause in result["clauses"])
+        assert (cache.stats()["entries"] == 1) is cached
+    
+    def test_link_hits_to_chunks(self, pipeline):
+        """Test each hit gets the clause_number of the chunk containing it, None between chunks"""
+        chunks = [
+            {"clause_number": 1, "start": 10, "end": 50},
+            {"clause_number": 2, "start": 50, "end": 90},
+            {"clause_number": 3, "start": 120, "end": 200},
+        ]
+        detected = [
+            {"hits": [{"start": 10}, {"start": 49}, {"start": 50}, {"start": 150}]},
+            {"hits": [{"start": 0}, {"start": 95}, {"start": 200}]},
+        ]
+        
+        pipeline._link_hits_to_chunks(detected, chunks)
+        
+        assert [hit["clause_number"] for hit in detected[0]["hits"]] == [1, 1, 2, 3]
+        assert detected[0]["clause_numbers"] == [1, 2, 3]
+        assert [hit["clause_number"] for hit in detected[1]["hits"]] == [None, None, None]
+        assert detected[1]["clause_numbers"] == []
+    
+    @pytest.mark.asyncio
+    async def test_hits_refer_to_cleaned_text(self, pipeline):
+        """Test hit offsets index cleaned_text and link to the clause holding the keyword"""
+        text = """
+CONTRAT DE PRESTATION
+
+Article 1 - Durée
+Le contrat est conclu pour un an, renouvelable par tacite reconduction.
+
+Article 2 - Responsabilité
+Aucune partie n'est responsable en cas de force majeure.
+"""
+        
+        result = await pipeline.process(text)
+        cleaned_text = result["cleaned_text"]
+        clauses = {clause["clause_number"]: clause["full_text"] for clause in result["clauses"]}
+        detected = {clause["id"]: clause for clause in result["detected_clauses"]}
+        
+        assert {"tacite_reconduction", "force_majeure"} <= set(detected)
+        for clause in detected.values():
+            for hit in clause["hits"]:
+                assert cleaned_text[hit["start"]:hit["end"]].lower() == hit["keyword"].lower()
+                assert hit["keyword"].lower() in clauses[hit["clause_number"]].lower()
+        assert detected["tacite_reconduction"]["clause_numbers"] == [1]
+        assert detected["force_majeure"]["clause_numbers"] == [2]
+
+    def test_get_pipeline_builds_once(self, monkeypatch):
+        """Test concurrent first calls to get_pipeline share one instance"""
+        built = []
+
+        def slow_init(self):
+            time.sleep(0.05)
+            built.append(self)
+
+        monkeypatch.setattr(ContractAIPipeline, "__init__", slow_init)
+        monkeypatch.setattr(pipeline_module, "_pipeline", None)
+        pipelines = []
+        threads = [threading.Thread(target=lambda: pipelines.append(pipeline_module.get_pipeline())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(built) == 1
+        assert all(instance is built[0] for instance in pipelines)
@@ -0,0 +1,178 @@
+"""
+Unit tests for the semantic RAG service (batched search, embedding cache)
+
+sentence-transformers and FAISS are replaced by small deterministic stand-ins:
+the tests cover the service's own logic, not the models.
+"""
+
+import threading
+import time
+import zlib
+import numpy as np
+import pytest
+from rag_service import LegalRAGService
+import rag_service_semantic
+from rag_service_semantic import SemanticRAGService
+
+DIMENSION = 64
+
+class FakeEncoder:
+    """Deterministic SentenceTransformer.encode stand-in (hashed character trigrams)"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), DIMENSION), dtype=np.float32)
+        for row, text in enumerate(texts):
+            text = text.lower()
+            for i in range(len(text) - 2):
+                vectors[row, zlib.crc32(text[i:i + 3].encode("utf-8")) % DIMENSION] += 1
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+class FlatL2Index:
+    """faiss.IndexFlatL2 stand-in: exact squared L2 search"""
+
+    def __init__(self, embeddings):
+        self.vectors = np.asarray(embeddings, dtype=np.float32)
+
+    def search(self, queries, k):
+        distances = ((queries[:, None, :] - self.vectors[None, :, :]) ** 2).sum(axis=2)
+        indices = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(distances, indices, axis=1), indices
+
+def make_service(cache_dir, articles=None):
+    """Service with the stand-in model, without running __init__ (which loads the real one)"""
+    service = SemanticRAGService.__new__(SemanticRAGService)
+    service.kb_path = "knowledge_base"
+    service.cache_dir = str(cache_dir)
+    service.model = FakeEncoder()
+    service.articles = articles if articles is not None else LegalRAGService._get_complete_knowledge_base()[:10]
+    service.index = None
+    return service
+
+CLAUSES = [
+    ("Le loyer mensuel est fixé à 900 euros, payable le 1er de chaque mois.", "financial"),
+    ("Le bail est conclu pour une durée de trois ans renouvelable.", "duration"),
+    ("Le locataire peut donner congé avec un préavis de trois mois.", "termination"),
+    ("Un dépôt de garantie d'un mois de loyer est versé à la signature.", "financial"),
+]
+
+class TestBatchedSearch:
+    """Test suite for search_relevant_articles_batch / enrich_clauses_batch"""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        """Fixture for a service indexed over a few real articles"""
+        service = make_service(tmp_path)
+        embeddings, _ = service._load_or_update_embeddings()
+        service.index = FlatL2Index(embeddings)
+        return service
+
+    def test_search_batch_matches_sequential(self, service):
+        """Test row i of a batched search equals the single-query search"""
+        texts = [text for text, _ in CLAUSES]
+        types = [clause_type for _, clause_type in CLAUSES]
+
+        batched = service.search_relevant_articles_batch(texts, types, top_k=3)
+        sequential = [service.search_relevant_articles(text, clause_type, top_k=3)
+                      for text, clause_type in CLAUSES]
+
+        assert batched == sequential
+        assert all(len(row) == 3 for row in batched)
+
+    def test_enrich_batch_matches_sequential(self, service):
+        """Test batched enrichment equals per-clause enrichment, with one encode call"""
+        service.model.calls.clear()
+
+        batched = service.enrich_clauses_batch(CLAUSES)
+        encode_calls = len(service.model.calls)
+        sequential = [service.enrich_clause_analysis(text, clause_type) for text, clause_type in CLAUSES]
+
+        assert batched == sequential
+        assert encode_calls == 1
+
+    def test_keyword_batch_matches_sequential(self):
+        """Test the keyword RAG fallback gives the same batched and per-clause results"""
+        service = LegalRAGService()
+
+        assert service.enrich_clauses_batch(CLAUSES) == [
+            service.enrich_clause_analysis(text, clause_type) for text, clause_type in CLAUSES
+        ]
+
+    def test_empty_batch(self, service):
+        """Test no clauses means no model call"""
+        service.model.calls.clear()
+
+        assert service.enrich_clauses_batch([]) == []
+        assert service.model.calls == []
+
+class TestEmbeddingCache:
+    """Test suite for _load_or_update_embeddings (manifest + .npy cache)"""
+
+    def test_cache_hit(self, tmp_path):
+        """Test a second build with the same articles and model encodes nothing"""
+        first = make_service(tmp_path)
+        built, reused_first = first._load_or_update_embeddings()
+
+        second = make_service(tmp_path)
+        loaded, reused_second = second._load_or_update_embeddings()
+
+        assert reused_first is False and reused_second is True
+        assert second.model.calls == []
+        np.testing.assert_array_equal(np.asarray(loaded), built)
+
+    def test_changed_article_reembedded(self, tmp_path):
+        """Test only a modified article is encoded again, other rows are reused"""
+        articles = LegalRAGService._get_complete_knowledge_base()[:10]
+        built, _ = make_service(tmp_path, articles)._load_or_update_embeddings()
+
+        changed = [dict(article) for article in articles]
+        changed[3]["content"] += " Modifié par la loi du 6 juillet 1989."
+        service = make_service(tmp_path, changed)
+        updated, reused = service._load_or_update_embeddings()
+
+        assert reused is False
+        assert service.model.calls == [[service._article_text(changed[3])]]
+        np.testing.assert_array_equal(np.delete(updated, 3, axis=0), np.delete(built, 3, axis=0))
+        assert not np.array_equal(updated[3], built[3])
+
+        # The rewritten cache is valid for the new content
+        assert make_service(tmp_path, changed)._load_or_update_embeddings()[1] is True
+
+    def test_model_change_invalidates(self, tmp_path):
+        """Test a different embedding model re-encodes every article"""
+        make_service(tmp_path)._load_or_update_embeddings()
+
+        service = make_service(tmp_path)
+        service.EMBEDDING_MODEL = "another-model"
+        _, reused = service._load_or_update_embeddings()
+
+        assert reused is False
+        assert service.model.calls == [[service._article_text(article) for article in service.articles]]
+
+class TestSingleton:
+    """Test suite for get_semantic_rag_service"""
+
+    def test_concurrent_callers_build_once(self, monkeypatch):
+        """Test warm-up and requests racing on the first call load the model only once"""
+        built = []
+
+        def slow_init(self):
+            time.sleep(0.05)  # Model loading
+            built.append(self)
+
+        monkeypatch.setattr(SemanticRAGService, "__init__", slow_init)
+        monkeypatch.setattr(rag_service_semantic, "_semantic_rag_service", None)
+        services = []
+        threads = [threading.Thread(target=lambda: services.append(rag_service_semantic.get_semantic_rag_service()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(built) == 1
+        assert all(service is built[0] for service in services)
@@ -0,0 +1,86 @@
+"""
+Unit tests for sliding-window planning and entity merging
+"""
+
+import re
+import pytest
+from utils.text_windows import plan_windows, merge_entities
+
+def word_offsets(text):
+    """Whitespace tokenizer offsets"""
+    return [m.span() for m in re.finditer(r"\S+", text)]
+
+class TestPlanWindows:
+    """Test suite for plan_windows"""
+
+    def test_short_text_single_window(self):
+        """Test a text shorter than the window gives one window owning everything"""
+        text = "Le bailleur loue au locataire"
+
+        windows = plan_windows(word_offsets(text), window_tokens=10, overlap_tokens=2)
+
+        assert windows == [(0, len(text), 0, len(text))]
+
+    def test_windows_overlap_and_tile(self):
+        """Test windows respect the size/overlap and owned ranges tile the text"""
+        text = " ".join(f"w{i}" for i in range(100))
+        offsets = word_offsets(text)
+
+        windows = plan_windows(offsets, window_tokens=20, overlap_tokens=6)
+
+        for char_start, char_end, own_start, own_end in windows:
+            tokens = [o for o in offsets if char_start <= o[0] and o[1] <= char_end]
+            assert len(tokens) <= 20
+            assert char_start <= own_start < own_end <= char_end
+        for previous, current in zip(windows, windows[1:]):
+            assert current[0] < previous[1]  # Overlap
+            assert previous[3] == current[2]  # Contiguous ownership
+        assert windows[0][2] == 0
+        assert windows[-1][3] == len(text)
+
+    def test_invalid_overlap(self):
+        """Test overlap must be smaller than the window"""
+        with pytest.raises(ValueError):
+            plan_windows([(0, 1)], window_tokens=4, overlap_tokens=4)
+
+    def test_empty(self):
+        """Test no tokens gives no windows"""
+        assert plan_windows([], window_tokens=4, overlap_tokens=1) == []
+
+class TestMergeEntities:
+    """Test suite for merge_entities"""
+
+    def test_duplicates_removed(self):
+        """Test the same span reported twice is kept once with the best score"""
+        text = "Entre Jean Dupont et la société ACME"
+        entities = [
+            {"entity_group": "PER", "start": 6, "end": 17, "score": 0.9},
+            {"entity_group": "PER", "start": 6, "end": 17, "score": 0.95},
+        ]
+
+        merged = merge_entities(entities, text)
+
+        assert merged == [{"entity_group": "PER", "start": 6, "end": 17, "score": 0.95, "word": "Jean Dupont"}]
+
+    def test_fragments_joined(self):
+        """Test overlapping fragments of one entity become one span"""
+        text = "Entre Jean Dupont et la société ACME"
+        entities = [
+            {"entity_group": "ORG", "start": 32, "end": 36, "score": 0.8},
+            {"entity_group": "PER", "start": 11, "end": 17, "score": 0.7},
+            {"entity_group": "PER", "start": 6, "end": 12, "score": 0.9},
+        ]
+
+        merged = merge_entities(entities, text)
+
+        assert [(e["entity_group"], e["word"]) for e in merged] == [("PER", "Jean Dupont"), ("ORG", "ACME")]
+
+    def test_different_groups_not_merged(self):
+        """Test overlapping spans of different types stay separate"""
+        text = "Banque de France"
+        entities = [
+            {"entity_group": "ORG", "start": 0, "end": 16, "score": 0.9},
+            {"entity_group": "LOC", "start": 10, "end": 16, "score": 0.6},
+        ]
+
+        assert len(merge_entities(entities, text)) == 2
@@ -0,0 +1,94 @@
+"""
+Unit tests for upload spooling
+"""
+
+import io
+import os
+import pytest
+import fitz
+import extraction.ocr_service as ocr_module
+from utils.uploads import spool_upload, UploadTooLarge
+
+class FakeUpload:
+    """Minimal UploadFile stand-in recording the read sizes"""
+
+    def __init__(self, data: bytes, content_type: str = "application/pdf", filename: str = "contrat.pdf"):
+        self._buffer = io.BytesIO(data)
+        self.content_type = content_type
+        self.filename = filename
+        self.read_sizes = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.read_sizes.append(size)
+        return self._buffer.read(size)
+
+def make_pdf(text: str) -> bytes:
+    """One-page PDF with a text layer"""
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+class TestSpoolUpload:
+    """Test suite for spool_upload"""
+
+    @pytest.mark.asyncio
+    async def test_spooled_in_chunks(self):
+        """Test the upload is written to disk chunk by chunk, content unchanged"""
+        data = os.urandom(300 * 1024)
+        upload = FakeUpload(data)
+
+        spooled = await spool_upload(upload, chunk_size=64 * 1024)
+        try:
+            with open(spooled.path, "rb") as f:
+                assert f.read() == data
+            assert spooled.size == len(data)
+            assert spooled.path.endswith(".pdf")
+            assert all(size == 64 * 1024 for size in upload.read_sizes)
+        finally:
+            spooled.close()
+
+        assert not os.path.exists(spooled.path)
+
+    @pytest.mark.asyncio
+    async def test_too_large_rejected(self):
+        """Test reading stops once the limit is exceeded and nothing is left on disk"""
+        upload = FakeUpload(b"x" * 1000)
+
+        with pytest.raises(UploadTooLarge):
+            await spool_upload(upload, max_bytes=500, chunk_size=200)
+
+        assert len(upload.read_sizes) == 3  # Not the whole file
+
+    @pytest.mark.asyncio
+    async def test_cache_key_depends_on_content(self):
+        """Test identical uploads share a cache key, different ones do not"""
+        first = await spool_upload(FakeUpload(b"contrat A"))
+        second = await spool_upload(FakeUpload(b"contrat A", filename="copie.pdf"))
+        third = await spool_upload(FakeUpload(b"contrat B"))
+        try:
+            assert first.cache_key == second.cache_key
+            assert first.cache_key != third.cache_key
+        finally:
+            for spooled in (first, second, third):
+                spooled.close()
+
+    @pytest.mark.asyncio
+    async def test_cache_key_depends_on_ocr_version(self, monkeypatch):
+        """Test bumping OCR_VERSION invalidates the cached text of an upload"""
+        with await spool_upload(FakeUpload(b"contrat A")) as spooled:
+            before = spooled.cache_key
+            monkeypatch.setattr(ocr_module, "OCR_VERSION", "test")
+
+            assert spooled.cache_key != before
+
+    @pytest.mark.asyncio
+    async def test_pdf_opened_once(self):
+        """Test the file-backed document is shared between callers"""
+        with await spool_upload(FakeUpload(make_pdf("Contrat de bail"))) as spooled:
+            doc = spooled.open_pdf()
+
+            assert spooled.open_pdf() is doc
+            assert doc.name == spooled.path
+            assert "Contrat de bail" in doc[0].get_text()
@@ -0,0 +1,109 @@
+"""
+Unit tests for the persistent worker process pool
+"""
+
+import os
+import time
+import pytest
+from utils.worker_pool import ProcessWorkerPool, WorkerTimeout, WorkerCrashed, WorkerJobError
+
+def fail(message):
+    raise ValueError(message)
+
+# Jobs run by the spawned workers (resolved by name: this module is imported in each worker)
+JOBS = {
+    "echo": lambda value: value,
+    "pid": os.getpid,
+    "sleep": time.sleep,
+    "fail": fail,
+    "crash": os._exit,
+}
+
+def init_worker():
+    return {"engine": "test"}
+
+def make_pool(**kwargs):
+    """Pool of test workers"""
+    options = {"workers": 1, "initializer_ref": "tests.test_worker_pool:init_worker", "start_timeout": 60}
+    options.update(kwargs)
+    return ProcessWorkerPool("test", "tests.test_worker_pool:JOBS", **options)
+
+class TestProcessWorkerPool:
+    """Test suite for ProcessWorkerPool"""
+
+    @pytest.fixture
+    def pool(self):
+        """Fixture for a one-worker pool with a 2 s job timeout"""
+        pool = make_pool(job_timeout=2)
+        yield pool
+        pool.shutdown()
+
+    def test_job_result(self, pool):
+        """Test jobs run in a separate, persistent process"""
+        assert pool.submit("echo", {"page": 1}).result(timeout=30) == {"page": 1}
+
+        first = pool.submit("pid").result(timeout=30)
+        second = pool.submit("pid").result(timeout=30)
+
+        assert first == second != os.getpid()
+
+    def test_job_error(self, pool):
+        """Test an exception in a job fails that job only"""
+        with pytest.raises(WorkerJobError, match="ValueError: illisible"):
+            pool.submit("fail", "illisible").result(timeout=30)
+
+        assert pool.submit("echo", "ok").result(timeout=30) == "ok"
+        assert pool.health()["crashes"] == 0
+
+    def test_timeout_replaces_worker(self, pool):
+        """Test a job over its timeout kills the worker and the next job gets a fresh one"""
+        before = pool.submit("pid").result(timeout=30)
+
+        with pytest.raises(WorkerTimeout):
+            pool.submit("sleep", 30, timeout=0.5).result(timeout=30)
+        after = pool.submit("pid").result(timeout=30)
+
+        assert after != before
+        assert pool.health()["timeouts"] == 1
+
+    def test_crash_replaces_worker(self, pool):
+        """Test a worker dying mid-job fails the job, not the pool"""
+        with pytest.raises(WorkerCrashed):
+            pool.submit("crash", 3).result(timeout=30)
+
+        assert pool.submit("echo", "ok").result(timeout=30) == "ok"
+        assert pool.health()["crashes"] == 1
+
+    def test_recycling(self):
+        """Test workers are replaced after max_jobs jobs"""
+        pool = make_pool(max_jobs=2)
+        try:
+            pids = [pool.submit("pid").result(timeout=30) for _ in range(4)]
+        finally:
+            pool.shutdown()
+
+        assert pids[0] == pids[1]
+        assert pids[2] == pids[3]
+        assert pids[1] != pids[2]
+        assert pool.health()["recycled"] == 2
+
+    def test_health(self, pool):
+        """Test health reports live workers, their initializer info and job counters"""
+        pool.submit("echo", 1).result(timeout=30)
+
+        health = pool.health()
+
+        assert health["workers"] == 1
+        assert health["alive"] == 1
+        assert health["completed"] == 1
+        assert health["processes"][0]["engine"] == "test"
+        assert health["processes"][0]["jobs"] == 1
+
+    def test_shutdown_rejects_jobs(self):
+        """Test a stopped pool refuses new jobs"""
+        pool = make_pool()
+        pool.shutdown()
+
+        with pytest.raises(RuntimeError):
+            pool.submit("echo", 1)
+        assert pool.health()["alive"] == 0
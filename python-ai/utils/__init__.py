@@ -1,4 +1,13 @@
 # Utils module
 from .validator import validate_file, FILE_LIMITS
+from .executors import run_cpu_bound, run_blocking_io, run_fitz, shutdown_executors, FITZ_LOCK
+from .cache import ResultCache, content_hash, normalize_text, ocr_cache, analysis_cache, verdict_cache
+from .uploads import SpooledUpload, UploadTooLarge, spool_upload
 
-__all__ = ['validate_file', 'FILE_LIMITS']
+__all__ = [
+    'validate_file', 'FILE_LIMITS',
+    'run_cpu_bound', 'run_blocking_io', 'run_fitz', 'shutdown_executors', 'FITZ_LOCK',
+    'ResultCache', 'content_hash', 'normalize_text',
+    'ocr_cache', 'analysis_cache', 'verdict_cache',
+    'SpooledUpload', 'UploadTooLarge', 'spool_upload'
+]
@@ -0,0 +1,122 @@
+"""
+Dynamic micro-batching for in-process model inference
+Concurrent callers submit single inputs; a worker thread groups them into one
+batched call (up to max_batch_size inputs, waiting at most max_wait_ms).
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_SIZE = max(1, int(os.getenv("AI_BATCH_MAX_SIZE", "16")))
+BATCH_MAX_WAIT_MS = float(os.getenv("AI_BATCH_MAX_WAIT_MS", "10"))
+
+_STOP = object()
+
+class MicroBatcher:
+    """
+    Queue + worker thread turning concurrent single-item calls into batches
+
+    batch_fn receives a list of items and must return one result per item,
+    in order. If it raises, every caller of that batch gets the exception.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = BATCH_MAX_SIZE, max_wait_ms: float = BATCH_MAX_WAIT_MS):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item: Any) -> Future:
+        """Queue one input; the returned future resolves to its result"""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future
+
+    def map(self, items: Iterable[Any]) -> List[Any]:
+        """Submit several inputs and wait for all results (in order)"""
+        futures = [self.submit(item) for item in items]
+        return [future.result() for future in futures]
+
+    async def submit_async(self, item: Any) -> Any:
+        """Awaitable variant of submit"""
+        return await asyncio.wrap_future(self.submit(item))
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters (mean batch size shows how much traffic was coalesced)"""
+        return {
+            "name": self.name,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0
+        }
+
+    def close(self):
+        """Stop the worker after the queued inputs are processed"""
+        with self._lock:
+            if self._worker is not None:
+                self._queue.put(_STOP)
+                self._worker.join()
+                self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+            batch = [entry]
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: List):
+        # Callers that cancelled meanwhile are dropped from the batch
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(batch)} inputs")
+        except Exception as e:
+            logger.warning(f"⚠️ Batch of {len(batch)} failed in {self.name}: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,246 @@
+"""
+Content-addressed result cache
+In-memory LRU with TTL, optional on-disk tier and hit/miss counters
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "256"))
+CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", str(24 * 3600)))
+CACHE_DIR = os.getenv("AI_CACHE_DIR", "")  # Empty = memory only
+CACHE_DISK_MAX_MB = int(os.getenv("AI_CACHE_DISK_MAX_MB", "512"))  # Per cache, 0 = unbounded
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("AI_VERDICT_CACHE_MAX_ENTRIES", "4096"))
+VERDICT_CACHE_TTL_SECONDS = int(os.getenv("AI_VERDICT_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Pruning an oversized disk tier goes down to this fraction of the cap, so the
+# next writes do not trigger another directory scan right away
+DISK_PRUNE_RATIO = 0.9
+
+def content_hash(*parts: Union[str, bytes]) -> str:
+    """SHA-256 over the given parts (str parts are UTF-8 encoded)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part).to_bytes(8, "big"))  # Length prefix: ("ab", "c") != ("a", "bc")
+        digest.update(part)
+    return digest.hexdigest()
+
+def normalize_text(text: str) -> str:
+    """Canonical form for cache keys: NFKC, case-folded, whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+class ResultCache:
+    """
+    Two-tier cache for JSON-serializable results
+
+    Features:
+    - LRU eviction in memory (max_entries)
+    - TTL on both tiers (expired entries count as misses)
+    - Optional disk tier shared across restarts/workers (one JSON file per key),
+      capped at disk_max_bytes: the oldest files (by mtime) are pruned on write
+    - Values are copied in and out, so callers may mutate what they get
+    """
+
+    def __init__(self, name: str, max_entries: int = CACHE_MAX_ENTRIES,
+                 ttl_seconds: int = CACHE_TTL_SECONDS, disk_dir: Optional[str] = CACHE_DIR,
+                 disk_max_bytes: int = CACHE_DISK_MAX_MB * 1024 * 1024):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = os.path.join(disk_dir, name) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = None  # Estimated disk tier size (None = not scanned yet)
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the cached value, or None on miss/expiry"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+
+        value = self._read_disk(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store_memory(key, value, now)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any):
+        """Store a copy of value under key in every tier"""
+        now = time.time()
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._store_memory(key, value, now)
+        self._write_disk(key, value, now)
+
+    def clear(self):
+        """Drop all memory entries and reset counters (disk files are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries
+            }
+
+    def _store_memory(self, key: str, value: Any, now: float):
+        """Insert into the LRU (lock must be held)"""
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str, now: float) -> Optional[Any]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Unreadable cache entry {path}: {e}")
+            return None
+
+        if entry.get("expires_at", 0) <= now:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry.get("value")
+
+    def _write_disk(self, key: str, value: Any, now: float):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": now + self.ttl_seconds, "value": value}, f, ensure_ascii=False)
+            written = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Could not persist cache entry {key[:12]}: {e}")
+            return
+        self._enforce_disk_cap(written)
+
+    def _enforce_disk_cap(self, written: int):
+        """
+        Keep the disk tier under disk_max_bytes by deleting its oldest files
+
+        The size is tracked in memory between writes; the directory is only
+        scanned on the first write and when the estimate exceeds the cap (the
+        scan also accounts for files written by other workers).
+        """
+        if not self.disk_max_bytes:
+            return
+        with self._disk_lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += written
+                if self._disk_bytes <= self.disk_max_bytes:
+                    return
+
+            files = self._scan_disk()
+            total = sum(size for _, size, _ in files)
+            if total > self.disk_max_bytes:
+                target = self.disk_max_bytes * DISK_PRUNE_RATIO
+                pruned = 0
+                for _, size, path in sorted(files):
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass  # Removed by another worker
+                    except OSError as e:
+                        logger.warning(f"⚠️ Could not prune cache entry {path}: {e}")
+                        continue
+                    total -= size
+                    pruned += 1
+                logger.info(f"🧹 Pruned {pruned} {self.name} cache files ({total / 1e6:.1f} MB left)")
+            self._disk_bytes = total
+
+    def _scan_disk(self):
+        """(mtime, size, path) of every entry file in the disk tier"""
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for file_name in names:
+                if not file_name.endswith(".json"):
+                    continue  # In-flight .tmp files
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+# Global instances
+ocr_cache = ResultCache("ocr")            # upload bytes -> extracted text
+analysis_cache = ResultCache("analysis")  # cleaned text + pipeline/model version -> pipeline result
+verdict_cache = ResultCache(               # normalized clause + prompt/model version -> Mistral verdict
+    "verdicts", max_entries=VERDICT_CACHE_MAX_ENTRIES, ttl_seconds=VERDICT_CACHE_TTL_SECONDS
+)
+
+def _cache_metrics():
+    """Cache counters, read by the /metrics endpoint"""
+    stats = [cache.stats() for cache in (ocr_cache, analysis_cache, verdict_cache)]
+    yield ("ai_cache_hits_total", "counter", "Result cache hits (memory or disk)",
+           [("", {"cache": s["name"]}, s["hits"]) for s in stats])
+    yield ("ai_cache_disk_hits_total", "counter", "Result cache hits served by the disk tier",
+           [("", {"cache": s["name"]}, s["disk_hits"]) for s in stats])
+    yield ("ai_cache_misses_total", "counter", "Result cache misses",
+           [("", {"cache": s["name"]}, s["misses"]) for s in stats])
+    yield ("ai_cache_entries", "gauge", "Entries held in memory",
+           [("", {"cache": s["name"]}, s["entries"]) for s in stats])
+
+registry.register_collector(_cache_metrics)
@@ -0,0 +1,71 @@
+"""
+Worker pools for blocking work
+Keeps OCR, PDF rendering, model inference and outbound HTTP off the asyncio event loop
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# Pool sizes (threads). CPU work here is Tesseract subprocesses, PyTorch and
+# MuPDF, which spend most of their time outside the GIL, so threads sharing the
+# loaded models are enough. Outbound HTTP gets its own, larger pool so slow
+# upstream calls never starve OCR/inference (and vice versa).
+CPU_WORKERS = max(1, int(os.getenv("AI_CPU_WORKERS", str(os.cpu_count() or 2))))
+IO_WORKERS = max(1, int(os.getenv("AI_IO_WORKERS", "16")))
+
+# PyMuPDF is not thread-safe: every call into MuPDF made by this process
+# (open, page access, text extraction, rendering, close) holds this lock.
+# OCR worker processes have their own copy, so they still render in parallel.
+FITZ_LOCK = threading.RLock()
+
+_cpu_executor = None
+_io_executor = None
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Get or create the pool for CPU-bound stages (OCR, rendering, inference)"""
+    global _cpu_executor
+    if _cpu_executor is None:
+        _cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="ai-cpu")
+        logger.info(f"🧵 CPU pool started ({CPU_WORKERS} workers)")
+    return _cpu_executor
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Get or create the pool for blocking I/O (HTTP calls to inference APIs)"""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="ai-io")
+        logger.info(f"🧵 I/O pool started ({IO_WORKERS} workers)")
+    return _io_executor
+
+async def run_cpu_bound(func: Callable, *args, **kwargs) -> Any:
+    """Run a CPU-bound callable in the CPU pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_executor(), functools.partial(func, *args, **kwargs))
+
+async def run_blocking_io(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking I/O callable in the I/O pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+async def run_fitz(func: Callable, *args, **kwargs) -> Any:
+    """Run a PyMuPDF callable in the CPU pool, holding FITZ_LOCK, and await its result"""
+    def locked():
+        with FITZ_LOCK:
+            return func(*args, **kwargs)
+    return await run_cpu_bound(locked)
+
+def shutdown_executors(wait: bool = True):
+    """Stop both pools (called on application shutdown)"""
+    global _cpu_executor, _io_executor
+    for executor in (_cpu_executor, _io_executor):
+        if executor is not None:
+            executor.shutdown(wait=wait)
+    _cpu_executor = None
+    _io_executor = None
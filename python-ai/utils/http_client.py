@@ -0,0 +1,234 @@
+"""
+Resilient HTTP client for inference APIs
+Connection pooling (keep-alive), connect/read timeouts, bounded retries with
+jittered backoff and a circuit breaker. Sync (requests) and async (httpx) variants.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Upstream statuses worth retrying (rate limiting, model loading, gateway errors)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the upstream is marked unhealthy"""
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    - closed: requests flow; failure_threshold consecutive failures open it
+    - open: requests are refused until reset_timeout has elapsed
+    - half-open: one trial request; success closes, failure re-opens, an aborted
+      trial (cancelled) frees the slot for the next one
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """True if a request may be sent now"""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Free the half-open trial slot of an aborted request, without counting it"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"⚠️ Circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+class ResilientHTTPClient:
+    """
+    Shared HTTP client for one upstream service
+
+    Features:
+    - Keep-alive connection pool (no TCP/TLS handshake per call)
+    - Connect and read timeouts on every request
+    - Bounded retries with exponential backoff and full jitter
+    - Circuit breaker: CircuitOpenError is raised while the upstream is unhealthy
+    """
+
+    def __init__(self, name: str, pool_size: int = 10, connect_timeout: float = 3.05,
+                 read_timeout: float = 30.0, max_retries: int = 2, backoff_base: float = 0.5,
+                 backoff_max: float = 4.0, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._async_client = None
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post_json(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        POST a JSON payload with retries
+
+        Returns:
+            The final response (its status may still be an error after retries)
+
+        Raises:
+            CircuitOpenError: the upstream is marked unhealthy
+            requests.RequestException: the last attempt failed at transport level
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"{self.name}: circuit open")
+
+        succeeded = None  # Stays None if the call is aborted (cancelled, interrupted)
+        try:
+            for attempt in range(self.max_retries + 1):
+                last_attempt = attempt == self.max_retries
+                try:
+                    response = self.session.post(
+                        url, json=payload, headers=headers,
+                        timeout=(self.connect_timeout, self.read_timeout)
+                    )
+                except requests.RequestException as e:
+                    if last_attempt:
+                        raise
+                    logger.warning(f"⚠️ {self.name} request failed ({e}), retry {attempt + 1}/{self.max_retries}")
+                else:
+                    retryable = response.status_code in RETRYABLE_STATUSES
+                    if not retryable or last_attempt:
+                        succeeded = not retryable
+                        return response
+                    logger.warning(f"⚠️ {self.name} returned {response.status_code}, retry {attempt + 1}/{self.max_retries}")
+                time.sleep(self._backoff(attempt))
+        except Exception:
+            succeeded = False
+            raise
+        finally:
+            self._record_outcome(succeeded)
+
+    async def apost_json(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        """
+        Async variant of post_json (httpx), same retry and circuit-breaker policy
+
+        Returns:
+            The final httpx.Response
+
+        Raises:
+            CircuitOpenError: the upstream is marked unhealthy
+            httpx.HTTPError: the last attempt failed at transport level
+        """
+        import httpx
+
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"{self.name}: circuit open")
+
+        succeeded = None  # Stays None if the call is aborted (cancelled, interrupted)
+        try:
+            client = self._get_async_client()
+            for attempt in range(self.max_retries + 1):
+                last_attempt = attempt == self.max_retries
+                try:
+                    response = await client.post(url, json=payload, headers=headers)
+                except httpx.HTTPError as e:
+                    if last_attempt:
+                        raise
+                    logger.warning(f"⚠️ {self.name} request failed ({e!r}), retry {attempt + 1}/{self.max_retries}")
+                else:
+                    retryable = response.status_code in RETRYABLE_STATUSES
+                    if not retryable or last_attempt:
+                        succeeded = not retryable
+                        return response
+                    logger.warning(f"⚠️ {self.name} returned {response.status_code}, retry {attempt + 1}/{self.max_retries}")
+                await asyncio.sleep(self._backoff(attempt))
+        except Exception:
+            succeeded = False
+            raise
+        finally:
+            self._record_outcome(succeeded)
+
+    def _record_outcome(self, succeeded: Optional[bool]):
+        """
+        Report a finished request to the breaker
+
+        A non-retryable response is a success; a retryable status or transport
+        error on the last attempt, or any other exception, is a failure. An
+        aborted call (None: cancelled coroutine, e.g. the client disconnected,
+        or KeyboardInterrupt) says nothing about the upstream: it only releases
+        the half-open trial, otherwise the breaker would refuse requests forever.
+        """
+        if succeeded is None:
+            self.breaker.release_trial()
+        elif succeeded:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _get_async_client(self):
+        """Lazily create the pooled httpx client"""
+        if self._async_client is None:
+            import httpx
+            self._async_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+        return self._async_client
+
+    def close(self):
+        """Close the sync connection pool"""
+        self.session.close()
+
+    async def aclose(self):
+        """Close the async connection pool"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
@@ -0,0 +1,179 @@
+"""
+Lightweight metrics (Prometheus text exposition format)
+Histograms and counters with labels, plus collectors for values owned elsewhere
+(cache counters). No dependency: rendered by the /metrics endpoint.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds: from fast stages (detection, cache lookups) to slow OCR pages and LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Sample = Tuple[str, Dict[str, str], float]  # (name suffix, labels, value)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric(ABC):
+    """Named metric with a fixed label set (subclasses render their samples)"""
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[Sample]:
+        """(name suffix, labels, value) of every series"""
+
+class Counter(_Metric):
+    """Monotonic counter"""
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [("", dict(zip(self.labelnames, key)), value) for key, value in sorted(self._values.items())]
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram (durations in seconds)"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # key -> [count per bucket..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(series[-1]) if series else 0
+
+    def samples(self) -> List[Sample]:
+        samples = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = dict(zip(self.labelnames, key))
+                for bound, count in zip(self.buckets, series):
+                    samples.append(("_bucket", dict(labels, le=_format_value(bound)), count))
+                samples.append(("_sum", labels, series[-2]))
+                samples.append(("_count", labels, series[-1]))
+        return samples
+
+class MetricsRegistry:
+    """Owns the metrics and renders them in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]):
+        """
+        Add a callback read at render time
+
+        Args:
+            collector: Returns (name, type, help, samples) tuples
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        families = [(m.name, m.type_name, m.help_text, m.samples()) for m in list(self._metrics.values())]
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, type_name, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {type_name}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+# Global registry and service metrics
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "ai_stage_duration_seconds",
+    "Duration of pipeline stages (cleaning, detection, chunking, ner, rag, mistral, summarization, ocr_page, pdf_export, ...)",
+    ["stage"]
+)
+FALLBACKS = registry.counter(
+    "ai_fallbacks_total",
+    "Degraded paths taken (rules instead of Mistral, keyword RAG, EasyOCR after Tesseract, ...)",
+    ["component"]
+)
+
+async def timed(stage: str, awaitable):
+    """Await and record the duration under ai_stage_duration_seconds{stage=...}"""
+    with STAGE_SECONDS.time(stage=stage):
+        return await awaitable
@@ -0,0 +1,70 @@
+"""
+Sliding windows over long texts for fixed-context models (NER)
+Window planning from token character offsets and merging of entity spans
+found in overlapping windows.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+Window = Tuple[int, int, int, int]  # (char_start, char_end, own_start, own_end)
+
+def plan_windows(offsets: Sequence[Tuple[int, int]], window_tokens: int, overlap_tokens: int) -> List[Window]:
+    """
+    Split a tokenized text into overlapping windows
+
+    Each window owns the middle of its overlap with its neighbours, so an entity
+    cut at a window edge is reported by the window that sees it whole.
+
+    Args:
+        offsets: (start, end) character offsets of each token, in order
+        window_tokens: Tokens per window (model context minus special tokens)
+        overlap_tokens: Tokens shared by consecutive windows
+
+    Returns:
+        (char_start, char_end, own_start, own_end) per window; the owned
+        character ranges tile the text without gaps or overlaps
+    """
+    if not offsets:
+        return []
+    if not 0 <= overlap_tokens < window_tokens:
+        raise ValueError("overlap_tokens must be in [0, window_tokens)")
+
+    stride = window_tokens - overlap_tokens
+    starts = [0]
+    while starts[-1] + window_tokens < len(offsets):
+        starts.append(starts[-1] + stride)
+
+    windows = []
+    for i, first in enumerate(starts):
+        last = min(first + window_tokens, len(offsets)) - 1
+        # Ownership boundaries: middle of the overlap with the previous/next window
+        own_first = first + overlap_tokens // 2 if i > 0 else 0
+        own_next = starts[i + 1] + overlap_tokens // 2 if i + 1 < len(starts) else len(offsets)
+        own_start = offsets[own_first][0] if i > 0 else 0
+        own_end = offsets[own_next][0] if own_next < len(offsets) else offsets[-1][1]
+        windows.append((offsets[first][0], offsets[last][1], own_start, own_end))
+    return windows
+
+def merge_entities(entities: List[Dict[str, Any]], text: str) -> List[Dict[str, Any]]:
+    """
+    Deduplicate entity spans and join fragments of one entity split across windows
+
+    Spans of the same entity_group that overlap or touch are merged (score: max).
+
+    Args:
+        entities: Dicts with entity_group, start, end, score (text-level offsets)
+        text: Full text, used to rebuild the `word` of merged spans
+
+    Returns:
+        Entities sorted by start offset
+    """
+    merged: List[Dict[str, Any]] = []
+    for entity in sorted(entities, key=lambda e: (e["start"], e["end"])):
+        previous = next((m for m in reversed(merged) if m["entity_group"] == entity["entity_group"]), None)
+        if previous is not None and entity["start"] <= previous["end"]:
+            previous["end"] = max(previous["end"], entity["end"])
+            previous["score"] = max(previous["score"], entity["score"])
+            previous["word"] = text[previous["start"]:previous["end"]].strip()
+            continue
+        merged.append(dict(entity, word=text[entity["start"]:entity["end"]].strip()))
+    return merged
@@ -0,0 +1,131 @@
+"""
+Upload spooling
+Uploaded files are streamed to a temporary file chunk by chunk (never held
+whole in memory) and PDFs are opened once, file-backed, by PyMuPDF. The same
+document then serves the native/scan detection, text extraction and OCR.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Optional
+
+from .executors import run_blocking_io, FITZ_LOCK
+from .cache import content_hash
+from .validator import FILE_LIMITS
+
+logger = logging.getLogger(__name__)
+
+# Bytes of an upload held in Python memory at once while spooling (one read chunk)
+UPLOAD_MEMORY_BUDGET = max(64 * 1024, int(os.getenv("AI_UPLOAD_MEMORY_BUDGET", str(1024 * 1024))))
+UPLOAD_TMP_DIR = os.getenv("AI_UPLOAD_TMP_DIR") or None  # None = system temp dir
+
+class UploadTooLarge(ValueError):
+    """Upload exceeds FILE_LIMITS["max_size"] (raised while spooling, before the whole file is read)"""
+
+class SpooledUpload:
+    """
+    Uploaded file on local disk
+
+    Attributes:
+        path: Temporary file holding the upload
+        size: Size in bytes
+        sha256: Hex digest of the content
+        content_type: MIME type sent by the client
+        filename: Original file name
+    """
+
+    def __init__(self, path: str, size: int, sha256: str, content_type: str, filename: str = ""):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.content_type = content_type
+        self.filename = filename
+        self._doc = None
+
+    @property
+    def cache_key(self) -> str:
+        """Key of the upload in ocr_cache (content + OCR version)"""
+        from extraction.ocr_service import OCR_VERSION
+        return content_hash("upload", OCR_VERSION, self.sha256)
+
+    def open_pdf(self):
+        """
+        PyMuPDF document backed by the spooled file (opened on first call, then shared)
+
+        Blocking: call through run_fitz from async code.
+        """
+        with FITZ_LOCK:
+            if self._doc is None:
+                import fitz  # PyMuPDF
+                self._doc = fitz.open(self.path)
+            return self._doc
+
+    def close(self):
+        """
+        Release the document and delete the temporary file
+
+        The document is not closed explicitly: a cancelled request may still be
+        rendering one of its pages in the CPU pool, and MuPDF must not free it
+        under that thread. Dropping the reference lets the last user release it.
+        """
+        self._doc = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Windows refuses to delete a file that is still open
+            logger.warning(f"⚠️ Could not delete spooled upload {self.path}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+async def spool_upload(upload, max_bytes: Optional[int] = None,
+                       chunk_size: int = UPLOAD_MEMORY_BUDGET) -> SpooledUpload:
+    """
+    Stream an upload to a temporary file
+
+    Args:
+        upload: Object with an async read(size) (FastAPI UploadFile), content_type and filename
+        max_bytes: Size limit, checked while reading (default: FILE_LIMITS["max_size"])
+        chunk_size: Bytes read per chunk (upper bound of the upload bytes held in memory)
+
+    Returns:
+        SpooledUpload (the caller must close it)
+
+    Raises:
+        UploadTooLarge: The upload exceeds max_bytes (the partial file is removed)
+    """
+    if max_bytes is None:
+        max_bytes = FILE_LIMITS["max_size"]
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=_suffix(getattr(upload, "filename", None)), dir=UPLOAD_TMP_DIR)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Fichier trop volumineux (max {max_bytes // (1024 * 1024)} MB)")
+                digest.update(chunk)
+                await run_blocking_io(out.write, chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    logger.info(f"📥 Upload spooled to disk ({size / 1024:.0f} KB)")
+    return SpooledUpload(path, size, digest.hexdigest(),
+                         getattr(upload, "content_type", None) or "", getattr(upload, "filename", None) or "")
+
+def _suffix(filename: Optional[str]) -> str:
+    """Keep the extension: some readers (EasyOCR, Pillow) sniff the type from it"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    return extension if extension in FILE_LIMITS["allowed_extensions"] else ""
@@ -0,0 +1,334 @@
+"""
+Persistent worker processes for heavy, model-holding jobs
+Each worker is a long-lived spawned process that runs an initializer once (e.g.
+loading the EasyOCR model) and then serves jobs sent over a pipe. The service
+process only keeps a thread per worker that dispatches jobs, enforces per-job
+timeouts (the worker is killed and replaced) and recycles workers after a
+number of jobs to bound their memory.
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+_GRACEFUL_STOP_SECONDS = 5
+
+class WorkerTimeout(TimeoutError):
+    """A job ran longer than its timeout (its worker was killed)"""
+
+class WorkerCrashed(RuntimeError):
+    """A worker died during a job, or could not start"""
+
+class WorkerJobError(RuntimeError):
+    """A job raised inside its worker (message: exception type and text)"""
+
+def _resolve(reference: str):
+    """Object named by a "package.module:attribute" reference"""
+    module_name, attribute = reference.split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+def _worker_main(conn, jobs_ref: str, initializer_ref: Optional[str]):
+    """
+    Worker process entry point
+
+    Sends ("ready", info) once initialized, then answers each (kind, args)
+    message with ("ok", result) or ("error", message). None stops the worker.
+    """
+    # Ctrl+C reaches the whole process group: the service stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        jobs = _resolve(jobs_ref)
+        info = _resolve(initializer_ref)() if initializer_ref else {}
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", dict(info or {}, pid=os.getpid())))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return  # Service process went away
+        if message is None:
+            return
+        kind, args = message
+        try:
+            reply = ("ok", jobs[kind](*args))
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except Exception as e:  # Unpicklable result
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+class _Job:
+    __slots__ = ("kind", "args", "timeout", "future")
+
+    def __init__(self, kind: str, args: tuple, timeout: Optional[float], future: Future):
+        self.kind = kind
+        self.args = args
+        self.timeout = timeout
+        self.future = future
+
+class _WorkerSlot:
+    """One worker process and the service-side thread feeding it"""
+
+    def __init__(self, pool: "ProcessWorkerPool", index: int):
+        self.pool = pool
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.info: Dict[str, Any] = {}
+        self.jobs = 0
+        self.started_at = None
+        self.busy_since = None
+        self.thread = threading.Thread(target=self._run, name=f"{pool.name}-{index}", daemon=True)
+
+    def _run(self):
+        # Start right away: the initializer (model load) runs before the first job arrives
+        self._replace()
+        while True:
+            job = self.pool._jobs.get()
+            if job is _STOP:
+                self._stop_process()
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            self._execute(job)
+
+    def _execute(self, job: _Job):
+        try:
+            if self.process is None:
+                self._start_process()
+            self.busy_since = time.time()
+            self.conn.send((job.kind, job.args))
+            if not self.conn.poll(job.timeout):
+                self._kill()
+                self.pool._count("timeouts")
+                raise WorkerTimeout(f"{job.kind} job exceeded {job.timeout:g}s")
+            status, payload = self.conn.recv()
+        except (WorkerTimeout, WorkerCrashed) as e:  # TimeoutError is an OSError: caught first
+            error = e
+        except (EOFError, OSError) as e:
+            # Died mid-job (segfault, OOM killer)
+            self._kill()
+            self.pool._count("crashes")
+            error = WorkerCrashed(f"{self.pool.name} worker {self.index} died during a {job.kind} job: {e!r}")
+        except Exception as e:  # Unpicklable arguments
+            error = e
+        else:
+            error = None if status == "ok" else WorkerJobError(payload)
+        finally:
+            self.busy_since = None
+
+        if error is None:
+            self.pool._count("completed")
+            job.future.set_result(payload)
+        else:
+            self.pool._count("failed")
+            logger.warning(f"⚠️ {self.pool.name} worker {self.index}: {error}")
+            job.future.set_exception(error)
+
+        if self.process is None:
+            self._replace()
+            return
+        self.jobs += 1
+        if self.pool.max_jobs and self.jobs >= self.pool.max_jobs:
+            logger.info(f"♻️ Recycling {self.pool.name} worker {self.index} after {self.jobs} jobs")
+            self._stop_process()
+            self.pool._count("recycled")
+            self._replace()
+
+    def _start_process(self):
+        """Spawn the worker and wait for its initializer (raises WorkerCrashed)"""
+        parent, child = self.pool._context.Pipe()
+        process = self.pool._context.Process(
+            target=_worker_main,
+            args=(child, self.pool.jobs_ref, self.pool.initializer_ref),
+            name=f"{self.pool.name}-{self.index}",
+            daemon=True
+        )
+        process.start()
+        child.close()
+        try:
+            if not parent.poll(self.pool.start_timeout):
+                raise WorkerCrashed(f"{self.pool.name} worker {self.index} not ready after {self.pool.start_timeout:g}s")
+            status, info = parent.recv()
+            if status != "ready":
+                raise WorkerCrashed(f"{self.pool.name} worker {self.index} failed to start: {info}")
+        except (EOFError, OSError, WorkerCrashed) as e:
+            process.kill()
+            process.join()
+            parent.close()
+            if isinstance(e, WorkerCrashed):
+                raise
+            raise WorkerCrashed(f"{self.pool.name} worker {self.index} exited during start: {e!r}")
+        self.process, self.conn, self.info = process, parent, info
+        self.jobs = 0
+        self.started_at = time.time()
+        self.pool._count("started")
+
+    def _replace(self):
+        """Start a fresh worker unless the pool is closing (failures are retried on the next job)"""
+        if self.pool._closed:
+            return
+        try:
+            self._start_process()
+        except WorkerCrashed as e:
+            logger.error(f"❌ {e}")
+
+    def _stop_process(self):
+        """Ask the worker to exit, kill it if it does not"""
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(_GRACEFUL_STOP_SECONDS)
+        self._kill()
+
+    def _kill(self):
+        process, conn = self.process, self.conn
+        self.process = self.conn = None
+        self.info = {}
+        if process is not None and process.is_alive():
+            process.kill()
+            process.join()
+        if conn is not None:
+            conn.close()
+
+    def health(self) -> Dict[str, Any]:
+        process, busy_since, started_at = self.process, self.busy_since, self.started_at
+        alive = process is not None and process.is_alive()
+        return {
+            "slot": self.index,
+            "alive": alive,
+            "pid": process.pid if alive else None,
+            "jobs": self.jobs,
+            "busy_seconds": round(time.time() - busy_since, 1) if busy_since else None,
+            "uptime_seconds": round(time.time() - started_at, 1) if alive and started_at else None,
+            **{key: value for key, value in self.info.items() if key != "pid"}
+        }
+
+class ProcessWorkerPool:
+    """
+    Fixed set of persistent worker processes serving named jobs
+
+    Jobs are plain functions listed in a dict importable in the workers
+    (jobs_ref = "package.module:JOBS"); arguments and results must be
+    picklable. Workers are spawned, never forked: the service process may
+    already run threads (uvicorn, torch).
+    """
+
+    def __init__(self, name: str, jobs_ref: str, workers: int, initializer_ref: Optional[str] = None,
+                 max_jobs: int = 0, job_timeout: Optional[float] = None, start_timeout: float = 300):
+        """
+        Args:
+            name: Pool name (thread/process names, logs)
+            jobs_ref: "module:attribute" of the {kind: function} dict run by the workers
+            workers: Number of worker processes
+            initializer_ref: "module:attribute" of a function run once per worker,
+                             returning a dict reported by health() (e.g. loaded models)
+            max_jobs: Jobs after which a worker is replaced (0 = never)
+            job_timeout: Default per-job timeout in seconds (None = no limit)
+            start_timeout: Seconds a worker may take to initialize
+        """
+        self.name = name
+        self.jobs_ref = jobs_ref
+        self.initializer_ref = initializer_ref
+        self.max_jobs = max_jobs
+        self.job_timeout = job_timeout
+        self.start_timeout = start_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._counters = dict.fromkeys(("completed", "failed", "timeouts", "crashes", "recycled", "started"), 0)
+        self._slots = [_WorkerSlot(self, index) for index in range(max(1, workers))]
+        for slot in self._slots:
+            slot.thread.start()
+        logger.info(f"🧵 {name} pool started ({len(self._slots)} processes)")
+
+    @property
+    def workers(self) -> int:
+        return len(self._slots)
+
+    def submit(self, kind: str, *args, timeout: Optional[float] = None) -> Future:
+        """
+        Queue a job for the next free worker
+
+        Args:
+            kind: Key of the job in the jobs dict
+            timeout: Seconds before the worker is killed (default: job_timeout)
+
+        Returns:
+            Future of the job result (WorkerTimeout, WorkerCrashed or WorkerJobError on failure)
+        """
+        if self._closed:
+            raise RuntimeError(f"{self.name} pool is shut down")
+        future = Future()
+        self._jobs.put(_Job(kind, args, timeout if timeout is not None else self.job_timeout, future))
+        return future
+
+    async def run(self, kind: str, *args, timeout: Optional[float] = None) -> Any:
+        """Awaitable variant of submit"""
+        return await asyncio.wrap_future(self.submit(kind, *args, timeout=timeout))
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def health(self) -> Dict[str, Any]:
+        """Worker states and job counters (for /ready and /metrics)"""
+        workers = [slot.health() for slot in self._slots]
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "name": self.name,
+            "workers": len(workers),
+            "alive": sum(worker["alive"] for worker in workers),
+            "busy": sum(worker["busy_seconds"] is not None for worker in workers),
+            "queued": self._jobs.qsize(),
+            **counters,
+            "processes": workers
+        }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Cancel queued jobs and stop the workers
+
+        Args:
+            wait: Let running jobs finish; otherwise kill the workers right away
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            job.future.cancel()
+        for _ in self._slots:
+            self._jobs.put(_STOP)
+        for slot in self._slots:
+            if wait:
+                slot.thread.join()
+            else:
+                # The slot thread sees the pipe close and fails the running job
+                process = slot.process
+                if process is not None:
+                    process.kill()
@@ -103,6 +103,7 @@ export function UploadSection() {
                                     break;
                                 case 'info':
                                 case 'stage':
+                                case 'page_routing':
                                     setExtractedText(current => `${current}\nℹ️ ${msg.message}`);
                                     break;
                                 case 'complete':
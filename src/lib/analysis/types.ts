@@ -67,12 +67,22 @@ export interface AnalyzedClause {
     search_method?: 'semantic' | 'keyword';
 }
 
+// Named entity found by CamemBERT NER (offsets refer to cleaned_text)
+export interface NamedEntity {
+    entity_group: string;
+    word: string;
+    start: number;
+    end: number;
+    score: number;
+}
+
 // Extracted Entities
 export interface ExtractedEntities {
     parties?: string[];
     montants?: string[];
     dates?: string[];
     durees?: string[];
+    named_entities?: NamedEntity[];
 }
 
 // Analysis Metadata
@@ -103,12 +113,23 @@ export interface AnalysisScore {
     grade?: 'A' | 'B' | 'C' | 'D' | 'F';
 }
 
+export interface ClauseHit {
+    keyword: string;
+    start: number; // Offset in the analyzed (cleaned) text
+    end: number;
+    snippet: string;
+    clause_number: number | null;
+}
+
 export interface DetectedClause {
     id: string;
     name: string;
     risk_level: string; // 'HIGH', 'MEDIUM', 'LOW'
     description: string;
     matches: string[];
+    hit_count?: number;
+    hits?: ClauseHit[];
+    clause_numbers?: number[];
 }
 
 export interface AnalysisReport {
@@ -127,6 +148,16 @@ export interface AnalysisReport {
     processingTimeMs?: number;
 }
 
+// Incremental events streamed by /analyze-file (NDJSON), one per completed pipeline stage,
+// followed by { type: 'complete', data } with the full analysis
+export type AnalysisStageEvent =
+    | { type: 'contract_type'; contract_type: string; contract_category: string; confidence: number | null }
+    | { type: 'entities'; entities: ExtractedEntities }
+    | { type: 'detected_clauses'; detected_clauses: DetectedClause[] }
+    | { type: 'clause'; index: number; total: number; clause: AnalyzedClause }
+    | { type: 'risks'; risks: DetectedRisk[] }
+    | { type: 'score'; score: AnalysisScore; recommendations: Recommendation[] };
+
 // Engine Configuration
 export interface AnalysisConfig {
     enableAi: boolean;